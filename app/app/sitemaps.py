@@ -2,9 +2,8 @@ from django.contrib import sitemaps
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
 
-from dashboard.models import Bounty, Profile
 from grants.models import Grant
-from kudos.models import Token
+from perftools.models import SitemapURL
 from quests.models import Quest
 
 
@@ -26,46 +25,42 @@ class StaticViewSitemap(sitemaps.Sitemap):
         return reverse(item)
 
 
-class IssueSitemap(Sitemap):
-    changefreq = "daily"
-    priority = 0.9
+class PrecomputedSitemap(Sitemap):
+    """Define a sitemap served from the precomputed SitemapURL rows of a section.
+
+    The rows are rebuilt by the `create_sitemap_urls` management command, and each
+    page of the sitemap only reads its own slice of (location, lastmod) rows.
+
+    """
+    section = None
+    limit = 10000
 
     def items(self):
-        return Bounty.objects.current().cache()
+        return SitemapURL.objects.filter(section=self.section).order_by('pk').values_list('location', 'lastmod')
 
     def lastmod(self, obj):
-        return obj.modified_on
+        return obj[1]
 
     def location(self, item):
-        return item.get_relative_url()
+        return item[0]
 
 
-class KudosSitemap(Sitemap):
+class IssueSitemap(PrecomputedSitemap):
     changefreq = "daily"
     priority = 0.9
+    section = 'issues'
 
-    def items(self):
-        return Token.objects.filter(hidden=False)
 
-    def lastmod(self, obj):
-        return obj.modified_on
-
-    def location(self, item):
-        return item.get_relative_url()
+class KudosSitemap(PrecomputedSitemap):
+    changefreq = "daily"
+    priority = 0.9
+    section = 'kudos'
 
 
-class ProfileSitemap(Sitemap):
+class ProfileSitemap(PrecomputedSitemap):
     changefreq = "weekly"
     priority = 0.8
-
-    def items(self):
-        return Profile.objects.filter(hide_profile=False).cache()
-
-    def lastmod(self, obj):
-        return obj.modified_on
-
-    def location(self, item):
-        return item.get_relative_url()
+    section = 'orgs'
 
 
 class ContributorLandingPageSitemap(Sitemap):
@@ -0,0 +1,66 @@
+"""Define the benchmark avatar hash index management command.
+
+Copyright (C) 2018 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from avatar.models import BaseAvatar
+from avatar.utils import BKTree, hamming_distance
+
+
+class Command(BaseCommand):
+
+    help = 'benchmarks the avatar near-duplicate hash index against a linear scan using synthetic hashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--num_hashes', default=100000, type=int, help='number of synthetic hashes to index')
+        parser.add_argument('--num_queries', default=100, type=int, help='number of lookups to time')
+        parser.add_argument('--max_distance', default=BaseAvatar.SIMILAR_HASH_MAX_DISTANCE, type=int)
+
+    def handle(self, *args, **options):
+        num_hashes = options['num_hashes']
+        num_queries = options['num_queries']
+        max_distance = options['max_distance']
+        hashes = [f'{random.getrandbits(64):016x}' for _ in range(num_hashes)]
+
+        start = time.time()
+        tree = BKTree()
+        for i, image_hash in enumerate(hashes):
+            tree.add(image_hash, i)
+        print(f'built index of {len(tree)} hashes in {(time.time() - start) * 1000:.0f}ms')
+
+        # half of the queries are near duplicates of indexed hashes, half are random
+        queries = [f'{int(random.choice(hashes), 16) ^ 1:016x}' for _ in range(num_queries // 2)]
+        queries += [f'{random.getrandbits(64):016x}' for _ in range(num_queries - len(queries))]
+
+        start = time.time()
+        indexed_results = [tree.search(query, max_distance) for query in queries]
+        indexed_ms = (time.time() - start) * 1000 / num_queries
+
+        start = time.time()
+        scanned_results = [
+            sorted((distance, i) for distance, i in ((hamming_distance(query, h), i) for i, h in enumerate(hashes))
+                   if distance <= max_distance)
+            for query in queries
+        ]
+        scanned_ms = (time.time() - start) * 1000 / num_queries
+
+        assert [sorted(result) for result in indexed_results] == scanned_results
+        print(f'indexed lookup: {indexed_ms:.2f}ms/query; linear scan: {scanned_ms:.2f}ms/query')
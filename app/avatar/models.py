@@ -19,6 +19,8 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 import logging
+import threading
+import time
 from io import BytesIO
 from secrets import token_hex
 from tempfile import NamedTemporaryFile
@@ -36,15 +38,22 @@ from economy.models import SuperModel
 from PIL import Image
 from svgutils.compose import Figure, Line
 
-from .utils import build_avatar_component, convert_img, convert_wand, dhash, get_temp_image_file, get_upload_filename
+from .utils import (
+    BKTree, build_avatar_component, convert_img, convert_wand, dhash, get_temp_image_file, get_upload_filename,
+)
 
 logger = logging.getLogger(__name__)
 
+_hash_index = {'tree': None, 'built_on': 0}
+_hash_index_lock = threading.Lock()
+
 
 class BaseAvatar(SuperModel):
     """Store the options necessary to render a Gitcoin avatar."""
 
     ICON_SIZE = (215, 215)
+    SIMILAR_HASH_MAX_DISTANCE = 2
+    HASH_INDEX_TTL = 60 * 60
 
     active = models.BooleanField(default=False)
     profile = models.ForeignKey(
@@ -92,9 +101,67 @@ class BaseAvatar(SuperModel):
     def calculate_hash(image):
         return dhash(image)
 
+    @staticmethod
+    def get_hash_index():
+        """Get the process-wide BK-tree of (hash, pk, profile_id) for all avatars.
+
+        The index is rebuilt every `HASH_INDEX_TTL` seconds and avatars saved by this
+        process are added to it as they are created.
+
+        """
+        with _hash_index_lock:
+            if _hash_index['tree'] is None or time.time() - _hash_index['built_on'] > BaseAvatar.HASH_INDEX_TTL:
+                tree = BKTree()
+                for avatar_hash, pk, profile_id in BaseAvatar.objects.exclude(hash='').values_list(
+                    'hash', 'pk', 'profile_id'
+                ).iterator():
+                    tree.add(avatar_hash, (pk, profile_id))
+                _hash_index['tree'] = tree
+                _hash_index['built_on'] = time.time()
+            return _hash_index['tree']
+
+    def find_near_duplicates(self, max_distance=None):
+        """Find the avatars of any profile whose hash is within `max_distance` bits of this one.
+
+        Returns:
+            list: The (distance, pk, profile_id) tuples, closest first.
+
+        """
+        if not self.hash:
+            return []
+        max_distance = self.SIMILAR_HASH_MAX_DISTANCE if max_distance is None else max_distance
+        matches = self.get_hash_index().search(self.hash, max_distance)
+        return [(distance, pk, profile_id) for distance, (pk, profile_id) in matches if pk != self.pk]
+
     def find_similar(self):
+        """Find an existing avatar of this profile which is the same image as this one."""
         if self.hash:
-            return BaseAvatar.objects.filter(profile=self.profile, hash=self.hash).last()
+            similar_avatar = BaseAvatar.objects.filter(profile=self.profile, hash=self.hash).last()
+            if similar_avatar:
+                return similar_avatar
+            pks = [pk for __, pk, profile_id in self.find_near_duplicates() if profile_id == self.profile_id]
+            if pks:
+                return BaseAvatar.objects.filter(pk=pks[0]).first()
+
+    def reuse_duplicate_files(self):
+        """Point this avatar at the stored files of a duplicate avatar.
+
+        Near-duplicates are only reused within the same profile, other profiles' files are only
+        reused for the exact same image, so nobody is served a slightly different avatar of someone else.
+
+        Returns:
+            bool: Whether a duplicate was found and its files reused.
+
+        """
+        for distance, pk, profile_id in self.find_near_duplicates():
+            if distance and profile_id != self.profile_id:
+                continue
+            duplicate = BaseAvatar.objects.filter(pk=pk).first()
+            if duplicate and duplicate.png and duplicate.svg:
+                self.png = duplicate.png.name
+                self.svg = duplicate.svg.name
+                return True
+        return False
 
     def convert_field(self, source, input_fmt, output_fmt, height=215, width=215, preferred_method='', extra_flags=''):
         """Handle converting from the source field to the target based on format."""
@@ -246,6 +313,8 @@ class SocialAvatar(BaseAvatar):
         similar_avatar = avatar.find_similar()
         if similar_avatar:
             return similar_avatar
+        if avatar.reuse_duplicate_files():
+            return avatar
         avatar.png.save(f'{profile.handle}.png', ContentFile(get_temp_image_file(avatar_img).getvalue()), save=True)
         avatar.svg = avatar.convert_field(avatar.png, 'png', 'svg')
         return avatar
@@ -255,5 +324,8 @@ class SocialAvatar(BaseAvatar):
 @receiver(post_save, sender=CustomAvatar, dispatch_uid="psave_avatar2")
 def psave_avatar(sender, instance, **kwargs):
     from dashboard.models import Activity
+    if kwargs.get('created') and instance.hash and _hash_index['tree'] is not None:
+        with _hash_index_lock:
+            _hash_index['tree'].add(instance.hash, (instance.pk, instance.profile_id))
     metadata = {'url': instance.png.url if getattr(instance, 'png', False) else None, }
     Activity.objects.create(profile=instance.profile, activity_type='updated_avatar', metadata=metadata)
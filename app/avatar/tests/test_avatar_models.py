@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Handle avatar model related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from unittest.mock import patch
+
+from avatar.models import BaseAvatar
+from dashboard.models import Profile
+from test_plus.test import TestCase
+
+
+class AvatarModelsTest(TestCase):
+    """Define tests for avatar models."""
+
+    def setUp(self):
+        self.profile = Profile.objects.create(data={}, handle='avatarowner')
+        self.other_profile = Profile.objects.create(data={}, handle='avatarother')
+
+    def create_avatar(self, profile, avatar_hash):
+        return BaseAvatar.objects.create(
+            profile=profile, hash=avatar_hash, png=f'avatars/{avatar_hash}.png', svg=f'avatars/{avatar_hash}.svg',
+        )
+
+    def test_reuse_duplicate_files_across_profiles(self):
+        """Test the avatar model reuse_duplicate_files only shares another profile's files for the same image."""
+        near_duplicate = self.create_avatar(self.other_profile, '0000000000000001')
+        avatar = BaseAvatar(profile=self.profile, hash='0000000000000000')
+
+        matches = [(1, near_duplicate.pk, self.other_profile.pk)]
+        with patch.object(BaseAvatar, 'find_near_duplicates', return_value=matches):
+            assert not avatar.reuse_duplicate_files()
+            assert not avatar.png
+
+        duplicate = self.create_avatar(self.other_profile, '0000000000000000')
+        matches = [(0, duplicate.pk, self.other_profile.pk)]
+        with patch.object(BaseAvatar, 'find_near_duplicates', return_value=matches):
+            assert avatar.reuse_duplicate_files()
+            assert avatar.png.name == 'avatars/0000000000000000.png'
+
+    def test_reuse_duplicate_files_within_profile(self):
+        """Test the avatar model reuse_duplicate_files shares near-duplicate files of the same profile."""
+        near_duplicate = self.create_avatar(self.profile, '0000000000000003')
+        avatar = BaseAvatar(profile=self.profile, hash='0000000000000000')
+
+        matches = [(2, near_duplicate.pk, self.profile.pk)]
+        with patch.object(BaseAvatar, 'find_near_duplicates', return_value=matches):
+            assert avatar.reuse_duplicate_files()
+            assert avatar.svg.name == 'avatars/0000000000000003.svg'
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Handle avatar util related tests.
+
+Copyright (C) 2018 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from avatar.utils import BKTree, RenderedAvatarCache, dhash, hamming_distance, make_white_transparent
+from PIL import Image
+from test_plus.test import TestCase
+
+
+class AvatarUtilsTest(TestCase):
+    """Define tests for avatar utils."""
+
+    def test_make_white_transparent(self):
+        """Test the avatar util make_white_transparent method only clears pure white pixels."""
+        image = Image.new('RGBA', (2, 1), (255, 255, 255, 255))
+        image.putpixel((1, 0), (255, 255, 254, 255))
+        result = make_white_transparent(image)
+        assert result.getpixel((0, 0)) == (255, 255, 255, 0)
+        assert result.getpixel((1, 0)) == (255, 255, 254, 255)
+
+    def test_rendered_avatar_cache_evicts_least_recently_used(self):
+        """Test the avatar util RenderedAvatarCache stays within its byte budget."""
+        avatar_cache = RenderedAvatarCache(max_bytes=10)
+        avatar_cache.set(('a', '1', 'svg'), b'aaaa', 'image/svg+xml')
+        avatar_cache.set(('b', '1', 'svg'), b'bbbb', 'image/svg+xml')
+        assert avatar_cache.get(('a', '1', 'svg')) == (b'aaaa', 'image/svg+xml')
+        avatar_cache.set(('c', '1', 'svg'), b'cccc', 'image/svg+xml')
+        assert avatar_cache.get(('b', '1', 'svg')) is None
+        assert avatar_cache.get(('a', '1', 'svg')) is not None
+        assert avatar_cache.num_bytes == 8
+        assert len(avatar_cache) == 2
+
+    def test_bktree_search(self):
+        """Test the avatar util BKTree finds the same hashes as a linear scan."""
+        hashes = ['0000000000000000', '0000000000000001', '0000000000000003', 'ffffffffffffffff', '0000000000000001']
+        tree = BKTree()
+        for i, image_hash in enumerate(hashes):
+            tree.add(image_hash, i)
+        assert len(tree) == 5
+        assert tree.search('0000000000000000') == [(0, 0)]
+        assert sorted(tree.search('0000000000000000', 1)) == [(0, 0), (1, 1), (1, 4)]
+        expected = sorted(
+            (hamming_distance('0000000000000002', h), i) for i, h in enumerate(hashes)
+            if hamming_distance('0000000000000002', h) <= 2
+        )
+        assert sorted(tree.search('0000000000000002', 2)) == expected
+
+    def test_dhash(self):
+        """Test the avatar util dhash method compares adjacent pixels row by row."""
+        image = Image.new('L', (9, 8), 0)
+        for row in range(8):
+            image.putpixel((0, row), 255)
+        assert dhash(image.convert('RGB')) == '01' * 8
@@ -21,14 +21,18 @@ import logging
 import os
 import random
 import re
+import threading
+from collections import OrderedDict
 from io import BytesIO
 from secrets import token_hex
 from tempfile import NamedTemporaryFile
 
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse, JsonResponse
 from django.template import loader
 
+import numpy as np
 import pyvips
 import requests
 from git.utils import get_user
@@ -39,10 +43,79 @@ from svgutils.compose import SVG, Figure, Line
 
 AVATAR_BASE = 'assets/other/avatars/'
 COMPONENT_BASE = 'assets/v2/images/avatar/'
+AVATAR_VERSION_TIMEOUT = 60 * 15
+RENDERED_AVATAR_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 logger = logging.getLogger(__name__)
 
 
+class RenderedAvatarCache:
+    """Define a size-bounded, in-process LRU cache of rendered avatars.
+
+    Entries are `(content, content_type)` tuples and the cache evicts the least
+    recently used entries once the total size of their content exceeds `max_bytes`.
+
+    """
+
+    def __init__(self, max_bytes=RENDERED_AVATAR_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, content, content_type):
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.num_bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (content, content_type)
+            self.num_bytes += len(content)
+            while self.num_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.num_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.num_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+rendered_avatar_cache = RenderedAvatarCache()
+
+
+def get_avatar_version_key(handle):
+    return f'avatar_version:{handle.lower()}'
+
+
+def get_avatar_version(handle):
+    """Get the cached version of the avatar served for the handle, if any.
+
+    The version identifies the active avatar (its pk and hash), or `github` when the
+    GitHub avatar is served, and keys the rendered avatar cache without a Profile lookup.
+
+    """
+    return cache.get(get_avatar_version_key(handle))
+
+
+def set_avatar_version(handle, version):
+    cache.set(get_avatar_version_key(handle), version, AVATAR_VERSION_TIMEOUT)
+
+
+def invalidate_avatar_version(handle):
+    cache.delete(get_avatar_version_key(handle))
+
+
 def get_avatar_context_for_user(user):
     from revenue.models import DigitalGoodPurchase
     purchases = DigitalGoodPurchase.objects.filter(from_name=user.username, purchase__type='avatar', ).send_success()
@@ -518,21 +591,25 @@ def get_avatar(_org_name):
         with open(filepath, 'wb') as fd:
             for chunk in r.iter_content(chunk_size):
                 fd.write(chunk)
-        avatar = Image.open(filepath, 'r').convert("RGBA")
+        avatar = make_white_transparent(Image.open(filepath, 'r').convert("RGBA"))
+        avatar.save(filepath, "PNG")
+    return filepath
 
-        # make transparent
-        datas = avatar.getdata()
 
-        new_data = []
-        for item in datas:
-            if item[0] == 255 and item[1] == 255 and item[2] == 255:
-                new_data.append((255, 255, 255, 0))
-            else:
-                new_data.append(item)
+def make_white_transparent(image):
+    """Make the pure white pixels of the provided RGBA image transparent.
 
-        avatar.putdata(new_data)
-        avatar.save(filepath, "PNG")
-    return filepath
+    Args:
+        image (Image): The RGBA PIL image.
+
+    Returns:
+        Image: A new RGBA image with the white pixels set to (255, 255, 255, 0).
+
+    """
+    data = np.array(image)
+    white = (data[:, :, :3] == 255).all(axis=2)
+    data[white] = (255, 255, 255, 0)
+    return Image.fromarray(data, 'RGBA')
 
 
 def add_gitcoin_logo_blend(avatar, icon_size):
@@ -605,11 +682,12 @@ def get_temp_image_file(image):
     return temp_io
 
 
-def svg_to_png(svg_content, width=100, height=100, scale=1, index=None, prefer=None, extra_flags=''):
+def svg_to_png(svg_content, width=100, height=100, scale=1, index=None, prefer=None, extra_flags='', fit=False):
     print('creating svg with pyvips')
     png = None
     if not prefer or prefer == 'pyvips':
-        png = svg_to_png_pyvips(svg_content, scale=scale)
+        size = {'width': width, 'height': height} if fit else {}
+        png = svg_to_png_pyvips(svg_content, scale=scale, **size)
     if not png:
         if not index:
             index = random.randint(1000000, 10000000)
@@ -618,7 +696,7 @@ def svg_to_png(svg_content, width=100, height=100, scale=1, index=None, prefer=N
     return png
 
 
-def svg_to_png_pyvips(svg_content, scale=1):
+def svg_to_png_pyvips(svg_content, scale=1, width=None, height=None):
     input_fmt = 'svg'
     output_fmt = 'png'
     try:
@@ -634,6 +712,9 @@ def svg_to_png_pyvips(svg_content, scale=1):
                 'retrying with out the scale parameter... which should work as long as imagemagick is installed'
             )
             image = pyvips.Image.new_from_buffer(obj_data, f'.svg')
+        if width and height:
+            # resize to exactly width x height, which is what inkscape renders
+            image = image.resize(width / image.width, vscale=height / image.height)
         return BytesIO(image.write_to_buffer(f'.{output_fmt}'))
     except VipsError:
         pass
@@ -729,19 +810,72 @@ def dhash(image, hash_size=8):
     # Grayscale and shrink the image in one step.
     image = image.convert('L').resize((hash_size + 1, hash_size), Image.ANTIALIAS, )
     # Compare adjacent pixels.
-    difference = []
-    for row in range(hash_size):
-        for col in range(hash_size):
-            pixel_left = image.getpixel((col, row))
-            pixel_right = image.getpixel((col + 1, row))
-            difference.append(pixel_left > pixel_right)
-    # Convert the binary array to a hexadecimal string.
-    decimal_value = 0
-    hex_string = []
-    for index, value in enumerate(difference):
-        if value:
-            decimal_value += 2**(index % 8)
-        if (index % 8) == 7:
-            hex_string.append(hex(decimal_value)[2:].rjust(2, '0'))
-            decimal_value = 0
-    return ''.join(hex_string)
+    pixels = np.asarray(image, dtype=np.int16)
+    difference = (pixels[:, :-1] > pixels[:, 1:]).flatten()
+    # Convert the binary array to a hexadecimal string, least significant bit first within each byte.
+    num_bytes = len(difference) // 8
+    byte_values = difference[:num_bytes * 8].reshape(num_bytes, 8).dot(1 << np.arange(8))
+    return ''.join(f'{value:02x}' for value in byte_values)
+
+
+def hamming_distance(hash_a, hash_b):
+    """Get the number of differing bits between two hexadecimal image hashes."""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+class BKTree:
+    """Define a BK-tree of hexadecimal image hashes for hamming distance searches.
+
+    Each node stores a hash, the items sharing that hash, and its children keyed by
+    their distance to the node, so a search within `max_distance` only descends into
+    children whose edge distance is within `max_distance` of the query's distance.
+
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, image_hash, item):
+        value = int(image_hash, 16)
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = bin(value ^ node[0]).count('1')
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, image_hash, max_distance=0):
+        """Find the items whose hash is within `max_distance` bits of the provided hash.
+
+        Returns:
+            list: The (distance, item) tuples, closest first.
+
+        """
+        if self.root is None:
+            return []
+        value = int(image_hash, 16)
+        results = []
+        nodes = [self.root]
+        while nodes:
+            node_value, items, children = nodes.pop()
+            distance = bin(value ^ node_value).count('1')
+            if distance <= max_distance:
+                results += [(distance, item) for item in items]
+            for edge in range(max(distance - max_distance, 1), distance + max_distance + 1):
+                child = children.get(edge)
+                if child is not None:
+                    nodes.append(child)
+        return sorted(results, key=lambda result: result[0])
+
+    def __len__(self):
+        return self.size
@@ -32,8 +32,8 @@ from PIL import Image, ImageOps
 
 from .models import BaseAvatar, CustomAvatar, SocialAvatar
 from .utils import (
-    add_gitcoin_logo_blend, build_avatar_svg, get_avatar, get_err_response, get_user_github_avatar_image,
-    handle_avatar_payload,
+    add_gitcoin_logo_blend, build_avatar_svg, get_avatar, get_avatar_version, get_err_response,
+    get_user_github_avatar_image, handle_avatar_payload, rendered_avatar_cache, set_avatar_version,
 )
 
 logger = logging.getLogger(__name__)
@@ -185,15 +185,29 @@ def handle_avatar(request, _org_name='', add_gitcoincologo=False):
         return get_err_response(request, blank_img=(_org_name == 'Self'))
 
     if _org_name:
-        try:
-            profile = Profile.objects.prefetch_related('avatar_baseavatar_related')\
-                .filter(handle__iexact=_org_name).first()
-            if profile and profile.active_avatar:
-                avatar_file, content_type = profile.active_avatar.determine_response(request.GET.get('email', False))
-                if avatar_file:
-                    return HttpResponse(avatar_file, content_type=content_type)
-        except Exception as e:
-            logger.error('Handle Avatar - Exception: (%s) - Handle: (%s)', str(e), _org_name)
+        use_svg = request.GET.get('email', False)
+        size_key = (icon_size, bool(use_svg))
+        version = get_avatar_version(_org_name)
+        if version and version != 'github':
+            cached = rendered_avatar_cache.get((_org_name.lower(), version, size_key))
+            if cached:
+                return HttpResponse(cached[0], content_type=cached[1])
+
+        if version != 'github':
+            try:
+                profile = Profile.objects.prefetch_related('avatar_baseavatar_related')\
+                    .filter(handle__iexact=_org_name).first()
+                if profile and profile.active_avatar:
+                    active_avatar = profile.active_avatar
+                    avatar_file, content_type = active_avatar.determine_response(use_svg)
+                    if avatar_file:
+                        content = avatar_file.read()
+                        version = f'{active_avatar.pk}-{active_avatar.hash}'
+                        set_avatar_version(_org_name, version)
+                        rendered_avatar_cache.set((_org_name.lower(), version, size_key), content, content_type)
+                        return HttpResponse(content, content_type=content_type)
+            except Exception as e:
+                logger.error('Handle Avatar - Exception: (%s) - Handle: (%s)', str(e), _org_name)
 
     # default response
     # params
@@ -205,6 +219,10 @@ def handle_avatar(request, _org_name='', add_gitcoincologo=False):
         # get avatar of repo
         if not _org_name:
             _org_name = org_name(repo_url)
+        size_key = (icon_size, 'github', add_gitcoincologo)
+        cached = rendered_avatar_cache.get((_org_name.lower(), 'github', size_key))
+        if cached:
+            return HttpResponse(cached[0], content_type=cached[1])
 
         filepath = get_avatar(_org_name)
 
@@ -223,6 +241,8 @@ def handle_avatar(request, _org_name='', add_gitcoincologo=False):
 
         response = HttpResponse(content_type='image/png')
         img.save(response, 'PNG')
+        set_avatar_version(_org_name, 'github')
+        rendered_avatar_cache.set((_org_name.lower(), 'github', size_key), response.content, 'image/png')
         return response
     except (AttributeError, IOError, SyntaxError) as e:
         logger.error('Handle Avatar - Response error: (%s) - Handle: (%s)', str(e), _org_name)
@@ -24,9 +24,9 @@ from django.utils.safestring import mark_safe
 
 from .models import (
     Activity, BlockedURLFilter, BlockedUser, Bounty, BountyEvent, BountyFulfillment, BountyInvites, BountySyncRequest,
-    CoinRedemption, CoinRedemptionRequest, Coupon, Earning, FeedbackEntry, HackathonEvent, HackathonProject,
-    HackathonRegistration, HackathonSponsor, Interest, LabsResearch, PortfolioItem, Profile, ProfileView,
-    RefundFeeRequest, SearchHistory, Sponsor, Tip, TokenApproval, Tool, ToolVote, TribeMember, UserAction,
+    BountyVersion, CoinRedemption, CoinRedemptionRequest, Coupon, Earning, FeedbackEntry, HackathonEvent,
+    HackathonProject, HackathonRegistration, HackathonSponsor, Interest, LabsResearch, PortfolioItem, Profile,
+    ProfileView, RefundFeeRequest, SearchHistory, Sponsor, Tip, TokenApproval, Tool, ToolVote, TribeMember, UserAction,
     UserVerificationModel,
 )
 
@@ -36,6 +36,12 @@ class BountyEventAdmin(admin.ModelAdmin):
     raw_id_fields = ['bounty', 'created_by']
 
 
+class BountyVersionAdmin(admin.ModelAdmin):
+    list_display = ['created_on', '__str__']
+    raw_id_fields = ['bounty']
+    ordering = ['-id']
+
+
 class BountyFulfillmentAdmin(admin.ModelAdmin):
     raw_id_fields = ['bounty', 'profile']
     search_fields = ['fulfiller_address', 'fulfiller_email', 'fulfiller_github_username',
@@ -414,6 +420,7 @@ admin.site.register(BlockedURLFilter, GeneralAdmin)
 admin.site.register(Bounty, BountyAdmin)
 admin.site.register(BountyFulfillment, BountyFulfillmentAdmin)
 admin.site.register(BountySyncRequest, GeneralAdmin)
+admin.site.register(BountyVersion, BountyVersionAdmin)
 admin.site.register(BountyInvites, BountyInvitesAdmin)
 admin.site.register(Tip, TipAdmin)
 admin.site.register(TokenApproval, TokenApprovalAdmin)
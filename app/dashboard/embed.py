@@ -1,15 +1,27 @@
+import hashlib
+from io import BytesIO
+
+from django.core.cache import cache
+from django.db.models import Count, Max
 from django.http import HttpResponse, JsonResponse
 from django.template import loader
 from django.utils import timezone
 from django.utils.cache import patch_response_headers
 
 import requests
+from avatar.utils import make_white_transparent
 from dashboard.models import Bounty
 from git.utils import get_user, org_name
 from PIL import Image, ImageDraw, ImageFont
 from ratelimit.decorators import ratelimit
 
 AVATAR_BASE = 'assets/other/avatars/'
+EMBED_FONT = 'assets/v2/fonts/futura/FuturaStd-Medium.otf'
+EMBED_BACKGROUND = 'assets/v2/images/embed-widget/background.png'
+EMBED_CACHE_TIMEOUT = 60 * 60 * 24
+
+_embed_fonts = None
+_embed_background = None
 
 
 def wrap_text(text, w=30):
@@ -90,6 +102,212 @@ def stat(request, key):
     return response
 
 
+def get_embed_fonts():
+    """Load the embed widget fonts once per process."""
+    global _embed_fonts
+    if _embed_fonts is None:
+        _embed_fonts = (
+            ImageFont.truetype(EMBED_FONT, 36, encoding="unic"),
+            ImageFont.truetype(EMBED_FONT, 36, encoding="unic"),
+            ImageFont.truetype(EMBED_FONT, 24, encoding="unic"),
+        )
+    return _embed_fonts
+
+
+def get_embed_background():
+    """Load the embed widget background once per process."""
+    global _embed_background
+    if _embed_background is None:
+        _embed_background = Image.open(EMBED_BACKGROUND, 'r').convert("RGBA")
+    return _embed_background
+
+
+def get_repo_bounties_fingerprint(bounties):
+    """Summarize the repo bounties shown by the widget, so a rendered widget is only reused while they are unchanged."""
+    fingerprint = bounties.aggregate(last_modified=Max('modified_on'), num=Count('pk'))
+    last_modified = fingerprint['last_modified'].timestamp() if fingerprint['last_modified'] else 0
+    # the expiry countdowns change daily even when the bounties don't
+    return f"{fingerprint['num']}:{last_modified}:{timezone.now().date()}"
+
+
+def get_embed_cache_key(kind, repo_url, fingerprint, *args):
+    digest = hashlib.md5('|'.join([repo_url, fingerprint] + [str(arg) for arg in args]).encode('utf-8')).hexdigest()
+    return f'embed:{kind}:{digest}'
+
+
+def get_org_avatar(_org_name):
+    filepath = AVATAR_BASE + f"{_org_name}.png"
+    try:
+        return Image.open(filepath, 'r').convert("RGBA")
+    except IOError:
+        remote_user = get_user(_org_name)
+        if not remote_user.get('avatar_url', False):
+            return None
+        remote_avatar_url = remote_user['avatar_url']
+
+        r = requests.get(remote_avatar_url, stream=True)
+        chunk_size = 20000
+        with open(filepath, 'wb') as fd:
+            for chunk in r.iter_content(chunk_size):
+                fd.write(chunk)
+        avatar = make_white_transparent(Image.open(filepath, 'r').convert("RGBA"))
+        avatar.save(filepath, "PNG")
+        return avatar
+
+
+def render_embed(_org_name, avatar, super_bounties, length):
+    bounties = super_bounties[:length]
+
+    # config
+    bounty_height = 200
+    bounty_width = 572
+    width = 1776
+    height = 576
+
+    # setup
+    img = Image.new("RGBA", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    black = (0, 0, 0)
+    gray = (102, 102, 102)
+    h1, h2_thin, p = get_embed_fonts()
+
+    # background
+    offset = 0, 0
+    img.paste(get_embed_background(), offset)
+
+    # repo logo
+    icon_size = (184, 184)
+    avatar.thumbnail(icon_size, Image.ANTIALIAS)
+    offset = 195, 148
+    img.paste(avatar, offset, avatar)
+
+    img_org_name = ImageDraw.Draw(img)
+    img_org_name_size = img_org_name.textsize(_org_name, h1)
+
+    img_org_name.multiline_text(
+        align="left",
+        xy=(287 - img_org_name_size[0] / 2, 360),
+        text=_org_name,
+        fill=black,
+        font=h1,
+    )
+
+    draw.multiline_text(
+        align="left",
+        xy=(110, 410),
+        text="supports funded issues",
+        fill=black,
+        font=h1,
+    )
+
+    # put bounty list in there
+    i = 0
+    for bounty in bounties[:4]:
+        i += 1
+        # execute
+        line_size = 2
+
+        # Limit text to 28 chars
+        text = f"{bounty.title_or_desc}"
+        text = (text[:28] + '...') if len(text) > 28 else text
+
+        x = 620 + (int((i-1)/line_size) * (bounty_width))
+        y = 230 + (abs(i % line_size-1) * bounty_height)
+        draw.multiline_text(align="left", xy=(x, y), text=text, fill=black, font=h2_thin)
+
+        unit = 'day'
+        num = int(round((bounty.expires_date - timezone.now()).days, 0))
+        if num == 0:
+            unit = 'hour'
+            num = int(round((bounty.expires_date - timezone.now()).seconds / 3600 / 24, 0))
+        unit = unit + ("s" if num != 1 else "")
+        draw.multiline_text(
+            align="left",
+            xy=(x, y - 40),
+            text=f"Expires in {num} {unit}:",
+            fill=gray,
+            font=p,
+        )
+
+        bounty_eth_background = Image.new("RGBA", (200, 56), (231, 240, 250))
+        bounty_usd_background = Image.new("RGBA", (200, 56), (214, 251, 235))
+
+        img.paste(bounty_eth_background, (x, y + 50))
+        img.paste(bounty_usd_background, (x + 210, y + 50))
+
+        tmp = ImageDraw.Draw(img)
+
+        bounty_value_size = tmp.textsize(f"{round(bounty.value_true, 2)} {bounty.token_name}", p)
+
+        draw.multiline_text(
+            align="left",
+            xy=(x + 100 - bounty_value_size[0]/2, y + 67),
+            text=f"{round(bounty.value_true, 2)} {bounty.token_name}",
+            fill=(44, 35, 169),
+            font=p,
+        )
+
+        bounty_value_size = tmp.textsize(f"{round(bounty.value_in_usdt_now, 2)} USD", p)
+
+        draw.multiline_text(
+            align="left",
+            xy=(x + 310 - bounty_value_size[0]/2, y + 67),
+            text=f"{round(bounty.value_in_usdt_now, 2)} USD",
+            fill=(45, 168, 116),
+            font=p,
+        )
+
+    # blank slate
+    if bounties.count() == 0:
+        draw.multiline_text(
+            align="left",
+            xy=(760, 320),
+            text="No active issues. Post a funded issue at: https://gitcoin.co",
+            fill=gray,
+            font=h1,
+        )
+
+    if bounties.count() != 0:
+        text = 'Browse issues at: https://gitcoin.co/explorer'
+        draw.multiline_text(
+            align="left",
+            xy=(64, height - 70),
+            text=text,
+            fill=gray,
+            font=p,
+        )
+
+        draw.multiline_text(
+            align="left",
+            xy=(624, 120),
+            text="Recently funded issues:",
+            fill=(62, 36, 251),
+            font=p,
+        )
+
+        _, value = summarize_bounties(super_bounties)
+        value_size = tmp.textsize(value, p)
+
+        draw.multiline_text(
+            align="left",
+            xy=(1725 - value_size[0], 120),
+            text=value,
+            fill=gray,
+            font=p,
+        )
+
+        line_table_header = Image.new("RGBA", (1100, 6), (62, 36, 251))
+
+        img.paste(line_table_header, (624, 155))
+
+    # Resize back to output size for better anti-alias
+    img = img.resize((888, 288), Image.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, "PNG")
+    return output.getvalue()
+
+
 @ratelimit(key='ip', rate='50/m', method=ratelimit.UNSAFE, block=True)
 def embed(request):
     # default response
@@ -115,48 +333,16 @@ def embed(request):
                     idx_status__in=['open']
                 )
 
-            tmpl = loader.get_template('svg_badge.txt')
-            response = HttpResponse(
-                tmpl.render({'bounties_count': open_bounties.count()}),
-                content_type='image/svg+xml',
-            )
+            cache_key = get_embed_cache_key('badge', repo_url, get_repo_bounties_fingerprint(open_bounties))
+            content = cache.get(cache_key)
+            if content is None:
+                tmpl = loader.get_template('svg_badge.txt')
+                content = tmpl.render({'bounties_count': open_bounties.count()})
+                cache.set(cache_key, content, EMBED_CACHE_TIMEOUT)
+            response = HttpResponse(content, content_type='image/svg+xml')
             patch_response_headers(response, cache_timeout=max_age)
             return response
 
-        # get avatar of repo
-        _org_name = org_name(repo_url)
-
-        avatar = None
-        filename = f"{_org_name}.png"
-        filepath = 'assets/other/avatars/' + filename
-        try:
-            avatar = Image.open(filepath, 'r').convert("RGBA")
-        except IOError:
-            remote_user = get_user(_org_name)
-            if not remote_user.get('avatar_url', False):
-                return JsonResponse({'msg': 'invalid user'}, status=422)
-            remote_avatar_url = remote_user['avatar_url']
-
-            r = requests.get(remote_avatar_url, stream=True)
-            chunk_size = 20000
-            with open(filepath, 'wb') as fd:
-                for chunk in r.iter_content(chunk_size):
-                    fd.write(chunk)
-            avatar = Image.open(filepath, 'r').convert("RGBA")
-
-            # make transparent
-            datas = avatar.getdata()
-
-            new_data = []
-            for item in datas:
-                if item[0] == 255 and item[1] == 255 and item[2] == 255:
-                    new_data.append((255, 255, 255, 0))
-                else:
-                    new_data.append(item)
-
-            avatar.putdata(new_data)
-            avatar.save(filepath, "PNG")
-
         # get issues
         length = request.GET.get('len', 10)
         super_bounties = Bounty.objects.current() \
@@ -165,161 +351,21 @@ def embed(request):
                 network='mainnet',
                 idx_status__in=['open', 'started', 'submitted']
             ).order_by('-_val_usd_db')
-        bounties = super_bounties[:length]
-
-        # config
-        bounty_height = 200
-        bounty_width = 572
-        font = 'assets/v2/fonts/futura/FuturaStd-Medium.otf'
-        width = 1776
-        height = 576
-
-        # setup
-        img = Image.new("RGBA", (width, height), (255, 255, 255))
-        draw = ImageDraw.Draw(img)
-        black = (0, 0, 0)
-        gray = (102, 102, 102)
-        h1 = ImageFont.truetype(font, 36, encoding="unic")
-        h2_thin = ImageFont.truetype(font, 36, encoding="unic")
-        p = ImageFont.truetype(font, 24, encoding="unic")
-
-        # background
-        background_image = 'assets/v2/images/embed-widget/background.png'
-        back = Image.open(background_image, 'r').convert("RGBA")
-        offset = 0, 0
-        img.paste(back, offset)
-
-        # repo logo
-        icon_size = (184, 184)
-        avatar.thumbnail(icon_size, Image.ANTIALIAS)
-        offset = 195, 148
-        img.paste(avatar, offset, avatar)
-
-        img_org_name = ImageDraw.Draw(img)
-        img_org_name_size = img_org_name.textsize(_org_name, h1)
-
-        img_org_name.multiline_text(
-            align="left",
-            xy=(287 - img_org_name_size[0] / 2, 360),
-            text=_org_name,
-            fill=black,
-            font=h1,
-        )
 
-        draw.multiline_text(
-            align="left",
-            xy=(110, 410),
-            text="supports funded issues",
-            fill=black,
-            font=h1,
-        )
+        cache_key = get_embed_cache_key('widget', repo_url, get_repo_bounties_fingerprint(super_bounties), length)
+        content = cache.get(cache_key)
+        if content is None:
+            # get avatar of repo
+            _org_name = org_name(repo_url)
+            avatar = get_org_avatar(_org_name)
+            if not avatar:
+                return JsonResponse({'msg': 'invalid user'}, status=422)
 
-        # put bounty list in there
-        i = 0
-        for bounty in bounties[:4]:
-            i += 1
-            # execute
-            line_size = 2
-
-            # Limit text to 28 chars
-            text = f"{bounty.title_or_desc}"
-            text = (text[:28] + '...') if len(text) > 28 else text
-
-            x = 620 + (int((i-1)/line_size) * (bounty_width))
-            y = 230 + (abs(i % line_size-1) * bounty_height)
-            draw.multiline_text(align="left", xy=(x, y), text=text, fill=black, font=h2_thin)
-
-            unit = 'day'
-            num = int(round((bounty.expires_date - timezone.now()).days, 0))
-            if num == 0:
-                unit = 'hour'
-                num = int(round((bounty.expires_date - timezone.now()).seconds / 3600 / 24, 0))
-            unit = unit + ("s" if num != 1 else "")
-            draw.multiline_text(
-                align="left",
-                xy=(x, y - 40),
-                text=f"Expires in {num} {unit}:",
-                fill=gray,
-                font=p,
-            )
-
-            bounty_eth_background = Image.new("RGBA", (200, 56), (231, 240, 250))
-            bounty_usd_background = Image.new("RGBA", (200, 56), (214, 251, 235))
-
-            img.paste(bounty_eth_background, (x, y + 50))
-            img.paste(bounty_usd_background, (x + 210, y + 50))
-
-            tmp = ImageDraw.Draw(img)
-
-            bounty_value_size = tmp.textsize(f"{round(bounty.value_true, 2)} {bounty.token_name}", p)
-
-            draw.multiline_text(
-                align="left",
-                xy=(x + 100 - bounty_value_size[0]/2, y + 67),
-                text=f"{round(bounty.value_true, 2)} {bounty.token_name}",
-                fill=(44, 35, 169),
-                font=p,
-            )
-
-            bounty_value_size = tmp.textsize(f"{round(bounty.value_in_usdt_now, 2)} USD", p)
-
-            draw.multiline_text(
-                align="left",
-                xy=(x + 310 - bounty_value_size[0]/2, y + 67),
-                text=f"{round(bounty.value_in_usdt_now, 2)} USD",
-                fill=(45, 168, 116),
-                font=p,
-            )
-
-        # blank slate
-        if bounties.count() == 0:
-            draw.multiline_text(
-                align="left",
-                xy=(760, 320),
-                text="No active issues. Post a funded issue at: https://gitcoin.co",
-                fill=gray,
-                font=h1,
-            )
-
-        if bounties.count() != 0:
-            text = 'Browse issues at: https://gitcoin.co/explorer'
-            draw.multiline_text(
-                align="left",
-                xy=(64, height - 70),
-                text=text,
-                fill=gray,
-                font=p,
-            )
-
-            draw.multiline_text(
-                align="left",
-                xy=(624, 120),
-                text="Recently funded issues:",
-                fill=(62, 36, 251),
-                font=p,
-            )
-
-            _, value = summarize_bounties(super_bounties)
-            value_size = tmp.textsize(value, p)
-
-            draw.multiline_text(
-                align="left",
-                xy=(1725 - value_size[0], 120),
-                text=value,
-                fill=gray,
-                font=p,
-            )
-
-            line_table_header = Image.new("RGBA", (1100, 6), (62, 36, 251))
-
-            img.paste(line_table_header, (624, 155))
-
-        # Resize back to output size for better anti-alias
-        img = img.resize((888, 288), Image.LANCZOS)
+            content = render_embed(_org_name, avatar, super_bounties, length)
+            cache.set(cache_key, content, EMBED_CACHE_TIMEOUT)
 
         # Return image with right content-type
-        response = HttpResponse(content_type="image/png")
-        img.save(response, "PNG")
+        response = HttpResponse(content, content_type="image/png")
         patch_response_headers(response, cache_timeout=max_age)
         return response
     except IOError as e:
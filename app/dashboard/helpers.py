@@ -17,6 +17,7 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
+import json
 import logging
 import os
 import pprint
@@ -27,14 +28,14 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from django.db import transaction
+from django.db import models, transaction
 from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.utils import timezone
 
 from app.utils import get_semaphore, sync_profile
 from dashboard.models import (
     Activity, BlockedURLFilter, Bounty, BountyDocuments, BountyEvent, BountyFulfillment, BountyInvites,
-    BountySyncRequest, Coupon, HackathonEvent, UserAction,
+    BountySyncRequest, BountyVersion, Coupon, HackathonEvent, UserAction,
 )
 from dashboard.notifications import (
     maybe_market_to_email, maybe_market_to_github, maybe_market_to_slack, maybe_market_to_user_discord,
@@ -303,6 +304,13 @@ def handle_bounty_fulfillments(fulfillments, new_bounty, old_bounty):
 
     """
     from dashboard.utils import is_blocked
+    existing_fulfillments = {}
+    if new_bounty and old_bounty and old_bounty.pk == new_bounty.pk:
+        # the bounty is being updated in place, so update its fulfillments instead of duplicating them
+        existing_fulfillments = {
+            old_fulfillment.fulfillment_id: old_fulfillment
+            for old_fulfillment in new_bounty.fulfillments.all().nocache()
+        }
     for fulfillment in fulfillments:
         kwargs = {}
         accepted_on = None
@@ -324,19 +332,19 @@ def handle_bounty_fulfillments(fulfillments, new_bounty, old_bounty):
         try:
             created_on = timezone.now()
             modified_on = timezone.now()
-            if old_bounty:
-                old_fulfillments = old_bounty.fulfillments.filter(fulfillment_id=fulfillment.get('id')).nocache()
-                if old_fulfillments.exists():
-                    old_fulfillment = old_fulfillments.first()
-                    created_on = old_fulfillment.created_on
-                    modified_on = old_fulfillment.modified_on
-                    if old_fulfillment.accepted:
-                        accepted_on = old_fulfillment.accepted_on
+            old_fulfillment = existing_fulfillments.get(fulfillment.get('id'))
+            if not old_fulfillment and old_bounty:
+                old_fulfillment = old_bounty.fulfillments.filter(fulfillment_id=fulfillment.get('id')).nocache().first()
+            if old_fulfillment:
+                created_on = old_fulfillment.created_on
+                modified_on = old_fulfillment.modified_on
+                if old_fulfillment.accepted:
+                    accepted_on = old_fulfillment.accepted_on
             hours_worked = fulfillment.get('data', {}).get(
                     'payload', {}).get('fulfiller', {}).get('hoursWorked', None)
             if not hours_worked or not hours_worked.isdigit():
                 hours_worked = None
-            new_bounty.fulfillments.create(
+            kwargs.update(
                 fulfiller_address=fulfillment.get(
                     'fulfiller',
                     '0x0000000000000000000000000000000000000000'),
@@ -353,7 +361,13 @@ def handle_bounty_fulfillments(fulfillments, new_bounty, old_bounty):
                 created_on=created_on,
                 modified_on=modified_on,
                 accepted_on=accepted_on,
-                **kwargs)
+            )
+            if fulfillment.get('id') in existing_fulfillments:
+                for key, value in kwargs.items():
+                    setattr(old_fulfillment, key, value)
+                old_fulfillment.save()
+            else:
+                new_bounty.fulfillments.create(**kwargs)
         except Exception as e:
             logger.error(f'{e} during new fulfillment creation for {new_bounty}')
             continue
@@ -362,25 +376,58 @@ def handle_bounty_fulfillments(fulfillments, new_bounty, old_bounty):
         return new_bounty.fulfillments.all()
 
 
+def build_bounty_version(old_bounty, new_bounty):
+    """Build (but don't save) the BountyVersion between two states of a Bounty.
+
+    Args:
+        old_bounty (dashboard.models.Bounty): The Bounty as it was before the change.
+        new_bounty (dashboard.models.Bounty): The Bounty after the change.
+
+    Returns:
+        dashboard.models.BountyVersion: The unsaved version.
+
+    """
+    changes = {}
+    for field in Bounty._meta.concrete_fields:
+        if field.name in ['id', 'created_on', 'modified_on', 'raw_data', 'current_bounty']:
+            continue
+        old_value = field.to_python(getattr(old_bounty, field.attname))
+        new_value = field.to_python(getattr(new_bounty, field.attname))
+        if isinstance(field, models.FileField):
+            old_value, new_value = old_value.name, new_value.name
+        if old_value != new_value:
+            changes[field.attname] = [old_value, new_value]
+    # the symmetric syntax keeps both sides of every change, so versions can be replayed in either direction
+    raw_data_diff = json.loads(diff(old_bounty.raw_data, new_bounty.raw_data, syntax='symmetric', dump=True))
+    return BountyVersion(bounty=new_bounty, changes=changes, raw_data_diff=raw_data_diff)
+
+
+def record_bounty_version(old_bounty, new_bounty):
+    """Record the changes between two states of a Bounty as a BountyVersion."""
+    version = build_bounty_version(old_bounty, new_bounty)
+    version.save()
+    return version
+
+
 def create_new_bounty(old_bounties, bounty_payload, bounty_details, bounty_id):
     """Handle new Bounty creation in the event of bounty changes.
 
+    Bounties which already exist are updated in place, with the change recorded
+    as a BountyVersion.
+
     Possible Bounty Stages:
         0: Draft
         1: Active
         2: Dead
 
     Returns:
-        dashboard.models.Bounty: The new Bounty object.
+        dashboard.models.Bounty: The new or updated Bounty object.
 
     """
     bounty_issuer = bounty_payload.get('issuer', {})
     metadata = bounty_payload.get('metadata', {})
     # fulfillments metadata will be empty when bounty is first created
     fulfillments = bounty_details.get('fulfillments', {})
-    interested_comment_id = None
-    submissions_comment_id = None
-    interested_comment_id = None
 
     # start to process out all the bounty data
     url = bounty_payload.get('webReferenceURL')
@@ -405,7 +452,6 @@ def create_new_bounty(old_bounties, bounty_payload, bounty_details, bounty_id):
 
     with transaction.atomic():
         old_bounties = old_bounties.distinct().order_by('created_on')
-        latest_old_bounty = None
         token_address = bounty_payload.get('tokenAddress', '0x0000000000000000000000000000000000000000')
         token_name = bounty_payload.get('tokenName', '')
         if not token_name:
@@ -413,13 +459,7 @@ def create_new_bounty(old_bounties, bounty_payload, bounty_details, bounty_id):
             if token:
                 token_name = token['name']
 
-        for old_bounty in old_bounties:
-            if old_bounty.current_bounty:
-                submissions_comment_id = old_bounty.submissions_comment
-                interested_comment_id = old_bounty.interested_comment
-            old_bounty.current_bounty = False
-            old_bounty.save()
-            latest_old_bounty = old_bounty
+        latest_old_bounty = old_bounties.last()
 
         bounty_kwargs = {
             'is_open': True if (bounty_details.get('bountyStage') == 1 and not accepted) else False,
@@ -427,8 +467,6 @@ def create_new_bounty(old_bounties, bounty_payload, bounty_details, bounty_id):
             'metadata': metadata,
             'current_bounty': True,
             'accepted': accepted,
-            'interested_comment': interested_comment_id,
-            'submissions_comment': submissions_comment_id,
             'standard_bounties_id': bounty_id,
             'num_fulfillments': len(fulfillments),
             'value_in_token': bounty_details.get('fulfillmentAmount', Decimal(1.0)),
@@ -444,87 +482,76 @@ def create_new_bounty(old_bounties, bounty_payload, bounty_details, bounty_id):
                     'coupon_code': coupon
                 })
 
-        if not latest_old_bounty:
-            print("no latest old bounty")
-            schemes = bounty_payload.get('schemes', {})
-            unsigned_nda = None
-            if bounty_payload.get('unsigned_nda', None):
-                unsigned_nda = BountyDocuments.objects.filter(
-                    pk=bounty_payload.get('unsigned_nda')
-                ).first()
-            bounty_kwargs.update({
-                # info to xfr over from latest_old_bounty as override fields (this is because sometimes
-                # ppl dont login when they first submit issue and it needs to be overridden)
-                'web3_created': timezone.make_aware(
-                    timezone.datetime.fromtimestamp(bounty_payload.get('created')),
-                    timezone=UTC),
-                'last_remarketed': timezone.make_aware(
-                    timezone.datetime.fromtimestamp(bounty_payload.get('created')),
-                    timezone=UTC),
-                'remarketed_count': 0,
-                'github_url': url,
-                'token_name': token_name,
-                'token_address': token_address,
-                'privacy_preferences': bounty_payload.get('privacy_preferences', {}),
-                'expires_date': timezone.make_aware(
-                    timezone.datetime.fromtimestamp(bounty_details.get('deadline')),
-                    timezone=UTC),
-                'title': bounty_payload.get('title', ''),
-                'issue_description': bounty_payload.get('description', ' '),
-                'balance': bounty_details.get('balance'),
-                'contract_address': bounty_details.get('token'),
-                'network': bounty_details.get('network'),
-                'bounty_type': metadata.get('bountyType', ''),
-                'bounty_categories': metadata.get('bounty_categories', '').split(','),
-                'funding_organisation': metadata.get('fundingOrganisation', ''),
-                'project_length': metadata.get('projectLength', ''),
-                'estimated_hours': metadata.get('estimatedHours'),
-                'experience_level': metadata.get('experienceLevel', ''),
-                'project_type': schemes.get('project_type', 'traditional'),
-                'permission_type': schemes.get('permission_type', 'permissionless'),
-                'attached_job_description': bounty_payload.get('hiring', {}).get('jobDescription', None),
-                'is_featured': metadata.get('is_featured', False),
-                'featuring_date': timezone.make_aware(
-                    timezone.datetime.fromtimestamp(metadata.get('featuring_date', 0)),
-                    timezone=UTC),
-                'repo_type': metadata.get('repo_type', 'public'),
-                'unsigned_nda': unsigned_nda,
-                'bounty_owner_github_username': bounty_issuer.get('githubUsername', ''),
-                'bounty_owner_address': bounty_issuer.get('address', ''),
-                'bounty_owner_email': bounty_issuer.get('email', ''),
-                'bounty_owner_name': bounty_issuer.get('name', ''),
-                'admin_override_suspend_auto_approval': not schemes.get('auto_approve_workers', True),
-                'fee_tx_id': bounty_payload.get('fee_tx_id', '0x0'),
-                'fee_amount': bounty_payload.get('fee_amount', 0)
-            })
-        else:
-            # print('latest old bounty found {}'.format(latest_old_bounty))
-            latest_old_bounty_dict = latest_old_bounty.to_standard_dict(
-                fields=[
-                    'web3_created', 'github_url', 'token_name', 'token_address', 'privacy_preferences', 'expires_date',
-                    'title', 'issue_description', 'balance', 'contract_address', 'network', 'bounty_type',
-                    'bounty_categories', 'project_length', 'experience_level', 'project_type', 'permission_type',
-                    'attached_job_description', 'bounty_owner_github_username', 'bounty_owner_address',
-                    'bounty_owner_email', 'bounty_owner_name', 'github_comments', 'override_status', 'last_comment_date',
-                    'snooze_warnings_for_days', 'admin_override_and_hide', 'admin_override_suspend_auto_approval',
-                    'admin_mark_as_remarket_ready', 'funding_organisation', 'bounty_reserved_for_user', 'is_featured',
-                    'featuring_date', 'fee_tx_id', 'fee_amount', 'repo_type', 'unsigned_nda', 'coupon_code',
-                    'admin_override_org_name', 'admin_override_org_logo', 'bounty_state'
-                ],
-            )
-            if latest_old_bounty_dict['bounty_reserved_for_user']:
-                latest_old_bounty_dict['bounty_reserved_for_user'] = Profile.objects.get(pk=latest_old_bounty_dict['bounty_reserved_for_user'])
-            if latest_old_bounty_dict.get('bounty_owner_profile'):
-                latest_old_bounty_dict['bounty_owner_profile'] = Profile.objects.get(pk=latest_old_bounty_dict['bounty_owner_profile'])
-            if latest_old_bounty_dict['unsigned_nda']:
-                latest_old_bounty_dict['unsigned_nda'] = BountyDocuments.objects.filter(
-                    pk=latest_old_bounty_dict['unsigned_nda']
-                ).first()
-            if latest_old_bounty_dict.get('coupon_code'):
-                latest_old_bounty_dict['coupon_code'] = Coupon.objects.get(pk=latest_old_bounty_dict['coupon_code'])
-
-            bounty_kwargs.update(latest_old_bounty_dict)
-
+        if latest_old_bounty:
+            # update the bounty in place and record the change as a BountyVersion, rather than
+            # cloning the whole bounty into a new row
+            try:
+                new_bounty = Bounty.objects.nocache().get(pk=latest_old_bounty.pk)
+                for key in ['is_open', 'raw_data', 'metadata', 'accepted', 'num_fulfillments', 'value_in_token']:
+                    setattr(new_bounty, key, bounty_kwargs[key])
+                new_bounty.current_bounty = True
+                new_bounty.save()
+                old_bounties.filter(current_bounty=True).exclude(pk=new_bounty.pk).update(current_bounty=False)
+                merge_bounty(latest_old_bounty, new_bounty, metadata, bounty_details)
+                record_bounty_version(latest_old_bounty, new_bounty)
+            except Exception as e:
+                print(e, 'encountered during bounty update for:', url)
+                logger.error(f'{e} encountered during bounty update for: {url}')
+                new_bounty = None
+            return new_bounty
+
+        print("no latest old bounty")
+        schemes = bounty_payload.get('schemes', {})
+        unsigned_nda = None
+        if bounty_payload.get('unsigned_nda', None):
+            unsigned_nda = BountyDocuments.objects.filter(
+                pk=bounty_payload.get('unsigned_nda')
+            ).first()
+        bounty_kwargs.update({
+            # info to xfr over from latest_old_bounty as override fields (this is because sometimes
+            # ppl dont login when they first submit issue and it needs to be overridden)
+            'web3_created': timezone.make_aware(
+                timezone.datetime.fromtimestamp(bounty_payload.get('created')),
+                timezone=UTC),
+            'last_remarketed': timezone.make_aware(
+                timezone.datetime.fromtimestamp(bounty_payload.get('created')),
+                timezone=UTC),
+            'remarketed_count': 0,
+            'github_url': url,
+            'token_name': token_name,
+            'token_address': token_address,
+            'privacy_preferences': bounty_payload.get('privacy_preferences', {}),
+            'expires_date': timezone.make_aware(
+                timezone.datetime.fromtimestamp(bounty_details.get('deadline')),
+                timezone=UTC),
+            'title': bounty_payload.get('title', ''),
+            'issue_description': bounty_payload.get('description', ' '),
+            'balance': bounty_details.get('balance'),
+            'contract_address': bounty_details.get('token'),
+            'network': bounty_details.get('network'),
+            'bounty_type': metadata.get('bountyType', ''),
+            'bounty_categories': metadata.get('bounty_categories', '').split(','),
+            'funding_organisation': metadata.get('fundingOrganisation', ''),
+            'project_length': metadata.get('projectLength', ''),
+            'estimated_hours': metadata.get('estimatedHours'),
+            'experience_level': metadata.get('experienceLevel', ''),
+            'project_type': schemes.get('project_type', 'traditional'),
+            'permission_type': schemes.get('permission_type', 'permissionless'),
+            'attached_job_description': bounty_payload.get('hiring', {}).get('jobDescription', None),
+            'is_featured': metadata.get('is_featured', False),
+            'featuring_date': timezone.make_aware(
+                timezone.datetime.fromtimestamp(metadata.get('featuring_date', 0)),
+                timezone=UTC),
+            'repo_type': metadata.get('repo_type', 'public'),
+            'unsigned_nda': unsigned_nda,
+            'bounty_owner_github_username': bounty_issuer.get('githubUsername', ''),
+            'bounty_owner_address': bounty_issuer.get('address', ''),
+            'bounty_owner_email': bounty_issuer.get('email', ''),
+            'bounty_owner_name': bounty_issuer.get('name', ''),
+            'admin_override_suspend_auto_approval': not schemes.get('auto_approve_workers', True),
+            'fee_tx_id': bounty_payload.get('fee_tx_id', '0x0'),
+            'fee_amount': bounty_payload.get('fee_amount', 0)
+        })
         try:
             print('new bounty with kwargs:{}'.format(bounty_kwargs))
             new_bounty = Bounty.objects.create(**bounty_kwargs)
@@ -597,8 +624,11 @@ def merge_bounty(latest_old_bounty, new_bounty, metadata, bounty_details, verbos
                 'status': 500,
                 'msg': 'Email not sent',
             }
+    # bounties which are updated in place don't need anything migrated to them
+    is_same_bounty = latest_old_bounty and latest_old_bounty.pk == new_bounty.pk
+
     # migrate data objects from old bounty
-    if latest_old_bounty:
+    if latest_old_bounty and not is_same_bounty:
         # Pull the interested parties off the last old_bounty
         for interest in latest_old_bounty.interested.all().nocache():
             new_bounty.interested.add(interest)
@@ -646,7 +676,7 @@ def merge_bounty(latest_old_bounty, new_bounty, metadata, bounty_details, verbos
     if new_bounty.is_featured == True:
         new_bounty.save()
 
-    if latest_old_bounty:
+    if latest_old_bounty and not is_same_bounty:
         latest_old_bounty.current_bounty = False
         latest_old_bounty.save()
 
@@ -0,0 +1,98 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+import copy
+import time
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from dashboard.helpers import create_new_bounty
+from dashboard.models import Bounty, BountyVersion
+
+STANDARD_BOUNTIES_ID = 999999999
+
+
+def get_bounty_details(num_fulfillments):
+    now = int(timezone.now().timestamp())
+    payload = {
+        'webReferenceURL': f'https://github.com/gitcoinco/web/issues/{STANDARD_BOUNTIES_ID}',
+        'title': 'benchmark bounty',
+        'description': 'benchmark bounty ' * 200,
+        'created': now,
+        'tokenName': 'ETH',
+        'tokenAddress': '0x0000000000000000000000000000000000000000',
+        'issuer': {'githubUsername': 'gitcoinbot', 'address': '0x0000000000000000000000000000000000000000'},
+        'metadata': {'issueKeywords': 'python,django', 'bountyType': 'Bug'},
+    }
+    return {
+        'id': STANDARD_BOUNTIES_ID,
+        'network': 'benchmark',
+        'bountyStage': 1,
+        'balance': 10 ** 18,
+        'fulfillmentAmount': 10 ** 18,
+        'deadline': now + 60 * 60 * 24 * 30,
+        'token': '0x0000000000000000000000000000000000000000',
+        'fulfillments': [{'id': i, 'accepted': False, 'fulfiller': '0x0000000000000000000000000000000000000000'}
+                         for i in range(num_fulfillments)],
+        'data': {'payload': payload, 'meta': {'schemaName': 'gitcoinBounty'}},
+    }
+
+
+def get_table_size(model):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_total_relation_size(%s)', [model._meta.db_table])
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+
+    help = 'times on-chain bounty syncs in a rolled back transaction, without calling out to github'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--syncs', default=200, type=int, help='number of on-chain changes to sync')
+
+    def handle(self, *args, **options):
+        syncs = options['syncs']
+        with transaction.atomic(), \
+                patch.object(Bounty, 'fetch_issue_item', return_value=''), \
+                patch('dashboard.helpers.get_gh_issue_details', return_value={}):
+            old_bounties = Bounty.objects.filter(standard_bounties_id=STANDARD_BOUNTIES_ID, network='benchmark')
+            details = get_bounty_details(0)
+            create_new_bounty(old_bounties, details['data']['payload'], details, STANDARD_BOUNTIES_ID)
+            bounty_size = get_table_size(Bounty)
+            version_size = get_table_size(BountyVersion)
+
+            start = time.time()
+            for sync in range(1, syncs + 1):
+                details = copy.deepcopy(details)
+                details['balance'] += 10 ** 15
+                details['fulfillmentAmount'] += 10 ** 15
+                if sync % 10 == 0:
+                    details = get_bounty_details(len(details['fulfillments']) + 1)
+                create_new_bounty(old_bounties, details['data']['payload'], details, STANDARD_BOUNTIES_ID)
+            elapsed = time.time() - start
+
+            print(f'{syncs} syncs in {elapsed:.2f}s ({syncs / elapsed:.1f} syncs/s)')
+            num_versions = BountyVersion.objects.filter(bounty__in=old_bounties).count()
+            print(f'bounty rows: {old_bounties.count()}, version rows: {num_versions}')
+            print(f'bounty table grew {get_table_size(Bounty) - bounty_size} bytes, '
+                  f'version table grew {get_table_size(BountyVersion) - version_size} bytes')
+
+            transaction.set_rollback(True)
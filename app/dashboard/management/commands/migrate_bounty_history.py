@@ -0,0 +1,144 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+from django.apps import apps
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from dashboard.helpers import build_bounty_version
+from dashboard.models import Bounty, BountyFulfillment, BountyVersion
+
+
+def get_generic_relations():
+    """Yield every model with a GenericForeignKey, eg Earning.source, along with that field."""
+    for model in apps.get_models():
+        for field in model._meta.private_fields:
+            if isinstance(field, GenericForeignKey):
+                yield model, field
+
+
+def repoint_generic_relations(current, old_pks):
+    """Point the generic relations to superseded rows of a bounty, or to their fulfillments, at the current row.
+
+    A reference to an old fulfillment moves to the current row's copy of it, matched on the on-chain
+    fulfillment id and fulfiller address. It is deleted instead when that copy already has its own, eg the
+    Earning recorded when the copy of an accepted fulfillment was saved, or when there is no copy.
+
+    """
+    bounty_type = ContentType.objects.get_for_model(Bounty)
+    fulfillment_type = ContentType.objects.get_for_model(BountyFulfillment)
+    copies = {
+        (fulfillment.fulfillment_id, fulfillment.fulfiller_address.lower()): fulfillment.pk
+        for fulfillment in BountyFulfillment.objects.filter(bounty=current)
+    }
+    # newest first, so that the latest reference is the one which is kept
+    old_fulfillments = list(BountyFulfillment.objects.filter(bounty_id__in=old_pks).order_by('-pk'))
+    for model, field in get_generic_relations():
+        references = model._base_manager.filter(**{field.ct_field: fulfillment_type})
+        model._base_manager.filter(**{field.ct_field: bounty_type, f'{field.fk_field}__in': old_pks}).update(
+            **{field.fk_field: current.pk}
+        )
+        for fulfillment in old_fulfillments:
+            copy_pk = copies.get((fulfillment.fulfillment_id, fulfillment.fulfiller_address.lower()))
+            old_references = references.filter(**{field.fk_field: fulfillment.pk})
+            if copy_pk and not references.filter(**{field.fk_field: copy_pk}).exists():
+                old_references.update(**{field.fk_field: copy_pk})
+            else:
+                old_references.delete()
+
+
+def collapse_bounty_history(bounties):
+    """Collapse the rows of one on-chain bounty into its latest row plus BountyVersions.
+
+    Args:
+        bounties (list of dashboard.models.Bounty): The rows of one bounty, oldest first.
+
+    Returns:
+        int: The number of superseded rows which were removed.
+
+    Raises:
+        ValueError: If more than one row has a dependent through the same one-to-one relation, as
+            only one of them could be kept on the latest row. Nothing is changed for the bounty.
+
+    """
+    current = bounties[-1]
+    old_pks = [bounty.pk for bounty in bounties[:-1]]
+    for rel in [rel for rel in Bounty._meta.related_objects if rel.one_to_one]:
+        dependents = rel.related_model._base_manager.filter(**{f'{rel.field.name}__in': old_pks + [current.pk]})
+        if dependents.count() > 1:
+            raise ValueError(f'more than one of its rows has a {rel.related_model.__name__}')
+    versions = []
+    for old_bounty, new_bounty in zip(bounties, bounties[1:]):
+        version = build_bounty_version(old_bounty, new_bounty)
+        version.bounty = current
+        version.created_on = new_bounty.created_on
+        versions.append(version)
+
+    with transaction.atomic():
+        BountyVersion.objects.bulk_create(versions)
+        repoint_generic_relations(current, old_pks)
+        # the current row already has its own copy of every fulfillment
+        BountyFulfillment.objects.filter(bounty_id__in=old_pks).delete()
+        for rel in Bounty._meta.related_objects:
+            if rel.related_model in [BountyFulfillment, BountyVersion]:
+                continue
+            if rel.one_to_many or rel.one_to_one:
+                rel.related_model._base_manager.filter(**{f'{rel.field.name}__in': old_pks}).update(
+                    **{rel.field.name: current}
+                )
+            elif rel.many_to_many:
+                through = rel.through._base_manager
+                column = rel.field.m2m_reverse_field_name()
+                other_column = rel.field.m2m_field_name()
+                for link in through.filter(**{f'{column}__in': old_pks}):
+                    through.get_or_create(**{column: current, other_column: getattr(link, other_column)})
+                    link.delete()
+        Bounty.objects.filter(pk__in=old_pks).delete()
+        if not current.current_bounty:
+            Bounty.objects.filter(pk=current.pk).update(current_bounty=True)
+    return len(old_pks)
+
+
+class Command(BaseCommand):
+
+    help = 'collapses the full row clones of past bounty versions into BountyVersion diffs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', default=None, type=int, help='max number of bounties to migrate')
+
+    def handle(self, *args, **options):
+        groups = Bounty.objects.values('standard_bounties_id', 'network').annotate(num_rows=Count('pk')).filter(
+            num_rows__gt=1
+        ).order_by('standard_bounties_id', 'network')
+        if options['limit']:
+            groups = groups[:options['limit']]
+
+        migrated = 0
+        removed = 0
+        for group in groups:
+            bounties = list(Bounty.objects.nocache().filter(
+                standard_bounties_id=group['standard_bounties_id'], network=group['network']
+            ).order_by('created_on', 'pk'))
+            try:
+                removed += collapse_bounty_history(bounties)
+                migrated += 1
+            except Exception as e:
+                print(f"could not migrate {group['network']} bounty {group['standard_bounties_id']}: {e}")
+        print(f'migrated {migrated} bounties, removed {removed} superseded rows')
@@ -23,6 +23,7 @@ from django.utils import timezone
 from dashboard.helpers import record_bounty_activity
 from dashboard.models import Bounty, Profile, Tip
 from dashboard.tip_views import record_tip_activity
+from dashboard.utils import batch_activities
 
 
 class Command(BaseCommand):
@@ -43,12 +44,13 @@ class Command(BaseCommand):
                 print(e)
 
 
-        for tip in Tip.objects.filter(network='mainnet').filter(created_on__lt=timezone.datetime(2019,3,5)):
-            try:
-                record_tip_activity(tip, tip.username, 'new_tip', override_created=tip.created_on)
-                #print(tip.pk)
-            except Exception as e:
-                print(e)
+        with batch_activities():
+            for tip in Tip.objects.filter(network='mainnet').filter(created_on__lt=timezone.datetime(2019,3,5)):
+                try:
+                    record_tip_activity(tip, tip.username, 'new_tip', override_created=tip.created_on)
+                    #print(tip.pk)
+                except Exception as e:
+                    print(e)
 
 
         for instance in Profile.objects.filter(hide_profile=False):
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.4 on 2019-12-10 12:00
+
+import django.contrib.postgres.fields.jsonb
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import economy.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0066_hackathonevent_quest_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BountyVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(db_index=True, default=economy.models.get_time)),
+                ('modified_on', models.DateTimeField(default=economy.models.get_time)),
+                ('changes', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('raw_data_diff', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict)),
+                ('bounty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='dashboard.Bounty')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
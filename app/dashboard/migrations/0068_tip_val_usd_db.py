@@ -0,0 +1,18 @@
+# Generated by Django 2.2.4 on 2019-12-12 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0067_bountyversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='_val_usd_db',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=50, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.4 on 2019-12-12 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0068_tip_val_usd_db'),
+    ]
+
+    # handle__iexact lookups compare UPPER("handle"::text), which the unique index on handle can't serve.
+    # not unique, as handles that only differ in case are still around until cleanup_dupe_profiles merges them
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX dashboard_profile_handle_upper ON dashboard_profile (UPPER(handle::text));',
+            'DROP INDEX dashboard_profile_handle_upper;',
+        ),
+    ]
@@ -33,6 +33,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.humanize.templatetags.humanize import naturalday, naturaltime
 from django.contrib.postgres.fields import ArrayField, JSONField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import connection, models
 from django.db.models import Count, F, Q, Sum
@@ -1373,6 +1374,23 @@ class BountySyncRequest(SuperModel):
     processed = models.BooleanField()
 
 
+class BountyVersion(SuperModel):
+    """Define the append-only history of a Bounty's on-chain changes.
+
+    Bounties are updated in place when they change on chain, so each sync only
+    records the fields it changed (as `[old, new]` pairs) and a jsondiff of the
+    bounty's raw_data, rather than a full copy of the bounty.
+    """
+
+    bounty = models.ForeignKey('dashboard.Bounty', on_delete=models.CASCADE, related_name='versions')
+    changes = JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    raw_data_diff = JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        """Return the string representation of a BountyVersion."""
+        return f"{self.bounty_id} @ {self.created_on}: {', '.join(self.changes.keys())}"
+
+
 class RefundFeeRequest(SuperModel):
     """Define the Refund Fee Request model."""
     profile = models.ForeignKey(
@@ -1652,6 +1670,8 @@ class Tip(SendCryptoAsset):
     """ Inherit from SendCryptoAsset base class, and extra fields that are needed for Tips. """
     expires_date = models.DateTimeField(null=True, blank=True)
     comments_priv = models.TextField(default='', blank=True)
+    # usd value at the time of the tip, null until a conversion rate is available
+    _val_usd_db = models.DecimalField(null=True, blank=True, decimal_places=2, max_digits=50)
     recipient_profile = models.ForeignKey(
         'dashboard.Profile', related_name='received_tips', on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -1701,6 +1721,8 @@ def psave_tip(sender, instance, **kwargs):
         profiles = Profile.objects.filter(handle__iexact=instance.username)
         if profiles.exists():
             instance.recipient_profile = profiles.first()
+    if instance._val_usd_db is None:
+        instance._val_usd_db = instance.value_in_usdt_then
 
 
 @receiver(post_save, sender=Tip, dispatch_uid="post_save_tip")
@@ -3569,8 +3591,10 @@ class Profile(SuperModel):
         return all_activities.all().order_by('-created')
 
     def activate_avatar(self, avatar_pk):
+        from avatar.utils import invalidate_avatar_version
         self.avatar_baseavatar_related.update(active=False)
         self.avatar_baseavatar_related.filter(pk=avatar_pk).update(active=True)
+        invalidate_avatar_version(self.handle)
 
     def to_dict(self):
         """Get the dictionary representation with additional data.
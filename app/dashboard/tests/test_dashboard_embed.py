@@ -23,7 +23,7 @@ from decimal import Decimal
 from django.test.client import RequestFactory
 
 import pytz
-from dashboard.embed import embed, summarize_bounties, wrap_text
+from dashboard.embed import embed, get_repo_bounties_fingerprint, summarize_bounties, wrap_text
 from dashboard.models import Bounty
 from test_plus.test import TestCase
 
@@ -99,3 +99,23 @@ class DashboardEmbedTest(TestCase):
         assert embed(self.factory.get(
             'https://github.com/gitcoinco/web/issues/11?repo=https://github.com/gitcoinco/web'
         )).status_code in [200, 422]
+
+    @staticmethod
+    def test_get_repo_bounties_fingerprint():
+        bounties = Bounty.objects.filter(github_url__startswith='https://github.com/gitcoinco/web')
+        empty_fingerprint = get_repo_bounties_fingerprint(bounties)
+        bounty = Bounty.objects.create(
+            title='foo',
+            value_in_token=3,
+            token_name='ETH',
+            web3_created=datetime(2008, 10, 31, tzinfo=pytz.UTC),
+            github_url='https://github.com/gitcoinco/web/issues/11',
+            expires_date=datetime(2222, 11, 30, tzinfo=pytz.UTC),
+            raw_data={},
+        )
+        fingerprint = get_repo_bounties_fingerprint(bounties)
+        assert fingerprint != empty_fingerprint
+        assert get_repo_bounties_fingerprint(bounties) == fingerprint
+        bounty.title = 'bar'
+        bounty.save()
+        assert get_repo_bounties_fingerprint(bounties) != fingerprint
@@ -19,6 +19,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 import json
 from datetime import date, datetime, timedelta
+from decimal import Decimal
 from unittest.mock import patch
 
 from django.conf import settings
@@ -26,7 +27,9 @@ from django.test.client import RequestFactory
 
 import pytz
 import requests_mock
-from dashboard.helpers import amount, is_lowball_bounty, issue_details, normalize_url, process_bounty_details
+from dashboard.helpers import (
+    amount, build_bounty_version, is_lowball_bounty, issue_details, normalize_url, process_bounty_details,
+)
 from dashboard.models import Bounty
 from economy.models import ConversionRate
 from marketing.mails import featured_funded_bounty
@@ -60,3 +63,12 @@ class DashboardHelpersTest(TestCase):
     def test_normalize_url(self):
         """Test the dashboard helper normalize_url method."""
         assert normalize_url('https://gitcoin.co/') == 'https://gitcoin.co'
+
+    def test_build_bounty_version(self):
+        """Test the dashboard helper build_bounty_version method only records what changed."""
+        old_bounty = Bounty(title='foo', value_in_token=Decimal(1), raw_data={'balance': 1, 'fulfillments': []})
+        new_bounty = Bounty(title='foo', value_in_token='2', raw_data={'balance': 2, 'fulfillments': []})
+        version = build_bounty_version(old_bounty, new_bounty)
+        assert version.bounty == new_bounty
+        assert version.changes == {'value_in_token': [Decimal(1), Decimal(2)]}
+        assert version.raw_data_diff == {'balance': [1, 2]}
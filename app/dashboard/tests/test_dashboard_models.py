@@ -21,6 +21,7 @@ from datetime import date, datetime, timedelta
 
 from django.conf import settings
 from django.contrib.humanize.templatetags.humanize import naturaltime
+from django.db.models import Sum
 from django.utils import timezone
 
 import pytz
@@ -438,6 +439,22 @@ class DashboardModelsTest(TestCase):
         assert tip.value_in_usdt == 14
         assert tip.status == 'PENDING'
 
+    @staticmethod
+    def test_tip_stores_usd_value():
+        """Test the dashboard Tip model stores its usd value once, when it is first saved."""
+        tip = Tip.objects.create(
+            emails=['foo@bar.com'],
+            tokenName='DAI',
+            amount=5,
+            expires_date=datetime.now(tz=pytz.UTC) + timedelta(days=1),
+        )
+        assert tip._val_usd_db == 5
+        tip.amount = 6
+        tip.save()
+        tip.refresh_from_db()
+        assert tip._val_usd_db == 5
+        assert Tip.objects.aggregate(total=Sum('_val_usd_db'))['total'] == 5
+
     @staticmethod
     def test_interest():
         """Test the dashboard Interest model."""
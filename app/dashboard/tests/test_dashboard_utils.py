@@ -18,7 +18,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
 from datetime import datetime
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.conf import settings
 from django.test.client import RequestFactory
@@ -26,11 +26,12 @@ from django.utils import timezone
 
 import ipfshttpclient
 import pytest
-from dashboard.models import Bounty, Profile
+from dashboard.models import Activity, Bounty, BountyVersion, Profile
 from dashboard.utils import (
-    IPFSCantConnectException, apply_new_bounty_deadline, clean_bounty_url, create_user_action, get_bounty, get_ipfs,
-    get_ordinal_repr, get_web3, getBountyContract, humanize_event_name, ipfs_cat_ipfsapi, re_market_bounty,
-    release_bounty_to_the_public,
+    IPFSCantConnectException, NonceManager, apply_new_bounty_deadline, batch_activities, clean_bounty_url,
+    create_user_action, get_bounty, get_ipfs, get_ordinal_repr, get_profile_by_handle, get_web3, getBountyContract,
+    humanize_event_name, ipfs_cat_ipfsapi, re_market_bounty, record_activity, release_bounty_to_the_public,
+    web3_process_bounty,
 )
 from pytz import UTC
 from test_plus.test import TestCase
@@ -297,3 +298,127 @@ class DashboardUtilsTest(TestCase):
         assert bounty.bounty_reserved_for_user is None
         assert bounty.reserved_for_user_from is None
         assert bounty.reserved_for_user_expiration is None
+
+    @staticmethod
+    def test_nonce_manager_reserves_consecutive_ranges():
+        """Test the dashboard utility NonceManager hands out non overlapping nonces and only moves forward."""
+        w3 = MagicMock()
+        w3.eth.getTransactionCount.return_value = 5
+        nonce_manager = NonceManager(w3, '0xNonceManagerTest', floor=lambda: 3)
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+
+        assert nonce_manager.reserve(3) == 5
+        assert nonce_manager.reserve() == 8
+        assert w3.eth.getTransactionCount.call_count == 1
+
+        # a chain that lags behind our pending transactions doesn't rewind the counter
+        w3.eth.getTransactionCount.return_value = 6
+        assert nonce_manager.sync() == 9
+        w3.eth.getTransactionCount.return_value = 20
+        assert nonce_manager.sync() == 20
+        assert nonce_manager.reserve() == 20
+
+        # unused nonces can only be given back while nothing was reserved after them
+        assert nonce_manager.reserve(3) == 21
+        assert nonce_manager.release(22, 24)
+        assert nonce_manager.reserve() == 22
+        assert not nonce_manager.release(21, 22)
+        assert nonce_manager.reserve() == 23
+
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+
+    @staticmethod
+    def test_nonce_manager_rewinds_after_chain_is_stuck():
+        """Test the dashboard utility NonceManager gives back nonces that were reserved but never broadcast."""
+        w3 = MagicMock()
+        w3.eth.getTransactionCount.return_value = 5
+        nonce_manager = NonceManager(w3, '0xNonceManagerStuckTest', resync_interval=60)
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+
+        assert nonce_manager.reserve(3) == 5
+        # the chain is behind while the reserved nonces are in flight
+        assert nonce_manager.sync(now=1000) == 8
+        assert nonce_manager.sync(now=1030) == 8
+        # it advanced, so the grace period starts over
+        w3.eth.getTransactionCount.return_value = 6
+        assert nonce_manager.sync(now=1050) == 8
+        assert nonce_manager.sync(now=1100) == 8
+        # stuck at 6 for a whole resync interval, so nonces 6 and 7 were never broadcast
+        assert nonce_manager.sync(now=1110) == 6
+        assert nonce_manager.reserve() == 6
+
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+
+    @staticmethod
+    def test_batch_activities_writes_on_exit():
+        """Test the dashboard utility batch_activities inserts the recorded activities when the batch closes."""
+        profile = Profile.objects.create(data={}, handle='batchactivities')
+
+        with batch_activities() as activities:
+            assert get_profile_by_handle('@BatchActivities') == profile
+            for title in ['first', 'second', 'second']:
+                record_activity(
+                    profile=get_profile_by_handle('batchactivities'),
+                    activity_type='status_update',
+                    metadata={'title': title},
+                )
+            assert len(activities) == 3
+            assert not Activity.objects.filter(profile=profile).exists()
+
+        # the repeated activity is only written once, as post_add_activity would have left it
+        assert Activity.objects.filter(profile=profile, activity_type='status_update').count() == 2
+        assert get_profile_by_handle('nobody-has-this-handle') is None
+
+    @staticmethod
+    def test_get_profile_by_handle_prefers_newest_case_variant():
+        """Test the dashboard utility get_profile_by_handle ignores case and picks the newest duplicate."""
+        now = timezone.now()
+        Profile.objects.create(data={}, handle='CaseVariant', created_on=now - timezone.timedelta(days=1))
+        newest = Profile.objects.create(data={}, handle='casevariant', created_on=now)
+
+        assert get_profile_by_handle('CASEVARIANT') == newest
+        assert get_profile_by_handle('@caseVariant') == newest
+        assert get_profile_by_handle('') is None
+
+    @staticmethod
+    def test_web3_process_bounty_updates_bounty_in_place():
+        """Test the dashboard utility web3_process_bounty updates a known bounty and records a BountyVersion."""
+        bounty_details = {
+            'id': 4242,
+            'network': 'rinkeby',
+            'bountyStage': 1,
+            'fulfillmentAmount': 1,
+            'fulfillments': [],
+            'data': {
+                'meta': {'schemaName': 'gitcoinBounty'},
+                'payload': {'webReferenceURL': 'https://github.com/gitcoinco/web/issues/4242', 'metadata': {}},
+            },
+        }
+        bounty = Bounty.objects.create(
+            title='InPlaceUpdateTest',
+            idx_status='open',
+            is_open=True,
+            current_bounty=True,
+            standard_bounties_id=4242,
+            network='rinkeby',
+            value_in_token=1,
+            web3_created=datetime(2008, 10, 31, tzinfo=UTC),
+            expires_date=datetime(2008, 11, 30, tzinfo=UTC),
+            github_url='https://github.com/gitcoinco/web/issues/4242',
+            raw_data=bounty_details,
+        )
+        killed_details = dict(bounty_details, bountyStage=2)
+
+        with patch('dashboard.helpers.merge_bounty'), patch('dashboard.utils.process_bounty_changes'):
+            did_change, old_bounty, new_bounty = web3_process_bounty(killed_details)
+
+        assert did_change
+        assert old_bounty.pk == new_bounty.pk == bounty.pk
+        assert Bounty.objects.filter(standard_bounties_id=4242, network='rinkeby').count() == 1
+        bounty.refresh_from_db()
+        assert bounty.current_bounty
+        assert not bounty.is_open
+        assert bounty.raw_data == killed_details
+        version = BountyVersion.objects.get(bounty=bounty)
+        assert version.changes['is_open'] == [True, False]
+        assert version.raw_data_diff == {'bountyStage': [1, 2]}
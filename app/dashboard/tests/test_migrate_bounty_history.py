@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Test the collapsing of bounty row clones into BountyVersions.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from datetime import datetime
+
+from django.contrib.contenttypes.models import ContentType
+
+from dashboard.management.commands.migrate_bounty_history import collapse_bounty_history
+from dashboard.models import Bounty, BountyFulfillment, BountyVersion, Earning
+from pytz import UTC
+from test_plus.test import TestCase
+
+
+class CollapseBountyHistoryTest(TestCase):
+    """Define tests for collapse_bounty_history."""
+
+    def setUp(self):
+        """Perform setup for the testcase."""
+        self.bounties = [
+            Bounty.objects.create(
+                title=f'CollapseBountyHistoryTest {i}',
+                web3_created=datetime(2008, 10, 31, tzinfo=UTC),
+                expires_date=datetime(2008, 11, 30, tzinfo=UTC),
+                github_url='https://github.com/gitcoinco/web/issues/12345678',
+                standard_bounties_id=1,
+                network='rinkeby',
+                current_bounty=i == 2,
+                raw_data={},
+            ) for i in range(3)
+        ]
+        # every row clone carries its own copy of the fulfillment, accepted from the second one on
+        self.fulfillments = [
+            BountyFulfillment.objects.create(
+                bounty=bounty, fulfillment_id=0, fulfiller_address='0x0', accepted=i > 0,
+            ) for i, bounty in enumerate(self.bounties)
+        ]
+        self.fulfillment_type = ContentType.objects.get_for_model(BountyFulfillment)
+
+    def earnings(self):
+        return Earning.objects.filter(source_type=self.fulfillment_type)
+
+    def test_collapse_bounty_history(self):
+        """Test the old rows make way for BountyVersions on the latest row."""
+        self.assertEqual(collapse_bounty_history(self.bounties), 2)
+        self.assertEqual(list(Bounty.objects.filter(standard_bounties_id=1)), [self.bounties[2]])
+        self.assertEqual(BountyVersion.objects.filter(bounty=self.bounties[2]).count(), 2)
+        self.assertEqual(list(BountyFulfillment.objects.all()), [self.fulfillments[2]])
+
+    def test_collapse_bounty_history_drops_copied_earnings(self):
+        """Test the Earnings of the old fulfillments are deleted when the current copy has its own."""
+        self.assertEqual(self.earnings().count(), 2)
+        collapse_bounty_history(self.bounties)
+        self.assertEqual(list(self.earnings().values_list('source_id', flat=True)), [self.fulfillments[2].pk])
+
+    def test_collapse_bounty_history_repoints_earnings(self):
+        """Test the Earning of an old fulfillment moves to the current copy when that has none."""
+        self.earnings().filter(source_id=self.fulfillments[2].pk).delete()
+        earning = self.earnings().get(source_id=self.fulfillments[1].pk)
+        collapse_bounty_history(self.bounties)
+        earning.refresh_from_db()
+        self.assertEqual(earning.source, self.fulfillments[2])
+        self.assertEqual(self.earnings().count(), 1)
@@ -24,6 +24,7 @@ import logging
 
 from django.conf import settings
 from django.contrib import messages
+from django.db.models import Sum
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
@@ -31,7 +32,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.csrf import csrf_exempt
 
-from dashboard.utils import get_web3
+from dashboard.utils import get_profile_by_handle, get_web3, record_activity
 from dashboard.views import record_user_action
 from gas.utils import recommend_min_gas_price_to_confirm_in_time
 from git.utils import get_emails_by_category, get_github_primary_email
@@ -39,7 +40,7 @@ from ratelimit.decorators import ratelimit
 from retail.helpers import get_ip
 from web3 import Web3
 
-from .models import Activity, Profile, Tip
+from .models import Tip
 from .notifications import maybe_market_tip_to_email, maybe_market_tip_to_github, maybe_market_tip_to_slack
 
 logging.basicConfig(level=logging.DEBUG)
@@ -77,7 +78,7 @@ def record_tip_activity(tip, github_handle, event_name, override_created=None):
         }
     }
 
-    associated_profile = get_profile(github_handle)
+    associated_profile = get_profile_by_handle(github_handle)
     if associated_profile:
         kwargs['profile'] = associated_profile
 
@@ -88,7 +89,7 @@ def record_tip_activity(tip, github_handle, event_name, override_created=None):
         pass
 
     try:
-        Activity.objects.create(**kwargs)
+        record_activity(**kwargs)
     except Exception as e:
         logger.debug('error in record_tip_activity: %s - %s - %s - %s', e, event_name, tip, github_handle)
 
@@ -224,13 +225,7 @@ def send_tip_4(request):
 
 
 def get_profile(handle):
-    try:
-        to_profile = Profile.objects.get(handle__iexact=handle)
-    except Profile.MultipleObjectsReturned:
-        to_profile = Profile.objects.filter(handle__iexact=handle).order_by('-created_on').first()
-    except Profile.DoesNotExist:
-        to_profile = None
-    return to_profile
+    return get_profile_by_handle(handle)
 
 
 @ratelimit(key='ip', rate='5/m', method=ratelimit.UNSAFE, block=True)
@@ -328,12 +323,17 @@ def send_tip_3(request):
     is_over_tip_tx_limit = False
     is_over_tip_weekly_limit = False
     max_per_tip = request.user.profile.max_tip_amount_usdt_per_tx if request.user.is_authenticated and request.user.profile else 500
-    if tip.value_in_usdt_now:
-        is_over_tip_tx_limit = tip.value_in_usdt_now > max_per_tip
+    tip_value = float(tip._val_usd_db) if tip._val_usd_db else None
+    if tip_value:
+        is_over_tip_tx_limit = tip_value > max_per_tip
         if request.user.is_authenticated and request.user.profile:
-            tips_last_week_value = tip.value_in_usdt_now
-            tips_last_week = Tip.objects.send_happy_path().filter(sender_profile=get_profile(from_username), created_on__gt=timezone.now() - timezone.timedelta(days=7))
-            for this_tip in tips_last_week:
+            tips_last_week = Tip.objects.send_happy_path().filter(
+                sender_profile=tip.sender_profile,
+                created_on__gt=timezone.now() - timezone.timedelta(days=7),
+            )
+            tips_last_week_value = tip_value + float(tips_last_week.aggregate(total=Sum('_val_usd_db'))['total'] or 0)
+            # tips saved before their usd value was stored
+            for this_tip in tips_last_week.filter(_val_usd_db__isnull=True):
                 if this_tip.value_in_usdt_now:
                     tips_last_week_value += this_tip.value_in_usdt_now
             is_over_tip_weekly_limit = tips_last_week_value > request.user.profile.max_tip_amount_usdt_per_week
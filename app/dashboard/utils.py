@@ -21,20 +21,27 @@ import base64
 import json
 import logging
 import re
+import threading
+import time
+from contextlib import contextmanager
 from json.decoder import JSONDecodeError
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
 from django.urls import URLPattern, URLResolver
 from django.utils import timezone
 
 import ipfshttpclient
 import requests
+from app.redis_service import RedisService
 from app.utils import sync_profile
 from dashboard.helpers import UnsupportedSchemaException, normalize_url, process_bounty_changes, process_bounty_details
 from dashboard.models import Activity, BlockedUser, Bounty, Profile, UserAction
 from eth_utils import to_checksum_address
 from gas.utils import conf_time_spread, eth_usd_conv_rate, gas_advisories, recommend_min_gas_price_to_confirm_in_time
 from hexbytes import HexBytes
+from inbox.utils import collect_notifications
 from ipfshttpclient.exceptions import CommunicationError
 from pytz import UTC
 from web3 import HTTPProvider, Web3, WebsocketProvider
@@ -48,6 +55,8 @@ logger = logging.getLogger(__name__)
 SEMAPHORE_BOUNTY_SALT = '1'
 SEMAPHORE_BOUNTY_NS = 'bounty_processor'
 
+_activity_batch = threading.local()
+
 
 def all_sendcryptoasset_models():
     from revenue.models import DigitalGoodPurchase
@@ -734,18 +743,11 @@ def profile_helper(handle, suppress_profile_hidden_exception=False, current_user
     if current_profile and current_profile.handle == handle:
         return current_profile
 
-    try:
-        profile = Profile.objects.get(handle__iexact=handle)
-    except Profile.DoesNotExist:
+    profile = get_profile_by_handle(handle)
+    if not profile:
         profile = sync_profile(handle)
         if not profile:
             raise ProfileNotFoundException
-    except Profile.MultipleObjectsReturned as e:
-        # Handle edge case where multiple Profile objects exist for the same handle.
-        # We should consider setting Profile.handle to unique.
-        # TODO: Should we handle merging or removing duplicate profiles?
-        profile = Profile.objects.filter(handle__iexact=handle).latest('id')
-        logging.error(e)
 
     if profile.hide_profile and not profile.is_org and not suppress_profile_hidden_exception:
         raise ProfileHiddenException
@@ -753,6 +755,100 @@ def profile_helper(handle, suppress_profile_hidden_exception=False, current_user
     return profile
 
 
+def get_profile_by_handle(handle):
+    """Get the profile of a github handle, ignoring case and preferring the newest one when the handle is duplicated.
+
+    This is the one place to resolve a handle to a profile; the lookup is served by the UPPER(handle) index.
+    Lookups are memoized while an activity batch is open, since a batch usually repeats the same handles.
+
+    Args:
+        handle (str): The github handle, with or without a leading @.
+
+    Returns:
+        dashboard.models.Profile: The profile, or None if there is no profile for the handle.
+
+    """
+    handle = (handle or '').lstrip('@')
+    profiles = getattr(_activity_batch, 'profiles', None)
+    if profiles is not None and handle.lower() in profiles:
+        return profiles[handle.lower()]
+    profile = Profile.objects.filter(handle__iexact=handle).order_by('-created_on').first() if handle else None
+    if profiles is not None:
+        profiles[handle.lower()] = profile
+    return profile
+
+
+@contextmanager
+def batch_activities():
+    """Buffer the activities recorded by this thread and write them with `write_activities` on exit."""
+    if getattr(_activity_batch, 'activities', None) is not None:
+        # nested batches are written by the outermost one
+        yield _activity_batch.activities
+        return
+    _activity_batch.activities = []
+    _activity_batch.profiles = {}
+    try:
+        yield _activity_batch.activities
+        write_activities(_activity_batch.activities)
+    finally:
+        _activity_batch.activities = None
+        _activity_batch.profiles = None
+
+
+def record_activity(**kwargs):
+    """Create an activity, or add it to the open activity batch of this thread."""
+    activity = Activity(**kwargs)
+    buffer = getattr(_activity_batch, 'activities', None)
+    if buffer is None:
+        activity.save()
+    else:
+        buffer.append(activity)
+    return activity
+
+
+def dedupe_activities(activities):
+    """Drop the activities repeated within a batch, keeping the latest one like post_add_activity does."""
+    latest = {}
+    for activity in activities:
+        key = (
+            activity.profile_id, activity.bounty_id, activity.tip_id, activity.kudos_id, activity.grant_id,
+            activity.subscription_id, activity.activity_type, activity.needs_review,
+            json.dumps(activity.metadata, sort_keys=True, default=str),
+        )
+        latest[key] = id(activity)
+    kept = set(latest.values())
+    return [activity for activity in activities if id(activity) in kept]
+
+
+def write_activities(activities):
+    """Insert the activities in one query, then run their post_save receivers with the notifications batched."""
+    activities = dedupe_activities(activities)
+    if not activities:
+        return
+    try:
+        with transaction.atomic():
+            Activity.objects.bulk_create(activities)
+    except Exception as e:
+        # don't lose the whole batch to one bad row, saving fires the receivers as usual
+        logger.warning(f'write_activities: bulk insert failed, saving activities one by one: {e}')
+        for activity in activities:
+            try:
+                activity.save()
+            except Exception as e:
+                logger.warning(f'write_activities: could not save {activity}: {e}')
+        return
+
+    with collect_notifications():
+        for activity in activities:
+            responses = post_save.send_robust(
+                sender=Activity, instance=activity, created=True, update_fields=None, raw=False,
+                using=Activity.objects.db,
+            )
+            for receiver, response in responses:
+                if isinstance(response, Exception):
+                    logger.warning(f'write_activities: {receiver.__name__} failed for {activity}: {response}')
+
+
 def get_tx_status(txid, network, created_on):
     from django.utils import timezone
     from dashboard.utils import get_web3
@@ -834,6 +930,87 @@ def get_nonce(network, address):
     return new_nonce
 
 
+class NonceManager:
+    """Hand out transaction nonces for an account without an RPC round trip per transaction.
+
+    Reservations are an atomic INCRBY on a redis counter, so concurrent callers
+    never get overlapping nonces.  The counter is only resynced with the chain
+    (and the optional `floor`, eg the last nonce recorded in the db) once every
+    `resync_interval` seconds.  A resync moves the counter forward straight away,
+    but only moves it back once the chain has been stuck below it for a whole
+    `resync_interval`, ie when reserved nonces were never broadcast.
+    """
+
+    # set the counter to max(counter, ARGV[1]) atomically, or rewind it to ARGV[1] when the chain has been stuck
+    # at that nonce since at least ARGV[2] - ARGV[3].  KEYS[2] holds the nonce the chain is stuck at and since when
+    SYNC_SCRIPT = """
+    local current = tonumber(redis.call('get', KEYS[1]))
+    local synced = tonumber(ARGV[1])
+    local now = tonumber(ARGV[2])
+    if current == nil or synced >= current then
+        redis.call('set', KEYS[1], synced)
+        redis.call('del', KEYS[2])
+        return synced
+    end
+    local stuck_at = tonumber(redis.call('hget', KEYS[2], 'nonce'))
+    if stuck_at ~= synced then
+        redis.call('hmset', KEYS[2], 'nonce', synced, 'since', now)
+        return current
+    end
+    if now - tonumber(redis.call('hget', KEYS[2], 'since')) >= tonumber(ARGV[3]) then
+        redis.call('set', KEYS[1], synced)
+        redis.call('del', KEYS[2])
+        return synced
+    end
+    return current
+    """
+
+    # give the nonces from ARGV[1] up to ARGV[2] back, but only if nothing was reserved after them
+    RELEASE_SCRIPT = """
+    if tonumber(redis.call('get', KEYS[1])) == tonumber(ARGV[2]) then
+        redis.call('set', KEYS[1], ARGV[1])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, w3, account, floor=None, resync_interval=60):
+        self.w3 = w3
+        self.account = account
+        self.floor = floor
+        self.resync_interval = resync_interval
+        self.redis = RedisService().redis
+        self.key = f'nonce:{account.lower()}'
+        self.synced_key = f'nonce_synced:{account.lower()}'
+        self.stuck_key = f'nonce_stuck:{account.lower()}'
+
+    def sync(self, now=None):
+        """Move the counter to the chain's pending transaction count (or the floor), see SYNC_SCRIPT."""
+        nonce = self.w3.eth.getTransactionCount(self.account, 'pending')
+        if self.floor:
+            nonce = max(nonce, self.floor())
+        now = time.time() if now is None else now
+        return int(self.redis.eval(self.SYNC_SCRIPT, 2, self.key, self.stuck_key, nonce, now, self.resync_interval))
+
+    def reserve(self, count=1):
+        """Reserve `count` consecutive nonces and return the first one."""
+        if not self.redis.exists(self.key) or self.redis.set(self.synced_key, 1, nx=True, ex=self.resync_interval):
+            self.sync()
+        return self.redis.incrby(self.key, count) - count
+
+    def release(self, nonce, end):
+        """Give back the reserved nonces from `nonce` up to `end`, eg when their transactions were rejected.
+
+        Only the tail of the counter can be given back: when other nonces were reserved after `end` in the
+        meantime, the gap is left for `sync` to rewind once the chain is stuck on it.
+
+        Returns:
+            bool: Whether the nonces were given back.
+
+        """
+        return bool(self.redis.eval(self.RELEASE_SCRIPT, 1, self.key, nonce, end))
+
+
 def re_market_bounty(bounty, auto_save = True):
     remarketed_count = bounty.remarketed_count
     if remarketed_count < settings.RE_MARKET_LIMIT:
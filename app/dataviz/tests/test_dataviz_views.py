@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Handle dataviz view related tests.
+
+Copyright (C) 2018 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from django.utils import timezone
+
+from dataviz.views import cohort_helper_counts
+from marketing.models import SlackPresence, SlackUser
+from test_plus.test import TestCase
+
+
+class DatavizViewsTest(TestCase):
+    """Define tests for dataviz views."""
+
+    def setUp(self):
+        """Perform setup for the testcase."""
+        self.now = timezone.now()
+        week = timezone.timedelta(weeks=1)
+        # one user joined 3 weeks ago and was online 2 weeks ago and last week, one joined 2 weeks ago
+        first = SlackUser.objects.create(username='first', email='first@gitcoin.co', created_on=self.now - week * 2.5)
+        second = SlackUser.objects.create(
+            username='second', email='second@gitcoin.co', created_on=self.now - week * 1.5
+        )
+        for slackuser, weeks_ago in [(first, 1.5), (first, 1.2), (first, 0.5), (second, 0.5), (second, 0.2)]:
+            SlackPresence.objects.create(slackuser=slackuser, status='active', created_on=self.now - week * weeks_ago)
+        SlackPresence.objects.create(slackuser=second, status='away', created_on=self.now - week * 0.5)
+
+    def test_cohort_helper_counts(self):
+        """Test the dataviz cohort_helper_counts method builds the triangle with one query per grouping."""
+        with self.assertNumQueries(2):
+            sizes, usage = cohort_helper_counts('slack-online', self.now, 'weeks', 20)
+        assert sizes == {3: 1, 2: 1}
+        assert usage == {(3, 2): 1, (3, 1): 1, (2, 1): 1}
@@ -18,6 +18,8 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Extract, Floor
 from django.template.response import TemplateResponse
 from django.utils import timezone
 
@@ -80,36 +82,29 @@ def stats(request):
         'tables': {},
     }
 
+    series = Stat.objects.rollup(rollup).series(types)
     for t in types:
+        if series[t]:
+            params['tables'][t] = series[t]
 
-        # get data
-        source = Stat.objects.filter(key=t)
-        if rollup == 'daily':
-            source = source.filter(created_on__hour=1)
-            source = source.filter(created_on__gt=(timezone.now() - timezone.timedelta(days=30)))
-        elif rollup == 'weekly':
-            source = source.filter(created_on__hour=1, created_on__week_day=1)
-            source = source.filter(created_on__gt=(timezone.now() - timezone.timedelta(days=30 * 3)))
-        else:
-            source = source.filter(created_on__gt=(timezone.now() - timezone.timedelta(days=2)))
+    if _format == 'chart' and params['tables']:
+        # one rolled up query feeds the charts of every key
+        chart_types = list(params['tables'].keys())
+        chartdata = DataPool(series=[{
+            'options': {'source': Stat.objects.rollup(rollup).pivot(chart_types)},
+            'terms': ['date'] + [{t: f'val_{i}'} for i, t in enumerate(chart_types)],
+        }])
 
-        if source.count():
-            # tables
-            params['tables'][t] = source
+        for t in chart_types:
+            stats = series[t]
 
-            # charts
             # compute avg
-            total = 0
-            count = source.count() - 1
+            count = len(stats) - 1
             avg = "NA"
             if count > 1:
-                for i in range(0, count):
-                    total += (source[i + 1].val - source[i].val)
-                avg = round(total / count, 1)
+                avg = round(sum(stat.delta for stat in stats[1:]) / count, 1)
                 avg = str("+{}".format(avg) if avg > 0 else avg)
 
-            chartdata = DataPool(series=[{'options': {'source': source}, 'terms': ['created_on', 'val']}])
-
             cht = Chart(
                 datasource=chartdata,
                 series_options=[{
@@ -118,7 +113,7 @@ def stats(request):
                         'stacking': False
                     },
                     'terms': {
-                        'created_on': ['val']
+                        'date': [t]
                     }
                 }],
                 chart_options={
@@ -140,24 +135,24 @@ def stats(request):
     return TemplateResponse(request, 'stats.html', params)
 
 
-def cohort_helper_users(start_time, end_time, data_source):
-    if 'profile' in data_source:
-        users = Profile.objects.filter(
-            created_on__gte=start_time, created_on__lt=end_time
-        ).exclude(github_access_token='').distinct()
-    elif data_source == 'slack-online':
-        users = SlackUser.objects.filter(created_on__gte=start_time, created_on__lt=end_time).distinct()
-    else:
-        users = EmailSubscriber.objects.filter(created_on__gte=start_time, created_on__lt=end_time).distinct()
-    return users
+def cohort_helper_bucket(field, now, period_seconds):
+    """Number the period `field` falls into, counting back from `now` with 1 being the most recent period."""
+    age = ExpressionWrapper(Value(now, output_field=DateTimeField()) - F(field), output_field=DurationField())
+    return Floor(Extract(age, 'epoch') / period_seconds) + 1
+
 
+def cohort_helper_sources(data_source):
+    """Get the user and activity querysets for a data source.
 
-def cohort_helper_num(inner_start_time, inner_end_time, data_source, users):
+    Returns:
+        tuple: The users queryset, the activity queryset, the path from an activity to its
+            user, and the path from an activity to the user's `created_on`.
+
+    """
     if 'profile' in data_source:
+        users = Profile.objects.exclude(github_access_token='')
         if data_source == 'profile-githubinteraction':
-            num = GithubEvent.objects.filter(
-                profile__in=users, created_on__gte=inner_start_time, created_on__lt=inner_end_time,
-            ).distinct('profile').count()
+            activities = GithubEvent.objects.all()
         else:
             event = 'start_work'
             if data_source == 'profile-login':
@@ -166,22 +161,53 @@ def cohort_helper_num(inner_start_time, inner_end_time, data_source, users):
                 event = 'Visit'
             if data_source == 'profile-new_bounty':
                 event = 'new_bounty'
-            num = UserAction.objects.filter(
-                profile__in=users, created_on__gte=inner_start_time, created_on__lt=inner_end_time, action=event,
-            ).distinct('profile').count()
+            activities = UserAction.objects.filter(action=event)
+        activities = activities.exclude(profile__github_access_token='')
+        return users, activities, 'profile', 'profile__created_on'
     elif data_source == 'slack-online':
-        num = SlackPresence.objects.filter(
-            slackuser__in=users, created_on__gte=inner_start_time, created_on__lt=inner_end_time, status='active',
-        ).distinct('slackuser').count()
-    else:
-        event = data_source.split('-')[1]
-        num = EmailEvent.objects.filter(
-            email__in=users.values_list('email', flat=True),
-            created_on__gte=inner_start_time,
-            created_on__lt=inner_end_time,
-            event=event,
-        ).distinct('email').count()
-    return num
+        activities = SlackPresence.objects.filter(status='active')
+        return SlackUser.objects.all(), activities, 'slackuser', 'slackuser__created_on'
+    event = data_source.split('-')[1]
+    activities = EmailEvent.objects.filter(event=event).annotate(
+        subscriber_created_on=Subquery(
+            EmailSubscriber.objects.filter(email=OuterRef('email')).order_by('created_on').values('created_on')[:1]
+        )
+    )
+    return EmailSubscriber.objects.all(), activities, 'email', 'subscriber_created_on'
+
+
+def cohort_helper_counts(data_source, now, period_size, num_periods):
+    """Compute the cohort retention triangle with one grouped query for the sizes and one for the usage.
+
+    Cohort `i` holds the users created in the `i`th period before `now`, and its usage in period `k`
+    is the number of distinct users of the cohort with activity in the `k`th period before `now`.
+
+    Returns:
+        tuple: The dict of cohort sizes keyed by `i` and the dict of usage keyed by `(i, k)`.
+
+    """
+    period_seconds = timezone.timedelta(**cohort_helper_timedelta(1, period_size)).total_seconds()
+    start_time = now - timezone.timedelta(**cohort_helper_timedelta(num_periods - 1, period_size))
+    users, activities, user_path, user_created_on_path = cohort_helper_sources(data_source)
+
+    sizes = users.filter(created_on__gte=start_time, created_on__lt=now).annotate(
+        cohort_idx=cohort_helper_bucket('created_on', now, period_seconds)
+    ).values('cohort_idx').annotate(num=Count('pk', distinct=True)).values_list('cohort_idx', 'num')
+
+    usage = activities.filter(created_on__gte=start_time, created_on__lt=now).filter(**{
+        f'{user_created_on_path}__gte': start_time,
+        f'{user_created_on_path}__lt': now,
+    }).annotate(
+        cohort_idx=cohort_helper_bucket(user_created_on_path, now, period_seconds),
+        period_idx=cohort_helper_bucket('created_on', now, period_seconds),
+    ).values('cohort_idx', 'period_idx').annotate(num=Count(user_path, distinct=True)).values_list(
+        'cohort_idx', 'period_idx', 'num'
+    )
+
+    return (
+        {int(i): num for i, num in sizes},
+        {(int(i), int(k)): num for i, k, num in usage if k < i},
+    )
 
 
 def cohort_helper_timedelta(i, period_size):
@@ -197,20 +223,18 @@ def cohort(request):
     cohorts = {}
 
     data_source = request.GET.get('data_source', 'slack-online')
-    num_periods = request.GET.get('num_periods', 20)
+    num_periods = int(request.GET.get('num_periods', 20))
     period_size = request.GET.get('period_size', 'weeks')
-    kwargs = {}
+    now = timezone.now()
+    sizes, usage = cohort_helper_counts(data_source, now, period_size, num_periods)
 
     for i in range(1, num_periods):
-        start_time = timezone.now() - timezone.timedelta(**cohort_helper_timedelta(i, period_size))
-        end_time = timezone.now() - timezone.timedelta(**cohort_helper_timedelta(i - 1, period_size))
-        users = cohort_helper_users(start_time, end_time, data_source)
-        num_entries = users.count()
+        start_time = now - timezone.timedelta(**cohort_helper_timedelta(i, period_size))
+        end_time = now - timezone.timedelta(**cohort_helper_timedelta(i - 1, period_size))
+        num_entries = sizes.get(i, 0)
         usage_by_time_period = {}
         for k in range(1, i):
-            inner_start_time = timezone.now() - timezone.timedelta(**cohort_helper_timedelta(k, period_size))
-            inner_end_time = timezone.now() - timezone.timedelta(**cohort_helper_timedelta(k - 1, period_size))
-            num = cohort_helper_num(inner_start_time, inner_end_time, data_source, users)
+            num = usage.get((i, k), 0)
             pct = round(num / num_entries, 2) if num_entries else 0
             usage_by_time_period[k] = {'num': num, 'pct_float': pct, 'pct_int': int(pct * 100), }
         cohorts[i] = {
@@ -233,32 +257,28 @@ def cohort(request):
     return TemplateResponse(request, 'cohort.html', params)
 
 
-def funnel_helper_get_data(key, k, daily_source, weekly_source, start_date, end_date):
+FUNNEL_STAT_KEYS = {
+    'email_subscribers': 'email_subscriberse',
+    'bounties_alltime': 'bounties',
+    'bounties_fulfilled': 'bounties_fulfilled',
+    'email_processed': 'email_processed',
+    'slack_users': 'slack_users',
+    'email_open': 'email_open',
+    'email_click': 'email_click',
+}
+
+
+def funnel_helper_get_data(key, k, daily_series, weekly_series, start_date, end_date):
     if key == 'sessions':
         return sum(
-            daily_source.filter(
-                key='google_analytics_sessions_gitcoin', created_on__gte=start_date, created_on__lt=end_date
-            ).values_list('val', flat=True)
+            stat.val for stat in daily_series['google_analytics_sessions_gitcoin']
+            if start_date <= stat.created_on < end_date
         )
-    if key == 'email_subscribers':
-        return weekly_source.filter(key='email_subscriberse')[k].val - weekly_source.filter(key='email_subscriberse'
-                                                                                            )[k + 1].val
-    if key == 'bounties_alltime':
-        return weekly_source.filter(key='bounties')[k].val - weekly_source.filter(key='bounties')[k + 1].val
-    if key == 'bounties_fulfilled':
-        return weekly_source.filter(key='bounties_fulfilled')[k].val - weekly_source.filter(key='bounties_fulfilled'
-                                                                                            )[k + 1].val
-    if key == 'email_processed':
-        return weekly_source.filter(key='email_processed')[k].val - weekly_source.filter(key='email_processed'
-                                                                                         )[k + 1].val
-    if key == 'slack_users':
-        return weekly_source.filter(key='slack_users')[k].val - weekly_source.filter(key='slack_users')[k + 1].val
-    if key == 'email_open':
-        return weekly_source.filter(key='email_open')[k].val - weekly_source.filter(key='email_open')[k + 1].val
-    if key == 'email_click':
-        return weekly_source.filter(key='email_click')[k].val - weekly_source.filter(key='email_click')[k + 1].val
+    if key in FUNNEL_STAT_KEYS:
+        stats = weekly_series[FUNNEL_STAT_KEYS[key]]
+        return stats[k].val - stats[k + 1].val
     try:
-        return weekly_source.filter(key=key)[k].val - weekly_source.filter(key=key)[k + 1].val
+        return weekly_series[key][k].val - weekly_series[key][k + 1].val
     except Exception:
         return 0
 
@@ -266,8 +286,6 @@ def funnel_helper_get_data(key, k, daily_source, weekly_source, start_date, end_
 @staff_member_required
 def funnel(request):
 
-    weekly_source = Stat.objects.filter(created_on__hour=1, created_on__week_day=1).order_by('-created_on')
-    daily_source = Stat.objects.filter(created_on__hour=1).order_by('-created_on')
     funnels = [{
         'title': 'web => bounties_posted => bounties_fulfilled',
         'keys': ['sessions', 'bounties_alltime', 'bounties_fulfilled', ],
@@ -297,6 +315,13 @@ def funnel(request):
         'data': []
     }, ]
 
+    keys = set(FUNNEL_STAT_KEYS.values()).union(*[funnel['keys'] for funnel in funnels])
+    weekly_series = Stat.objects.rollup('weekly').series(keys, newest_first=True)
+    periods = weekly_series['email_subscriberse'][:11]
+    daily_series = Stat.objects.filter(created_on__hour=1).filter(
+        created_on__gte=periods[-1].created_on if periods else timezone.now()
+    ).series(['google_analytics_sessions_gitcoin'])
+
     for funnel in range(0, len(funnels)):
         keys = funnels[funnel]['keys']
         title = funnels[funnel]['title']
@@ -304,13 +329,13 @@ def funnel(request):
         for k in range(0, 10):
             try:
                 stats = []
-                end_date = weekly_source.filter(key='email_subscriberse')[k].created_on
-                start_date = weekly_source.filter(key='email_subscriberse')[k + 1].created_on
+                end_date = periods[k].created_on
+                start_date = periods[k + 1].created_on
 
                 for key in keys:
                     stats.append({
                         'key': key,
-                        'val': funnel_helper_get_data(key, k, daily_source, weekly_source, start_date, end_date),
+                        'val': funnel_helper_get_data(key, k, daily_series, weekly_series, start_date, end_date),
                     })
 
                 for i in range(1, len(stats)):
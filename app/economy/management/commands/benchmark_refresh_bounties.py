@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Define the management command to time the bounty USD value refresh of get_prices.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import time
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from dashboard.models import Bounty
+from economy.management.commands.get_prices import refresh_bounties
+from economy.models import ConversionRate
+
+TOKENS = ['ETH', 'BENCHA', 'BENCHB', 'BENCHC']
+
+
+def legacy_refresh_bounties(bounties):
+    """Re-save every bounty, as get_prices did before the set based refresh."""
+    for bounty in bounties:
+        try:
+            bounty._val_usd_db = bounty.value_in_usdt
+            bounty._val_usd_db_now = bounty.value_in_usdt_now
+            bounty.save()
+        except Exception as e:
+            print(e)
+            bounty._val_usd_db = 0
+            bounty._val_usd_db_now = 0
+            bounty.save()
+
+
+class Command(BaseCommand):
+    """Define the management command to benchmark the bounty refresh."""
+
+    help = 'seeds bounties in a rolled back transaction and times the get_prices bounty refresh, before and after'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bounties', default=2000, type=int, help='bounties to seed, half of them closed')
+
+    def timed(self, label, func):
+        start = time.time()
+        func()
+        print(f'{label}: {time.time() - start:.2f}s')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        with transaction.atomic(), patch.object(Bounty, 'fetch_issue_item', return_value=''):
+            for days, token_name in enumerate(TOKENS):
+                for timestamp in [now - timezone.timedelta(days=365 + days), now]:
+                    ConversionRate.objects.create(
+                        from_amount=1, to_amount=days + 2, source='benchmark', from_currency=token_name,
+                        to_currency='USDT', timestamp=timestamp,
+                    )
+
+            bounties = []
+            for i in range(options['bounties']):
+                is_open = i % 2 == 0
+                bounties.append(Bounty(
+                    title='benchmark bounty',
+                    value_in_token=(i % 10 + 1) * 10**18,
+                    value_true=i % 10 + 1,
+                    token_name=TOKENS[i % len(TOKENS)],
+                    web3_created=now - timezone.timedelta(days=i % 300),
+                    github_url=f'https://github.com/gitcoinco/web/issues/{i}',
+                    token_address='0x0',
+                    network='benchmark',
+                    is_open=is_open,
+                    accepted=not is_open,
+                    idx_status='open' if is_open else 'done',
+                    expires_date=now + timezone.timedelta(days=30),
+                    raw_data={},
+                    current_bounty=True,
+                ))
+            Bounty.objects.bulk_create(bounties, batch_size=1000)
+            print(f"seeded {options['bounties']} bounties")
+
+            seeded = Bounty.objects.filter(network='benchmark')
+            self.timed('refresh_bounties, closed bounties not valued yet', refresh_bounties)
+            self.timed('refresh_bounties, closed bounties valued', refresh_bounties)
+            self.timed('legacy per bounty save', lambda: legacy_refresh_bounties(seeded))
+
+            transaction.set_rollback(True)
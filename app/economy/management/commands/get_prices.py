@@ -18,33 +18,35 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
 import json
+from collections import defaultdict
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 import ccxt
 import cryptocompare as cc
 from dashboard.models import Bounty, Tip
 from economy.models import ConversionRate
+from economy.utils import ConversionRateNotFoundError, build_conversion_rates, convert_token_to_usdt
 from grants.models import Contribution
 from kudos.models import KudosTransfer
 from websocket import create_connection
 
 
 def stablecoins():
+    rates = []
     for to_currency in settings.STABLE_COINS:
         if to_currency == 'to_currency':
             continue
         from_amount = 1
         to_amount = 1
         from_currency = 'USDT'
-        ConversionRate.objects.create(
-            from_amount=from_amount,
-            to_amount=to_amount,
-            source='stablecoin',
-            from_currency=from_currency,
-            to_currency=to_currency)
+        rates += build_conversion_rates(from_amount, to_amount, 'stablecoin', from_currency, to_currency)
         print(f'stablecoin: {from_currency}=>{to_currency}:{to_amount}')
+    ConversionRate.objects.bulk_create(rates)
 
 
 def etherdelta():
@@ -75,27 +77,25 @@ def etherdelta():
         print('Failed to retrieve etherdelta ticker data!')
 
     # etherdelta
+    rates = []
     for pair, result in tickers.items():
         from_currency = pair.split('_')[1]
         to_currency = pair.split('_')[0]
 
         from_amount = 1
-        to_amount = (result['bid'] + result['ask']) / 2
         try:
-            ConversionRate.objects.create(
-                from_amount=from_amount,
-                to_amount=to_amount,
-                source='etherdelta',
-                from_currency=from_currency,
-                to_currency=to_currency)
+            to_amount = (result['bid'] + result['ask']) / 2
+            rates += build_conversion_rates(from_amount, to_amount, 'etherdelta', from_currency, to_currency)
             print(f'Etherdelta: {from_currency}=>{to_currency}:{to_amount}')
         except Exception as e:
             print(e)
+    ConversionRate.objects.bulk_create(rates)
 
 
 def polo():
     """Handle pulling market data from Poloneix."""
     tickers = ccxt.poloniex().load_markets()
+    rates = []
     for pair, result in tickers.items():
         from_currency = pair.split('/')[0]
         to_currency = pair.split('/')[1]
@@ -103,32 +103,84 @@ def polo():
         from_amount = 1
         try:
             to_amount = (float(result['info']['highestBid']) + float(result['info']['lowestAsk'])) / 2
-            ConversionRate.objects.create(
-                from_amount=from_amount,
-                to_amount=to_amount,
-                source='poloniex',
-                from_currency=from_currency,
-                to_currency=to_currency)
+            rates += build_conversion_rates(from_amount, to_amount, 'poloniex', from_currency, to_currency)
             print(f'Poloniex: {from_currency}=>{to_currency}:{to_amount}')
         except Exception as e:
             print(e)
+    ConversionRate.objects.bulk_create(rates)
+
+
+def get_token_rate(token_name, when=None):
+    """Get the USDT rate of the token at `when` (now if None), or None if there is no rate for it."""
+    try:
+        return 1 if token_name in settings.STABLE_COINS else convert_token_to_usdt(token_name, when)
+    except ConversionRateNotFoundError as e:
+        print(e)
+        return None
+
+
+def refresh_open_bounties(bounties):
+    """Apply the current rate of each token to `value_true` in one UPDATE over the bounties."""
+    whens = []
+    for token_name in bounties.values_list('token_name', flat=True).distinct():
+        rate = get_token_rate(token_name)
+        if rate is not None:
+            whens.append(When(token_name=token_name, then=Value(rate)))
+
+    rate_now = Case(*whens, default=Value(None), output_field=DecimalField())
+    usd_now = F('value_true') * rate_now
+    val_usd_db = Coalesce(usd_now, Value(0), output_field=DecimalField())
+    bounties.update(_val_usd_db_now=val_usd_db, value_in_usdt_now=usd_now)
+    return bounties.filter(idx_status__in=Bounty.OPEN_STATUSES).update(
+        _val_usd_db=val_usd_db,
+        value_in_usdt=usd_now,
+        token_value_in_usdt=rate_now,
+        token_value_time_peg=Value(timezone.now()),
+    )
+
+
+def refresh_closed_bounties(bounties):
+    """Fill in the USD value of closed bounties which don't have one yet, at the rate of their creation.
+
+    Their value never changes once it is known, so only the rows still at 0 (eg because the historical
+    rate was only backfilled by `cryptocompare`) are updated, with one UPDATE per (token, rate).
+    """
+    unvalued = bounties.exclude(idx_status__in=Bounty.OPEN_STATUSES).filter(_val_usd_db=0)
+    rates = {}
+    pks_by_rate = defaultdict(list)
+    for pk, token_name, when in unvalued.values_list('pk', 'token_name', 'web3_created'):
+        if (token_name, when) not in rates:
+            rates[(token_name, when)] = get_token_rate(token_name, when)
+        rate = rates[(token_name, when)]
+        if rate:
+            pks_by_rate[(token_name, rate)].append(pk)
+
+    for (token_name, rate), pks in pks_by_rate.items():
+        usd_then = F('value_true') * Value(rate, output_field=DecimalField())
+        Bounty.objects.filter(pk__in=pks).update(
+            _val_usd_db=usd_then,
+            value_in_usdt=usd_then,
+            token_value_in_usdt=Value(rate, output_field=DecimalField()),
+            token_value_time_peg=F('web3_created'),
+        )
+    return sum(len(pks) for pks in pks_by_rate.values())
 
 
 def refresh_bounties():
-    for bounty in Bounty.objects.all():
-        print(f'refreshed {bounty.pk}')
-        try:
-            bounty._val_usd_db = bounty.value_in_usdt
-            bounty._val_usd_db_now = bounty.value_in_usdt_now
-            bounty.save()
-        except Exception as e:
-            print(e)
-            bounty._val_usd_db = 0
-            bounty._val_usd_db_now = 0
-            bounty.save()
+    """Refresh the denormalized USD values of current bounties with set based UPDATEs.
+
+    Rather than re-saving (and re-running the presave of) every bounty, open bounties get the current
+    rate of their token and closed bounties the rate at their creation, looked up once per token (and time).
+
+    """
+    bounties = Bounty.objects.current()
+    num_open = refresh_open_bounties(bounties)
+    num_closed = refresh_closed_bounties(bounties)
+    print(f'refreshed {num_open} open bounties and {num_closed} closed bounties')
 
 
 def refresh_conv_rate(when, token_name):
+    """Build the historical ConversionRates for the token at `when` if none exist yet."""
     to_currency = 'USDT'
     conversion_rate = ConversionRate.objects.filter(
         from_currency=token_name,
@@ -136,22 +188,16 @@ def refresh_conv_rate(when, token_name):
         timestamp=when
     )
 
-    if not conversion_rate:  # historical ConversionRate for the given bounty does not exist yet
+    if not conversion_rate.exists():  # historical ConversionRate for the given bounty does not exist yet
         try:
             price = cc.get_historical_price(token_name, to_currency, when)
 
             to_amount = price[token_name][to_currency]
-            ConversionRate.objects.create(
-                from_amount=1,
-                to_amount=to_amount,
-                source='cryptocompare',
-                from_currency=token_name,
-                to_currency=to_currency,
-                timestamp=when,
-            )
             print(f'Cryptocompare: {token_name}=>{to_currency}:{to_amount}')
+            return build_conversion_rates(1, to_amount, 'cryptocompare', token_name, to_currency, when)
         except Exception as e:
             print(e)
+    return []
 
 
 def cryptocompare():
@@ -160,21 +206,28 @@ def cryptocompare():
     Updates ConversionRates only if data not available.
 
     """
-    for bounty in Bounty.objects.current():
-        print(f'CryptoCompare Bounty {bounty.pk}')
-        refresh_conv_rate(bounty.web3_created, bounty.token_name)
-
-    for tip in Tip.objects.all():
-        print(f'CryptoCompare Tip {tip.pk}')
-        refresh_conv_rate(tip.created_on, tip.tokenName)
-
-    for obj in KudosTransfer.objects.all():
-        print(f'CryptoCompare KT {obj.pk}')
-        refresh_conv_rate(obj.created_on, obj.tokenName)
-
-    for obj in Contribution.objects.all():
-        print(f'CryptoCompare GrantContrib {obj.pk}')
-        refresh_conv_rate(obj.created_on, obj.subscription.token_symbol)
+    lookups = set()
+    for pk, when, token_name in Bounty.objects.current().values_list('pk', 'web3_created', 'token_name'):
+        print(f'CryptoCompare Bounty {pk}')
+        lookups.add((when, token_name))
+
+    for pk, when, token_name in Tip.objects.values_list('pk', 'created_on', 'tokenName'):
+        print(f'CryptoCompare Tip {pk}')
+        lookups.add((when, token_name))
+
+    for pk, when, token_name in KudosTransfer.objects.values_list('pk', 'created_on', 'tokenName'):
+        print(f'CryptoCompare KT {pk}')
+        lookups.add((when, token_name))
+
+    contributions = Contribution.objects.values_list('pk', 'created_on', 'subscription__token_symbol')
+    for pk, when, token_name in contributions:
+        print(f'CryptoCompare GrantContrib {pk}')
+        lookups.add((when, token_name))
+
+    rates = []
+    for when, token_name in lookups:
+        rates += refresh_conv_rate(when, token_name)
+    ConversionRate.objects.bulk_create(rates)
 
 
 class Command(BaseCommand):
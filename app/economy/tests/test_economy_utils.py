@@ -22,7 +22,7 @@ from datetime import datetime
 from django.test.client import RequestFactory
 
 from economy.models import ConversionRate
-from economy.utils import convert_amount, etherscan_link
+from economy.utils import build_conversion_rates, convert_amount, etherscan_link
 from test_plus.test import TestCase
 
 
@@ -69,3 +69,13 @@ class EconomyUtilsTest(TestCase):
         """Test the economy util etherscan_link method."""
         txid = '0xcb39900d98fa00de2936d2770ef3bfef2cc289328b068e580dc68b7ac1e2055b'
         assert etherscan_link(txid) == 'https://etherscan.io/tx/0xcb39900d98fa00de2936d2770ef3bfef2cc289328b068e580dc68b7ac1e2055b'
+
+    def test_build_conversion_rates(self):
+        """Test the economy util build_conversion_rates method builds the reverse rate."""
+        timestamp = datetime(2018, 1, 1)
+        forward, reverse = build_conversion_rates(1, 4, 'etherdelta', 'ETH', 'USDT', timestamp)
+        assert forward.pk is None and reverse.pk is None
+        assert (forward.from_currency, forward.to_currency, forward.to_amount) == ('ETH', 'USDT', 4)
+        assert (reverse.from_currency, reverse.to_currency) == ('USDT', 'ETH')
+        assert reverse.from_amount == 4 and reverse.to_amount == 1
+        assert forward.timestamp == reverse.timestamp == timestamp
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Handle get_prices command related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from datetime import datetime
+
+from django.utils import timezone
+
+import pytz
+from dashboard.models import Bounty
+from economy.management.commands.get_prices import refresh_bounties
+from economy.models import ConversionRate
+from test_plus.test import TestCase
+
+
+class GetPricesTest(TestCase):
+    """Define tests for the get_prices command."""
+
+    @staticmethod
+    def create_bounty(is_open, value_in_token):
+        return Bounty.objects.create(
+            title='foo',
+            value_in_token=value_in_token,
+            token_name='ETH',
+            web3_created=datetime(2018, 6, 1, tzinfo=pytz.UTC),
+            github_url=f'https://github.com/gitcoinco/web/issues/{value_in_token}',
+            token_address='0x0',
+            bounty_owner_github_username='flintstone',
+            is_open=is_open,
+            accepted=not is_open,
+            expires_date=timezone.now() + timezone.timedelta(days=30),
+            raw_data={},
+            current_bounty=True,
+        )
+
+    def test_refresh_bounties(self):
+        """Test refresh_bounties values open bounties now and closed bounties at the rate of their creation."""
+        # created before any rate was known
+        open_bounty = self.create_bounty(True, 1 * 10**18)
+        closed_bounty = self.create_bounty(False, 3 * 10**18)
+        assert closed_bounty._val_usd_db == 0
+
+        ConversionRate.objects.create(
+            from_amount=1, to_amount=5, source='cryptocompare', from_currency='ETH', to_currency='USDT',
+            timestamp=datetime(2018, 1, 1, tzinfo=pytz.UTC),
+        )
+        ConversionRate.objects.create(
+            from_amount=1, to_amount=2, source='etherdelta', from_currency='ETH', to_currency='USDT',
+        )
+        refresh_bounties()
+
+        open_bounty.refresh_from_db()
+        assert open_bounty._val_usd_db == 2
+        assert open_bounty.token_value_in_usdt == 2
+        closed_bounty.refresh_from_db()
+        assert closed_bounty._val_usd_db == 15
+        assert closed_bounty.value_in_usdt == 15
+        assert closed_bounty.value_in_usdt_now == 6
+        assert closed_bounty.token_value_in_usdt == 5
@@ -18,7 +18,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
 from cacheops import cached_as
-from economy.models import ConversionRate
+from economy.models import ConversionRate, get_time
 
 
 # All Units in native currency
@@ -110,3 +110,42 @@ def etherscan_link(txid):
 
     """
     return f'https://etherscan.io/tx/{txid}'
+
+
+def build_conversion_rates(from_amount, to_amount, source, from_currency, to_currency, timestamp=None):
+    """Build the forward and reverse ConversionRate objects for a price without saving them.
+
+    `bulk_create` does not fire the post_save signal which creates the reverse rate,
+    so callers that insert in bulk must include the reverse rate themselves.
+
+    Args:
+        from_amount (float): The amount of from_currency.
+        to_amount (float): The amount of to_currency.
+        source (str): The source of the price data.
+        from_currency (str): The currency identifier to convert from.
+        to_currency (str): The currency identifier to convert to.
+        timestamp (datetime): The time of the price. Defaults to now if None.
+
+    Returns:
+        list: The unsaved forward and reverse ConversionRate objects.
+
+    """
+    timestamp = timestamp or get_time()
+    return [
+        ConversionRate(
+            from_amount=from_amount,
+            to_amount=to_amount,
+            timestamp=timestamp,
+            source=source,
+            from_currency=from_currency,
+            to_currency=to_currency,
+        ),
+        ConversionRate(
+            from_amount=float(to_amount) / float(from_amount),
+            to_amount=1,
+            timestamp=timestamp,
+            source=source,
+            from_currency=to_currency,
+            to_currency=from_currency,
+        ),
+    ]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Handle ENS subdomain view related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from unittest.mock import patch
+
+from enssubdomain.views import send_registration_txns
+from test_plus.test import TestCase
+
+
+class ENSSubdomainViewsTest(TestCase):
+    """Define tests for enssubdomain views."""
+
+    @patch('enssubdomain.views.ens_nonce_manager')
+    @patch('enssubdomain.views.set_address_at_resolver', return_value='0x3')
+    @patch('enssubdomain.views.set_resolver', return_value='0x2')
+    @patch('enssubdomain.views.set_owner', return_value='0x1')
+    def test_send_registration_txns(self, set_owner, set_resolver, set_address_at_resolver, nonce_manager):
+        """Test the enssubdomain view send_registration_txns uses consecutive nonces and keeps them."""
+        assert send_registration_txns('0xsigner', 'gitcoin', 7) == ['0x1', '0x2', '0x3']
+        assert [send.call_args[0][2] for send in [set_owner, set_resolver, set_address_at_resolver]] == [7, 8, 9]
+        nonce_manager.release.assert_not_called()
+
+    @patch('enssubdomain.views.ens_nonce_manager')
+    @patch('enssubdomain.views.set_address_at_resolver')
+    @patch('enssubdomain.views.set_resolver', return_value=None)
+    @patch('enssubdomain.views.set_owner', return_value='0x1')
+    def test_send_registration_txns_releases_unused_nonces(
+        self, set_owner, set_resolver, set_address_at_resolver, nonce_manager
+    ):
+        """Test the enssubdomain view send_registration_txns gives the unused nonces back when a send fails."""
+        assert send_registration_txns('0xsigner', 'gitcoin', 7) == ['0x1', None, None]
+        set_address_at_resolver.assert_not_called()
+        nonce_manager.release.assert_called_once_with(8, 10)
+
+        # the timed out transaction may have been broadcast, so only the nonces after it are given back
+        nonce_manager.release.reset_mock()
+        set_owner.side_effect = ConnectionError('rpc timeout')
+        with self.assertRaises(ConnectionError):
+            send_registration_txns('0xsigner', 'gitcoin', 7)
+        nonce_manager.release.assert_called_once_with(8, 10)
@@ -22,6 +22,7 @@ import datetime
 import logging
 
 from django.conf import settings
+from django.db.models import Max
 from django.http import JsonResponse
 from django.template.response import TemplateResponse
 from django.utils import timezone
@@ -30,6 +31,7 @@ from django.views.decorators.csrf import csrf_exempt
 
 import idna
 from dashboard.models import Profile
+from dashboard.utils import NonceManager, get_profile_by_handle
 from dashboard.views import w3
 from ens import ENS
 from ens.abis import ENS as ens_abi
@@ -185,29 +187,49 @@ def set_address_at_resolver(signer, github_handle, nonce, gas_multiplier=1.101):
     return txn_hash
 
 
-def get_nonce():
-    web3_nonce = w3.eth.getTransactionCount(settings.ENS_OWNER_ACCOUNT)
-    next_db_nonce = 0
+def get_db_nonce_floor():
+    last_end_nonce = ENSSubdomainRegistration.objects.aggregate(Max('end_nonce'))['end_nonce__max']
+    return last_end_nonce + 1 if last_end_nonce is not None else 0
+
+
+ens_nonce_manager = NonceManager(w3, settings.ENS_OWNER_ACCOUNT, floor=get_db_nonce_floor)
+
+
+def get_nonce(count=1):
+    """Reserve `count` consecutive nonces on the ENS owner account and return the first one."""
+    return ens_nonce_manager.reserve(count)
+
+
+def send_registration_txns(signer, github_handle, start_nonce, gas_multiplier=1.101):
+    """Broadcast the three subdomain transactions with consecutive nonces and return their hashes.
+
+    If the node rejects one of them, its nonce and the following ones are given back to the nonce
+    manager. If a send raises, the transaction may still have reached the node, so only the nonces
+    after it are given back.
+    """
+    end_nonce = start_nonce + 3
+    txn_hashes = []
     try:
-        last_ens = ENSSubdomainRegistration.objects.order_by('-end_nonce').first()
-        next_db_nonce = last_ens.end_nonce + 1
+        for nonce, send in enumerate([set_owner, set_resolver, set_address_at_resolver], start_nonce):
+            txn_hashes.append(send(signer, github_handle, nonce, gas_multiplier=gas_multiplier))
+            if not txn_hashes[-1]:
+                ens_nonce_manager.release(nonce, end_nonce)
+                break
     except Exception:
-        pass
-
-    return max([web3_nonce, next_db_nonce])
+        ens_nonce_manager.release(start_nonce + len(txn_hashes) + 1, end_nonce)
+        raise
+    return txn_hashes + [None] * (3 - len(txn_hashes))
 
 
 def helper_process_registration(signer, github_handle, signedMsg, gas_multiplier=1.101, override_nonce=None):
     # actually setup subdomain
-    start_nonce = get_nonce() if not override_nonce else override_nonce
-    nonce = start_nonce
-    txn_hash_1 = set_owner(signer, github_handle, nonce, gas_multiplier=gas_multiplier)
-    nonce += 1
-    txn_hash_2 = set_resolver(signer, github_handle, nonce, gas_multiplier=gas_multiplier)
-    nonce += 1
-    txn_hash_3 = set_address_at_resolver(signer, github_handle, nonce, gas_multiplier=gas_multiplier)
-
-    profile = Profile.objects.filter(handle__iexact=github_handle).first()
+    start_nonce = get_nonce(3) if not override_nonce else override_nonce
+    nonce = start_nonce + 2
+    txn_hash_1, txn_hash_2, txn_hash_3 = send_registration_txns(
+        signer, github_handle, start_nonce, gas_multiplier=gas_multiplier
+    )
+
+    profile = get_profile_by_handle(github_handle)
     return ENSSubdomainRegistration.objects.create(
         profile=profile,
         subdomain_wallet_address=signer,
@@ -245,13 +267,9 @@ def handle_subdomain_post_request(request, github_handle):
             })
 
         # actually setup subdomain
-        start_nonce = get_nonce()
-        nonce = start_nonce
-        txn_hash_1 = set_owner(signer, github_handle, nonce)
-        nonce += 1
-        txn_hash_2 = set_resolver(signer, github_handle, nonce)
-        nonce += 1
-        txn_hash_3 = set_address_at_resolver(signer, github_handle, nonce)
+        start_nonce = get_nonce(3)
+        nonce = start_nonce + 2
+        txn_hash_1, txn_hash_2, txn_hash_3 = send_registration_txns(signer, github_handle, start_nonce)
 
         gas_price = get_gas_price()
         gas_cost_eth = (RESOLVER_GAS_COST + OWNER_GAS_COST + SET_ADDRESS_GAS_COST) * gas_price / 10**18
@@ -0,0 +1,77 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from gas.models import GasProfile
+from gas.utils import (
+    conf_time_spread, gas_history, recommend_min_gas_price_to_confirm_in_time, refresh_gas_stats_snapshot,
+)
+
+
+class Command(BaseCommand):
+
+    help = 'seeds gas profiles in a rolled back transaction and times the gas history and gas stats helpers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', default=30, type=int, help='days of gas profiles to seed')
+        parser.add_argument('--prices', default=100, type=int, help='gas prices per sync to seed')
+        parser.add_argument('--calls', default=100, type=int, help='gas stats calls to time')
+
+    def timed(self, label, func, repeat=1):
+        start = time.time()
+        for __ in range(repeat):
+            func()
+        print(f'{label}: {(time.time() - start) * 1000 / repeat:.2f}ms')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        with transaction.atomic():
+            # one sync every 10 minutes, as scheduled in the crontab
+            profiles = []
+            for sync in range(options['days'] * 24 * 6):
+                created_on = now - timezone.timedelta(minutes=10 * sync)
+                for gas_price in range(1, options['prices'] + 1):
+                    mean_time = round(random.uniform(0.5, 300 / gas_price), 1)
+                    profiles.append(GasProfile(
+                        gas_price=gas_price,
+                        mean_time_to_confirm_blocks=0,
+                        mean_time_to_confirm_minutes=mean_time,
+                        _99confident_confirm_time_blocks=0,
+                        _99confident_confirm_time_mins=round(mean_time * 2.5, 1),
+                        created_on=created_on,
+                    ))
+            GasProfile.objects.bulk_create(profiles, batch_size=5000)
+            print(f'seeded {len(profiles)} gas profiles')
+
+            for breakdown in ['hourly', 'daily', 'weekly']:
+                self.timed(f'gas_history {breakdown}', lambda: gas_history(breakdown, 60))
+
+            self.timed('refresh_gas_stats_snapshot', refresh_gas_stats_snapshot)
+            calls = options['calls']
+            self.timed('recommend_min_gas_price', lambda: recommend_min_gas_price_to_confirm_in_time(4), calls)
+            self.timed('conf_time_spread', conf_time_spread, calls)
+
+            transaction.set_rollback(True)
+
+        # don't leave the seeded data in the shared snapshot
+        refresh_gas_stats_snapshot()
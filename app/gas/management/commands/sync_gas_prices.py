@@ -22,6 +22,7 @@ from django.db import transaction
 
 import requests
 from gas.models import GasProfile
+from gas.utils import refresh_gas_stats_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -62,3 +63,5 @@ class Command(BaseCommand):
                     )
                 except KeyError:
                     logger.warning('In: sync_gas_prices - Malformed response - Code: %s', response.status_code)
+
+        refresh_gas_stats_snapshot()
@@ -18,11 +18,13 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
 from django.test.client import RequestFactory
+from django.utils import timezone
 
 from economy.models import ConversionRate
 from gas.models import GasProfile
 from gas.utils import (
-    conf_time_spread, eth_usd_conv_rate, gas_price_to_confirm_time_minutes, recommend_min_gas_price_to_confirm_in_time,
+    conf_time_spread, eth_usd_conv_rate, gas_history, gas_price_to_confirm_time_minutes, get_gas_stats_snapshot,
+    recommend_min_gas_price_to_confirm_in_time, refresh_gas_stats_snapshot, reset_gas_stats_snapshot,
 )
 from test_plus.test import TestCase
 
@@ -32,6 +34,7 @@ class GasUtilsTest(TestCase):
 
     def setUp(self):
         """Perform setup for the testcase."""
+        reset_gas_stats_snapshot()
         self.factory = RequestFactory()
         GasProfile.objects.create(
             gas_price=1,
@@ -61,6 +64,7 @@ class GasUtilsTest(TestCase):
             from_currency='ETH',
             to_currency='USDT',
         )
+        refresh_gas_stats_snapshot()
 
     def test_recommend_min_gas_price_to_confirm_in_time(self):
         """Test the gas util recommend_min_gas_price_to_confirm_in_time method."""
@@ -77,3 +81,46 @@ class GasUtilsTest(TestCase):
     def test_conf_time_spread(self):
         """Test the gas util conf_time_spread method."""
         assert conf_time_spread() == '[["1.00", "10.00"], ["2.00", "4.00"], ["3.00", "1.00"]]'
+
+    def test_gas_stats_snapshot_queries(self):
+        """Test the gas util recommendations are served from the snapshot without queries."""
+        with self.assertNumQueries(0):
+            assert recommend_min_gas_price_to_confirm_in_time(5) == 2
+            conf_time_spread()
+
+    def test_gas_stats_snapshot_reset(self):
+        """Test the gas stats snapshot is rebuilt from the database after a reset."""
+        GasProfile.objects.create(
+            gas_price=4,
+            mean_time_to_confirm_blocks=1,
+            mean_time_to_confirm_minutes=0.5,
+            _99confident_confirm_time_blocks=50,
+            _99confident_confirm_time_mins=5,
+        )
+        assert [profile[0] for profile in get_gas_stats_snapshot()] == [1, 2, 3]
+
+        reset_gas_stats_snapshot()
+        assert [profile[0] for profile in get_gas_stats_snapshot()] == [1, 2, 3, 4]
+
+    def test_gas_history(self):
+        """Test the gas util gas_history method buckets the best gas price per hour."""
+        hour = timezone.now().replace(minute=5, second=0, microsecond=0) - timezone.timedelta(hours=2)
+        for gas_price, mean_time, created_on in [
+            (4, 20, hour),
+            (5, 20, hour + timezone.timedelta(minutes=1)),
+            (6, 30, hour - timezone.timedelta(hours=1)),
+            (7, 40, hour + timezone.timedelta(minutes=20)),
+        ]:
+            GasProfile.objects.create(
+                gas_price=gas_price,
+                mean_time_to_confirm_blocks=0,
+                mean_time_to_confirm_minutes=mean_time,
+                _99confident_confirm_time_blocks=0,
+                _99confident_confirm_time_mins=mean_time * 2.5,
+                created_on=created_on,
+            )
+        history = gas_history('hourly', 30)
+        assert history[-2:] == [
+            [4.0, len(history) - 2, hour.strftime("%Y-%m-%dT%H:00:00")],
+            [6.0, len(history) - 1, (hour - timezone.timedelta(hours=1)).strftime("%Y-%m-%dT%H:00:00")],
+        ]
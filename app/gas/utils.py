@@ -1,21 +1,73 @@
 import json
 
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import DecimalField, Func
+from django.db.models.functions import TruncHour
 from django.utils import timezone
 
 from economy.utils import convert_amount
 from gas.models import GasAdvisory, GasProfile
 
+GAS_STATS_SNAPSHOT_KEY = 'gas_stats_snapshot'
+GAS_STATS_SNAPSHOT_TIMEOUT = 60 * 31
+
+
+class ArrayFirst(Func):
+    """Take the first element of a Postgres array expression."""
+
+    template = '(%(expressions)s)[1]'
+
+
+def build_gas_stats_snapshot():
+    """Build the snapshot of the most recent gas profiles.
+
+    Returns:
+        list: The (gas_price, mean_time_to_confirm_minutes, created_on) tuples of the latest
+            GasProfile per gas price over the last 31 minutes, ordered by gas price.
+
+    """
+    return list(GasProfile.objects.filter(
+        created_on__gt=(timezone.now() - timezone.timedelta(minutes=31)),
+    ).order_by('gas_price', '-created_on').distinct('gas_price').values_list(
+        'gas_price', 'mean_time_to_confirm_minutes', 'created_on'
+    ))
+
+
+def refresh_gas_stats_snapshot():
+    """Rebuild the gas stats snapshot and share it through the cache."""
+    profiles = build_gas_stats_snapshot()
+    cache.set(GAS_STATS_SNAPSHOT_KEY, profiles, GAS_STATS_SNAPSHOT_TIMEOUT)
+    return profiles
+
+
+def reset_gas_stats_snapshot():
+    """Drop the cached gas stats snapshot, so the next read rebuilds it from the database."""
+    cache.delete(GAS_STATS_SNAPSHOT_KEY)
+
+
+def get_gas_stats_snapshot():
+    """Get the gas stats snapshot written by the last `sync_gas_prices` run.
+
+    The snapshot is rebuilt from the database if it is missing from the cache.
+
+    """
+    profiles = cache.get(GAS_STATS_SNAPSHOT_KEY)
+    if profiles is None:
+        return refresh_gas_stats_snapshot()
+    return profiles
+
 
 def recommend_min_gas_price_to_confirm_in_time(minutes, default=5):
     # if settings.DEBUG:
     #     return 10
     try:
-        gp = GasProfile.objects.filter(
-            created_on__gt=(timezone.now()-timezone.timedelta(minutes=31)),
-            mean_time_to_confirm_minutes__lt=minutes
-            ).order_by('gas_price').first()
-        return max(0.1, gp.gas_price)
+        gas_price = min(
+            gas_price for gas_price, mean_time_to_confirm_minutes, __ in get_gas_stats_snapshot()
+            if mean_time_to_confirm_minutes < minutes
+        )
+        return max(0.1, gas_price)
     except Exception:
         return default
 
@@ -36,13 +88,16 @@ def eth_usd_conv_rate():
 
 def conf_time_spread(max_gas_price=9999):
     try:
+        profiles = get_gas_stats_snapshot()
         for minutes in [1, 11, 21, 31]:
-            gp = GasProfile.objects.filter(
-                created_on__gt=(timezone.now() - timezone.timedelta(minutes=minutes)),
-                gas_price__lte=max_gas_price,
-            ).distinct('gas_price').order_by('gas_price').values_list('gas_price', 'mean_time_to_confirm_minutes')
+            since = timezone.now() - timezone.timedelta(minutes=minutes)
+            gp = [
+                (gas_price, mean_time_to_confirm_minutes)
+                for gas_price, mean_time_to_confirm_minutes, created_on in profiles
+                if created_on > since and gas_price <= max_gas_price
+            ]
             if gp:
-                return json.dumps(list(gp), cls=DjangoJSONEncoder)
+                return json.dumps(gp, cls=DjangoJSONEncoder)
     except Exception:
         pass
     return json.dumps([])
@@ -59,44 +114,27 @@ def gas_history(breakdown, mean_time_to_confirm_minutes):
     start_date = (timezone.now()-timezone.timedelta(days=days))
     gas_profiles = GasProfile.objects.filter(
         created_on__gt=start_date,
+        created_on__minute__lt=10,
         mean_time_to_confirm_minutes__lte=mean_time_to_confirm_minutes,
-    ).order_by('-created_on')
-
-    # collapse into best gas price per time period
-    results = {}
-    for gp in gas_profiles:
-        if not gp.created_on.minute < 10:
-            continue
-        if not gp.created_on.hour < 1 and breakdown in ['daily', 'weekly']:
-            continue
-        if not gp.created_on.weekday() < 1 and breakdown in ['weekly']:
-            continue
-        key = gp.created_on.strftime("%Y-%m-%dT%H:00:00")
-        package = {
-            'created_on': key,
-            'gas_price': float(gp.gas_price),
-            'mean_time_to_confirm_minutes': float(gp.mean_time_to_confirm_minutes)
-        }
-        if key not in results.keys():
-            results[key] = package
-        else:
-            key_package = results[key]
-            if package['mean_time_to_confirm_minutes'] > key_package['mean_time_to_confirm_minutes']:
-                results[key] = package
-            elif package['mean_time_to_confirm_minutes'] == key_package['mean_time_to_confirm_minutes']:
-                if package['gas_price'] < key_package['gas_price']:
-                    results[key] = package
-    # for debugging
-    # for key, result in results.items():
-    #    print(result['created_on'], result['gas_price'], result['mean_time_to_confirm_minutes'])
+    )
+    if breakdown in ['daily', 'weekly']:
+        gas_profiles = gas_profiles.filter(created_on__hour=0)
+    if breakdown in ['weekly']:
+        gas_profiles = gas_profiles.filter(created_on__week_day=2)  # monday
+
+    # collapse into best gas price per hour; the slowest confirmation time, then the lowest gas price
+    buckets = gas_profiles.annotate(bucket=TruncHour('created_on')).values('bucket').annotate(
+        best_gas_price=ArrayFirst(
+            ArrayAgg('gas_price', ordering=('-mean_time_to_confirm_minutes', 'gas_price')),
+            output_field=DecimalField(),
+        )
+    ).order_by('-bucket').values_list('best_gas_price', 'bucket')
 
     # collapse into array that the frontend can understand
-    results_array = []
-    i = 0
-    for key, val in results.items():
-        results_array.append([val['gas_price'], i, val["created_on"]])
-        i += 1
-    return results_array
+    return [
+        [float(gas_price), i, bucket.strftime("%Y-%m-%dT%H:00:00")]
+        for i, (gas_price, bucket) in enumerate(buckets)
+    ]
 
 
 def gas_advisories():
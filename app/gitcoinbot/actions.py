@@ -23,6 +23,9 @@ import re
 from functools import wraps
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 import jwt
 import requests
@@ -33,6 +36,9 @@ from gitcoinbot.models import GitcoinBotResponses
 
 MIN_AMOUNT = 0
 FALLBACK_CURRENCY = 'ETH'
+# Installation tokens live for an hour; stop handing them out a few minutes before they expire
+INSTALLATION_TOKEN_CACHE_KEY = 'gitcoinbot_installation_token:{}'
+INSTALLATION_TOKEN_EXPIRY_MARGIN = 5 * 60
 
 
 class Bound:
@@ -194,7 +200,13 @@ def post_gitcoin_app_comment(owner, repo, issue_id, content, install_id):
 
 
 def create_token(install_id):
-    # Token expires after 10 minutes
+    """Get an installation access token, reusing a cached one until shortly before it expires."""
+    cache_key = INSTALLATION_TOKEN_CACHE_KEY.format(install_id)
+    token = cache.get(cache_key)
+    if token:
+        return token
+
+    # JWT expires after 10 minutes
     payload = {
         'iat': datetime.datetime.utcnow(),
         'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=500),
@@ -207,7 +219,14 @@ def create_token(install_id):
         'Authorization': f'Bearer {jwt_token_string}',
         'Accept': 'application/vnd.github.machine-man-preview+json'}
     response = requests.post(url, headers=github_app_headers)
-    token = json.loads(response.content).get('token', '')
+    response_json = json.loads(response.content)
+    token = response_json.get('token', '')
+
+    expires_at = parse_datetime(response_json.get('expires_at') or '')
+    if token and expires_at:
+        timeout = (expires_at - timezone.now()).total_seconds() - INSTALLATION_TOKEN_EXPIRY_MARGIN
+        if timeout > 0:
+            cache.set(cache_key, token, int(timeout))
     return token
 
 
@@ -0,0 +1,27 @@
+from celery import app
+from celery.utils.log import get_task_logger
+from gitcoinbot.actions import determine_response
+from requests.exceptions import ConnectionError
+
+logger = get_task_logger(__name__)
+
+
+@app.shared_task(bind=True, max_retries=3)
+def determine_response_task(self, owner, repo, comment_id, comment_text, issue_id, install_id, sender) -> None:
+    """Respond to a comment addressed to gitcoinbot outside of the webhook request.
+
+    :param self:
+    :param owner:
+    :param repo:
+    :param comment_id:
+    :param comment_text:
+    :param issue_id:
+    :param install_id:
+    :param sender:
+    :return:
+    """
+    try:
+        determine_response(owner, repo, comment_id, comment_text, issue_id, install_id, sender)
+    except ConnectionError as exc:
+        logger.warning(f'could not respond to {owner}/{repo}#{issue_id}: {exc}')
+        self.retry(countdown=30)
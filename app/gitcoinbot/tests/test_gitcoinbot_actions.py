@@ -17,12 +17,18 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
 from gitcoinbot.actions import (
-    FALLBACK_CURRENCY, confused_text, get_text_from_query_responses, help_text, new_bounty_text, new_tip_text,
-    parse_comment_amount, parse_comment_currency, parse_tippee_username, start_work_text,
-    submit_work_or_new_bounty_text, submit_work_text,
+    FALLBACK_CURRENCY, INSTALLATION_TOKEN_CACHE_KEY, confused_text, create_token, get_text_from_query_responses,
+    help_text, new_bounty_text, new_tip_text, parse_comment_amount, parse_comment_currency, parse_tippee_username,
+    start_work_text, submit_work_or_new_bounty_text, submit_work_text,
 )
 from gitcoinbot.models import GitcoinBotResponses
 from test_plus.test import TestCase
@@ -173,3 +179,15 @@ class GitcoinBotActionsTest(TestCase):
         GitcoinBotResponses.objects.create(request='speedy gonzales', response='The Fastest Mouse in all Mexico')
         response = get_text_from_query_responses('Speedy Gonzales', 'ACME')
         self.assertEqual(response, '@ACME The Fastest Mouse in all Mexico')
+
+    @patch('gitcoinbot.actions.jwt.encode', return_value=b'jwt')
+    @patch('gitcoinbot.actions.requests.post')
+    def test_create_token_is_cached_until_expiry(self, mock_post, mock_encode):
+        """Test create_token only exchanges a jwt for an installation token once per token lifetime."""
+        cache.delete(INSTALLATION_TOKEN_CACHE_KEY.format(1))
+        expires_at = (timezone.now() + timedelta(hours=1)).isoformat()
+        mock_post.return_value = MagicMock(content=json.dumps({'token': 'v1.abc', 'expires_at': expires_at}))
+        self.assertEqual(create_token(1), 'v1.abc')
+        self.assertEqual(create_token(1), 'v1.abc')
+        self.assertEqual(mock_post.call_count, 1)
+        cache.delete(INSTALLATION_TOKEN_CACHE_KEY.format(1))
@@ -25,7 +25,7 @@ from django.utils.translation import gettext_lazy as _
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
-from .actions import determine_response
+from .tasks import determine_response_task
 
 
 @csrf_exempt
@@ -34,7 +34,8 @@ def payload(request):
     """Handle the Github bot payload.
 
     Parse request.body bytes from github into json, retrieve relevant info
-    and respond with appropriate message from gitcoinbot actions.
+    and queue the appropriate gitcoinbot action, so github gets its response
+    without waiting on our own github api calls.
 
     Returns:
         HttpResponse: The confirmation of Github payload acceptance.
@@ -57,5 +58,5 @@ def payload(request):
     issue_id = request_json.get('issue', {}).get('number')
     installation_id = request_json.get('installation', {}).get('id')
     sender = request_json.get('sender', {}).get('login', '')
-    determine_response(owner, repo, comment_id, comment_text, issue_id, installation_id, sender)
-    return HttpResponse(_('Gitcoinbot Responded'))
+    determine_response_task.delay(owner, repo, comment_id, comment_text, issue_id, installation_id, sender)
+    return HttpResponse(_('Gitcoinbot Responded'), status=202)
@@ -17,13 +17,22 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
-from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save
 
 from dashboard.models import Activity
+from dashboard.utils import get_profile_by_handle
 from inbox.utils import send_notification_to_user
 
 
+def get_user_by_handle(handle):
+    """Get the user of a github handle through its profile, so the lookup uses the case insensitive handle index.
+
+    Returns None when there is no profile for the handle or it never logged in, eg a bounty owner synced from github.
+    """
+    profile = get_profile_by_handle(handle)
+    return profile.user if profile else None
+
+
 def create_notification(sender, **kwargs):
     activity = kwargs['instance']
     if activity.activity_type == 'new_tip':
@@ -42,7 +51,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             bounty.url,
             'worker_applied',
             f'<b>{activity.profile.user} applied</b> to work on {bounty.title}'
@@ -52,7 +61,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=activity.metadata['worker_handle']),
+            get_user_by_handle(activity.metadata['worker_handle']),
             bounty.url,
             'worker_approved',
             f'You have been <b>approved to work on {bounty.title}</b>'
@@ -62,7 +71,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=activity.metadata['worker_handle']),
+            get_user_by_handle(activity.metadata['worker_handle']),
             bounty.url,
             'worker_rejected',
             f'Your request to work on <b>{bounty.title} has been rejected</b>'
@@ -72,7 +81,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             bounty.url,
             'start_work',
             f'<b>{activity.profile.user} has started work</b> on {bounty.title}'
@@ -82,7 +91,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             bounty.url,
             'work_submitted',
             f'<b>{activity.profile.user} has submitted work</b> for {bounty.title}'
@@ -92,7 +101,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         amount_paid = activity.metadata['new_bounty']['value_in_usdt_now']
         send_notification_to_user(
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             activity.profile.user,
             bounty.url,
             'work_done',
@@ -104,7 +113,7 @@ def create_notification(sender, **kwargs):
         bounty = activity.bounty
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             bounty.url,
             'stop_work',
             f'<b>{activity.profile.user} has stopped work</b> on {bounty.title}'
@@ -115,7 +124,7 @@ def create_notification(sender, **kwargs):
         amount = activity.metadata['value_in_usdt_now']
         send_notification_to_user(
             activity.profile.user,
-            get_user_model().objects.get(username__iexact=bounty.bounty_owner_github_username),
+            get_user_by_handle(bounty.bounty_owner_github_username),
             bounty.url,
             'new_crowdfund',
             f'A <b>crowdfunding contribution worth {amount} USD</b> has been attached for {bounty.title}'
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Handle inbox signal related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+
+import pytz
+from dashboard.models import Activity, Bounty, Profile
+from inbox.models import Notification
+from test_plus.test import TestCase
+
+
+class InboxSignalsTest(TestCase):
+    """Define tests for the inbox signals."""
+
+    def setUp(self):
+        applicant = get_user_model().objects.create(username='applicant')
+        self.applicant = Profile.objects.create(data={}, handle='applicant', user=applicant)
+        self.bounty = Bounty.objects.create(
+            title='foo',
+            value_in_token=3 * 10**18,
+            token_name='ETH',
+            web3_created=datetime(2008, 10, 31, tzinfo=pytz.UTC),
+            github_url='https://github.com/gitcoinco/web/issues/11',
+            token_address='0x0',
+            issue_description='hello world',
+            bounty_owner_github_username='flintstone',
+            is_open=True,
+            expires_date=datetime(2008, 11, 30, tzinfo=pytz.UTC),
+            raw_data={},
+        )
+
+    def create_activity(self):
+        return Activity.objects.create(profile=self.applicant, bounty=self.bounty, activity_type='worker_applied')
+
+    def test_create_notification(self):
+        """Test the inbox signal create_notification notifies the bounty owner."""
+        owner = get_user_model().objects.create(username='flintstone')
+        Profile.objects.create(data={}, handle='Flintstone', user=owner)
+        self.create_activity()
+        assert Notification.objects.filter(to_user=owner, cta_text='worker_applied').count() == 1
+
+    def test_create_notification_without_owner_user(self):
+        """Test the inbox signal create_notification skips bounty owners who have no user."""
+        Profile.objects.create(data={}, handle='flintstone')
+        activity = self.create_activity()
+        assert activity.pk
+        assert not Notification.objects.exists()
+
+    def test_create_notification_without_owner_profile(self):
+        """Test the inbox signal create_notification skips bounty owners who have no profile."""
+        activity = self.create_activity()
+        assert activity.pk
+        assert not Notification.objects.exists()
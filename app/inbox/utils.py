@@ -17,16 +17,38 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
+import threading
+from contextlib import contextmanager
 
 from inbox.models import Notification
 
+_collected = threading.local()
+
+
+@contextmanager
+def collect_notifications():
+    """Buffer the notifications sent by this thread and write them in one bulk insert on exit."""
+    _collected.notifications = []
+    try:
+        yield _collected.notifications
+        Notification.objects.bulk_create(_collected.notifications)
+    finally:
+        _collected.notifications = None
+
 
 def send_notification_to_user(from_user, to_user, cta_url, cta_text, msg_html):
-    """Helper method to create a new notification."""
-    Notification.objects.create(
+    """Helper method to create a new notification, if both users are known."""
+    if not from_user or not to_user:
+        return
+    notification = Notification(
         cta_url=cta_url,
         cta_text=cta_text,
         message_html=msg_html,
         from_user=from_user,
         to_user=to_user
     )
+    buffer = getattr(_collected, 'notifications', None)
+    if buffer is None:
+        notification.save()
+    else:
+        buffer.append(notification)
@@ -0,0 +1,147 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+import threading
+import time
+from secrets import token_hex
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from dashboard.utils import NonceManager
+from kudos.models import BulkTransferCoupon, BulkTransferRedemption, KudosTransfer
+from kudos.tasks import send_queued_redemptions
+from web3 import Web3
+
+BENCHMARK_SENDER = Web3.toChecksumAddress('0x000000000000000000000000000000000000beef')
+
+
+class DevChainStub:
+    """Stands in for a dev chain that mines a block every `block_time` seconds and rejects reused nonces."""
+
+    def __init__(self, block_time, rpc_latency):
+        self.eth = self
+        self.block_time = block_time
+        self.rpc_latency = rpc_latency
+        self.started = time.time()
+        self.sent_at = []
+        self.lock = threading.Lock()
+
+    def num_mined(self):
+        last_block = self.started + (time.time() - self.started) // self.block_time * self.block_time
+        return len([sent_at for sent_at in self.sent_at if sent_at < last_block])
+
+    def getTransactionCount(self, account, block_identifier='latest'):
+        time.sleep(self.rpc_latency)
+        with self.lock:
+            return len(self.sent_at) if block_identifier == 'pending' else self.num_mined()
+
+    def sign(self, redemption, nonce):
+        return f'0x{nonce:064x}{token_hex(32)}'
+
+    def sendRawTransaction(self, raw_tx):
+        time.sleep(self.rpc_latency)
+        nonce = int(raw_tx[2:66], 16)
+        with self.lock:
+            if nonce < self.num_mined():
+                raise ValueError('nonce too low')
+            if nonce < len(self.sent_at):
+                raise ValueError('replacement transaction underpriced')
+            if nonce > len(self.sent_at):
+                raise ValueError(f'nonce gap: got {nonce}, expected {len(self.sent_at)}')
+            self.sent_at.append(time.time())
+            return Web3.sha3(hexstr=raw_tx)
+
+
+class Command(BaseCommand):
+
+    help = 'times kudos airdrop redemptions against a dev chain stub, with and without the redemption queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--redemptions', default=500, type=int, help='queued redemptions to broadcast')
+        parser.add_argument('--claimers', default=10, type=int, help='concurrent claimers for the unqueued run')
+        parser.add_argument('--seconds', default=60, type=int, help='duration of the unqueued run')
+        parser.add_argument('--block_time', default=15, type=float, help='seconds between blocks')
+        parser.add_argument('--rpc_latency', default=0.05, type=float, help='seconds per rpc call')
+
+    def unqueued(self, options):
+        """Every claim reads the mined nonce and broadcasts straight away, as redemptions used to."""
+        chain = DevChainStub(options['block_time'], options['rpc_latency'])
+        deadline = time.time() + options['seconds']
+        counts = {'sent': 0, 'collisions': 0}
+        counts_lock = threading.Lock()
+
+        def claim():
+            while time.time() < deadline:
+                try:
+                    chain.sendRawTransaction(chain.sign(None, chain.getTransactionCount(BENCHMARK_SENDER)))
+                    outcome = 'sent'
+                except ValueError:
+                    outcome = 'collisions'
+                with counts_lock:
+                    counts[outcome] += 1
+
+        claimers = [threading.Thread(target=claim) for __ in range(options['claimers'])]
+        for claimer in claimers:
+            claimer.start()
+        for claimer in claimers:
+            claimer.join()
+        per_minute = counts['sent'] / options['seconds'] * 60
+        print(f"unqueued: {per_minute:.0f} redemptions/min, {counts['collisions']} nonce collisions")
+
+    def queued(self, options):
+        coupon = BulkTransferCoupon.objects.select_related('token__contract', 'sender_profile').last()
+        if not coupon:
+            raise CommandError('the queued run needs a BulkTransferCoupon to redeem')
+
+        chain = DevChainStub(options['block_time'], options['rpc_latency'])
+        nonce_manager = NonceManager(chain, BENCHMARK_SENDER)
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+        with transaction.atomic():
+            for __ in range(options['redemptions']):
+                kudos_transfer = KudosTransfer.objects.create(
+                    emails=[],
+                    kudos_token_cloned_from=coupon.token,
+                    network=coupon.token.contract.network,
+                    from_address=BENCHMARK_SENDER,
+                    receive_address=BENCHMARK_SENDER,
+                    metadata={'coupon_redemption': True},
+                    tx_status='pending',
+                    receive_tx_status='pending',
+                )
+                BulkTransferRedemption.objects.create(
+                    coupon=coupon, redeemed_by=coupon.sender_profile, kudostransfer=kudos_transfer,
+                )
+
+            start = time.time()
+            sent = 0
+            while True:
+                processed = send_queued_redemptions(
+                    BENCHMARK_SENDER, chain, nonce_manager, sign=chain.sign, notify=False
+                )
+                if not processed:
+                    break
+                sent += processed
+            elapsed = time.time() - start
+            transaction.set_rollback(True)
+
+        nonce_manager.redis.delete(nonce_manager.key, nonce_manager.synced_key, nonce_manager.stuck_key)
+        print(f'queued: {sent / elapsed * 60:.0f} redemptions/min, {sent} redemptions in {elapsed:.1f}s')
+
+    def handle(self, *args, **options):
+        self.unqueued(options)
+        self.queued(options)
@@ -0,0 +1,83 @@
+"""Define the render kudos images management command.
+
+Copyright (C) 2018 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from kudos.models import Token
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct):
+    """Get the nearest-rank percentile of the provided values."""
+    if not values:
+        return 0
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[idx]
+
+
+class Command(BaseCommand):
+
+    help = 'fills the kudos render cache so that kudos images are not rendered on the request path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', dest='force', default=False,
+                            help='re-render images which are already in the render cache')
+
+    def handle(self, *args, **options):
+        force = options['force']
+        hits = 0
+        duplicates = 0
+        failures = 0
+        render_times = []
+        seen = set()
+
+        for token in Token.objects.all().order_by('pk'):
+            try:
+                svg_content = token.svg_content
+            except Exception as e:
+                logger.warning(f'could not read image for kudos {token.pk}: {e}')
+                failures += 1
+                continue
+
+            cache_path = token.get_img_cache_path(svg_content)
+            if cache_path in seen:
+                # shares its image with a kudos handled earlier in this run
+                duplicates += 1
+                continue
+            seen.add(cache_path)
+            if not force and token.get_cached_img(svg_content):
+                hits += 1
+                continue
+
+            start = time.time()
+            png = token.render_img(svg_content)
+            if not png:
+                failures += 1
+                continue
+            render_times.append((time.time() - start) * 1000)
+
+        images = hits + len(render_times) + failures
+        hit_rate = hits / images * 100 if images else 0
+        print(f'{images + duplicates} kudos sharing {images} images; {hits} cache hits ({hit_rate:.1f}%), '
+              f'{len(render_times)} rendered, {failures} failed')
+        print(f'render time p50: {percentile(render_times, 50):.0f}ms, p99: {percentile(render_times, 99):.0f}ms')
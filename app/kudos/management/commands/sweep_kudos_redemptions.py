@@ -0,0 +1,30 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+from django.core.management.base import BaseCommand
+
+from kudos.tasks import get_queued_redemption_senders, process_bulk_coupon_redemptions
+
+
+class Command(BaseCommand):
+
+    help = 'kicks the redemption queue of every kudos airdrop sender which still has queued redemptions'
+
+    def handle(self, *args, **options):
+        for sender_address in get_queued_redemption_senders():
+            print(f'queueing the redemptions of {sender_address}')
+            process_bulk_coupon_redemptions.delay(sender_address)
@@ -17,6 +17,7 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
+import hashlib
 import logging
 import urllib.request
 from io import BytesIO
@@ -25,6 +26,8 @@ from os import path
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField, JSONField
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import models
 from django.db.models import Q
 from django.db.models.signals import post_save, pre_save
@@ -43,6 +46,10 @@ from pyvips.error import Error as VipsError
 
 logger = logging.getLogger(__name__)
 
+KUDOS_IMG_SCALE = 3
+KUDOS_IMG_WIDTH = 333
+KUDOS_IMG_HEIGHT = 384
+
 
 class TokenQuerySet(models.QuerySet):
     """Handle the manager queryset for Tokens."""
@@ -304,18 +311,11 @@ class Token(SuperModel):
         return f"{self.contract.network} Gen {self.gen} Kudos Token: {self.humanized_name}"
 
     @property
-    def as_img(self):
-        """Convert the provided buffer to another format.
-
-        Args:
-            obj (File): The File/ContentFile object.
-
-        Exceptions:
-            Exception: Cowardly catch blanket exceptions here, log it, and return None.
+    def svg_content(self):
+        """Read the raw SVG for this Kudos, downloading it first if it is remote.
 
         Returns:
-            BytesIO: The BytesIO stream containing the converted File data.
-            None: If there is an exception, the method returns None.
+            bytes: The SVG file content.
 
         """
         root = environ.Path(__file__) - 2  # Set the base directory to two levels.
@@ -331,13 +331,80 @@ class Token(SuperModel):
                 with open(file_path, 'wb') as f:
                     f.write(datatowrite)
 
-        # serve file
         with open(file_path, 'rb') as f:
-            obj = File(f)
-            from avatar.utils import svg_to_png
-            return svg_to_png(obj.read(), scale=3, width=333, height=384, index=self.pk, prefer='inkscape')
-        return None
+            return File(f).read()
+
+    @staticmethod
+    def get_img_cache_path(svg_content):
+        """Get the storage path of the rendered PNG for the provided SVG content.
+
+        The path is keyed by a hash of the SVG content and the render settings, so
+        tokens sharing an image share one render, and an edited image is re-rendered.
+
+        """
+        digest = hashlib.sha256(svg_content).hexdigest()
+        return f'kudos/rendered/{digest}-{KUDOS_IMG_SCALE}x.png'
+
+    def get_cached_img(self, svg_content=None):
+        """Get the rendered PNG for this Kudos from the render cache.
+
+        Returns:
+            BytesIO: The cached PNG data.
+            None: If the image has not been rendered yet.
+
+        """
+        cache_path = self.get_img_cache_path(svg_content or self.svg_content)
+        if not default_storage.exists(cache_path):
+            return None
+        with default_storage.open(cache_path, 'rb') as f:
+            return BytesIO(f.read())
 
+    def render_img(self, svg_content=None):
+        """Render this Kudos to PNG in-process and store it in the render cache.
+
+        Returns:
+            BytesIO: The rendered PNG data.
+            None: If the image could not be rendered.
+
+        """
+        from avatar.utils import svg_to_png
+        svg_content = svg_content or self.svg_content
+        png = svg_to_png(
+            svg_content, scale=KUDOS_IMG_SCALE, width=KUDOS_IMG_WIDTH * KUDOS_IMG_SCALE,
+            height=KUDOS_IMG_HEIGHT * KUDOS_IMG_SCALE, index=self.pk, fit=True,
+        )
+        if png:
+            cache_path = self.get_img_cache_path(svg_content)
+            if default_storage.exists(cache_path):
+                default_storage.delete(cache_path)
+            default_storage.save(cache_path, ContentFile(png.getvalue()))
+        return png
+
+    @property
+    def as_img(self):
+        """Get the PNG representation of this Kudos.
+
+        Serves the render cache, which is filled ahead of time by the `render_kudos_images`
+        management command. A cache miss queues the render rather than rendering on the request path.
+
+        Exceptions:
+            Exception: Cowardly catch blanket exceptions here, log it, and return None.
+
+        Returns:
+            BytesIO: The BytesIO stream containing the PNG data.
+            None: If the image is not rendered yet, or if there is an exception.
+
+        """
+        from kudos.tasks import queue_img_render
+        try:
+            svg_content = self.svg_content
+            img = self.get_cached_img(svg_content)
+            if not img:
+                queue_img_render(self, svg_content)
+            return img
+        except Exception as e:
+            logger.error('Exception encountered rendering kudos %s - Error: (%s)', self.pk, str(e))
+        return None
 
     @property
     def img_url(self):
@@ -0,0 +1,234 @@
+import socket
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+import requests
+from app.redis_service import RedisService
+from celery import app
+from celery.exceptions import MaxRetriesExceededError
+from celery.utils.log import get_task_logger
+from dashboard.notifications import maybe_market_kudos_to_email
+from dashboard.utils import NonceManager, batch_activities, get_web3
+from gas.utils import recommend_min_gas_price_to_confirm_in_time
+from inbox.utils import send_notification_to_user
+from kudos.models import BulkTransferCoupon, BulkTransferRedemption, Token
+from kudos.utils import kudos_abi
+from web3 import Web3
+
+logger = get_task_logger(__name__)
+
+redis = RedisService().redis
+
+# Lock timeout of 2 minutes (just in the case that the application hangs to avoid a redis deadlock)
+LOCK_TIMEOUT = 60 * 2
+# redemptions broadcast per lock acquisition, well within the lock timeout
+REDEMPTIONS_PER_LOCK = 50
+# errors meaning the nonce was already used, ie something else sent from the sender address
+NONCE_ERRORS = ['nonce too low', 'replacement transaction underpriced']
+# errors meaning the node already has this very transaction, ie an earlier broadcast went through
+KNOWN_TX_ERRORS = ['known transaction', 'already known']
+# errors which say nothing about the redemption itself, eg the node timing out, so it is retried later
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError, TimeoutError, socket.timeout,
+)
+# how long a queued kudos image render keeps other cache misses from queueing it again
+RENDER_QUEUED_TIMEOUT = 60 * 5
+
+nonce_managers = {}
+
+
+def get_nonce_manager(w3, sender_address):
+    if sender_address not in nonce_managers:
+        nonce_managers[sender_address] = NonceManager(w3, sender_address)
+    return nonce_managers[sender_address]
+
+
+def get_queued_redemption_senders():
+    """Get the sender addresses which have redemptions waiting for their clone transaction."""
+    return get_queued_redemptions().order_by().values_list('kudostransfer__from_address', flat=True).distinct()
+
+
+def get_queued_redemptions(sender_address=None):
+    """Get the redemptions of the sender (or all senders) still waiting for their clone transaction, oldest first."""
+    redemptions = BulkTransferRedemption.objects.filter(kudostransfer__tx_status='pending', kudostransfer__txid='')
+    if sender_address:
+        redemptions = redemptions.filter(kudostransfer__from_address=sender_address)
+    return redemptions.select_related('coupon__token__contract', 'kudostransfer').order_by('pk')
+
+
+def sign_redemption(redemption, nonce):
+    """Sign the clone transaction of a queued redemption and return the raw transaction as hex."""
+    coupon = redemption.coupon
+    private_key = settings.KUDOS_PRIVATE_KEY if not coupon.sender_pk else coupon.sender_pk
+    gas_price_confirmation_time = 1 if not coupon.sender_address else 60
+    w3 = get_web3(coupon.token.contract.network)
+    contract = w3.eth.contract(Web3.toChecksumAddress(settings.KUDOS_CONTRACT_MAINNET), abi=kudos_abi())
+    tx = contract.functions.clone(redemption.kudostransfer.receive_address, coupon.token.token_id, 1).buildTransaction({
+        'nonce': nonce,
+        'gas': 500000,
+        'gasPrice': int(recommend_min_gas_price_to_confirm_in_time(gas_price_confirmation_time) * 10**9),
+        'value': int(coupon.token.price_finney / 1000.0 * 10**18),
+    })
+    return w3.eth.account.signTransaction(tx, private_key).rawTransaction.hex()
+
+
+def fail_redemption(redemption, error, notify=True):
+    """Give the coupon use back, so the user can redeem it again, and let them know."""
+    kudos_transfer = redemption.kudostransfer
+    kudos_transfer.tx_status = 'error'
+    kudos_transfer.metadata['error'] = str(error)
+    with transaction.atomic():
+        kudos_transfer.save()
+        BulkTransferCoupon.objects.filter(pk=redemption.coupon_id).update(
+            num_uses_remaining=F('num_uses_remaining') + 1,
+            current_uses=F('current_uses') - 1,
+        )
+        redemption.delete()
+
+    coupon = redemption.coupon
+    from_user = coupon.sender_profile.user
+    to_user = redemption.redeemed_by.user
+    if notify and from_user and to_user:
+        send_notification_to_user(
+            from_user,
+            to_user,
+            f"{settings.BASE_URL}{coupon.url.lstrip('/')}",
+            'new_kudos',
+            f'Your <b>{coupon.token.humanized_name} Kudos</b> could not be sent. Please redeem it again.'
+        )
+
+
+def send_queued_redemptions(
+    sender_address, w3=None, nonce_manager=None, sign=sign_redemption, limit=REDEMPTIONS_PER_LOCK, notify=True
+):
+    """Broadcast the queued redemptions of the sender in order with sequential nonces.
+
+    The signed transaction is stored on the KudosTransfer before it is broadcast. When the broadcast fails
+    without an answer from the node, eg on a timeout, the transaction may still have been accepted, so the
+    retry rebroadcasts that same transaction instead of signing a second clone with a new nonce.
+
+    Must only run while holding the sender's redemption lock, so that nonces are assigned by a single worker.
+    Returns the number of redemptions processed, which is 0 when the next nonce was taken by another transaction.
+    """
+    from kudos.views import record_kudos_activity, record_kudos_email_activity
+
+    processed = 0
+    # the activities of the whole run are written at once, with the sender profile looked up once
+    with batch_activities():
+        for redemption in get_queued_redemptions(sender_address)[:limit]:
+            kudos_transfer = redemption.kudostransfer
+            if not w3:
+                w3 = get_web3(redemption.coupon.token.contract.network)
+            if not nonce_manager:
+                nonce_manager = get_nonce_manager(w3, sender_address)
+
+            raw_tx = kudos_transfer.metadata.get('raw_tx')
+            resent = bool(raw_tx)
+            if resent:
+                nonce = kudos_transfer.metadata['nonce']
+            else:
+                nonce = nonce_manager.reserve()
+                try:
+                    raw_tx = sign(redemption, nonce)
+                except Exception as e:
+                    nonce_manager.release(nonce, nonce + 1)
+                    if isinstance(e, TRANSIENT_ERRORS):
+                        logger.warning(f'could not reach the node for redemption {redemption.pk}, retrying: {e}')
+                        break
+                    logger.error(f'could not sign redemption {redemption.pk}: {e}')
+                    fail_redemption(redemption, e, notify=notify)
+                    processed += 1
+                    continue
+                kudos_transfer.metadata.update({'nonce': nonce, 'raw_tx': raw_tx})
+                kudos_transfer.save()
+            txid = Web3.sha3(hexstr=raw_tx).hex()
+
+            try:
+                # an earlier broadcast of this transaction may have been accepted before the node timed out
+                if not resent or not w3.eth.getTransaction(txid):
+                    w3.eth.sendRawTransaction(raw_tx)
+            except Exception as e:
+                if isinstance(e, TRANSIENT_ERRORS):
+                    logger.warning(f'could not reach the node for redemption {redemption.pk}, retrying: {e}')
+                    break
+                if any(error in str(e) for error in KNOWN_TX_ERRORS):
+                    logger.info(f'redemption {redemption.pk} was already broadcast as {txid}')
+                elif any(error in str(e) for error in NONCE_ERRORS):
+                    # the nonce went to another transaction, so this one is signed again with a new nonce
+                    logger.warning(
+                        f'nonce {nonce} of {sender_address} is taken, retrying redemption {redemption.pk}: {e}'
+                    )
+                    del kudos_transfer.metadata['raw_tx']
+                    kudos_transfer.save()
+                    nonce_manager.sync()
+                    break
+                else:
+                    # the node rejected the transaction, so its nonce was never used
+                    logger.error(f'could not send redemption {redemption.pk}: {e}')
+                    nonce_manager.release(nonce, nonce + 1)
+                    fail_redemption(redemption, e, notify=notify)
+                    processed += 1
+                    continue
+
+            kudos_transfer.txid = txid
+            kudos_transfer.receive_txid = txid
+            del kudos_transfer.metadata['raw_tx']
+            kudos_transfer.save()
+            record_kudos_email_activity(kudos_transfer, kudos_transfer.username, 'receive_kudos')
+            record_kudos_activity(kudos_transfer, kudos_transfer.from_username, 'new_kudos')
+            if notify:
+                maybe_market_kudos_to_email(kudos_transfer)
+            processed += 1
+    return processed
+
+
+@app.shared_task(bind=True, max_retries=10)
+def process_bulk_coupon_redemptions(self, sender_address) -> None:
+    """Drain the redemption queue of a kudos airdrop sender.
+
+    :param self:
+    :param sender_address:
+    :return:
+    """
+    lock = redis.lock(f'tasks:kudos_redemptions:{sender_address.lower()}', timeout=LOCK_TIMEOUT)
+    while get_queued_redemptions(sender_address).exists():
+        # whoever holds the lock also picks up the redemptions queued in the meantime
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            processed = send_queued_redemptions(sender_address)
+        finally:
+            lock.release()
+        if not processed:
+            try:
+                self.retry(countdown=15)
+            except MaxRetriesExceededError:
+                # the sweep_kudos_redemptions cron picks the sender up again
+                logger.warning(f'giving up on the redemptions of {sender_address} for now')
+                return
+
+
+def queue_img_render(token, svg_content):
+    """Queue the render of a kudos image, unless a render of the same image is queued already."""
+    queued_key = f'tasks:render_kudos_image:{token.get_img_cache_path(svg_content)}'
+    if redis.set(queued_key, token.pk, nx=True, ex=RENDER_QUEUED_TIMEOUT):
+        render_kudos_image.delay(token.pk)
+
+
+@app.shared_task(bind=True, max_retries=3)
+def render_kudos_image(self, token_id) -> None:
+    """Render the image of a kudos into the render cache, after a cache miss in Token.as_img.
+
+    :param self:
+    :param token_id:
+    :return:
+    """
+    token = Token.objects.get(pk=token_id)
+    svg_content = token.svg_content
+    try:
+        if not token.get_cached_img(svg_content) and not token.render_img(svg_content):
+            logger.warning(f'could not render the image of kudos {token_id}')
+    finally:
+        redis.delete(f'tasks:render_kudos_image:{token.get_img_cache_path(svg_content)}')
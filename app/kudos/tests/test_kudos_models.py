@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Test the Kudos image render cache.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+from io import BytesIO
+from unittest.mock import PropertyMock, patch
+
+from django.core.files.storage import default_storage
+from django.test import TestCase
+
+from kudos.models import KUDOS_IMG_HEIGHT, KUDOS_IMG_SCALE, KUDOS_IMG_WIDTH, Contract, Token
+from kudos.tasks import redis, render_kudos_image
+from PIL import Image
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="111" height="128"><rect width="111" height="128"/></svg>'
+
+
+class KudosRenderCacheTestCase(TestCase):
+    def setUp(self):
+        contract = Contract.objects.create(address='0xkudosrendertest', network='localhost')
+        self.tokens = [
+            Token.objects.create(
+                price_finney=2, cloned_from_id=1, name=f'render_test_{i}', description='test kudos',
+                owner_address='0x0', token_id=i, contract=contract,
+            ) for i in range(2)
+        ]
+        self.cache_path = Token.get_img_cache_path(SVG)
+        self.queued_key = f'tasks:render_kudos_image:{self.cache_path}'
+        self.clear()
+
+    def tearDown(self):
+        self.clear()
+
+    def clear(self):
+        default_storage.delete(self.cache_path)
+        redis.delete(self.queued_key)
+
+    def test_img_cache_path(self):
+        """The render cache is keyed by the SVG content and the render scale."""
+        assert self.cache_path == Token.get_img_cache_path(SVG)
+        assert self.cache_path != Token.get_img_cache_path(SVG.replace(b'"111"', b'"112"'))
+        assert self.cache_path.startswith('kudos/rendered/')
+        assert self.cache_path.endswith(f'-{KUDOS_IMG_SCALE}x.png')
+
+    def test_as_img_queues_render_on_miss(self):
+        """A cache miss queues one render for all tokens sharing the image, which are then served from the cache."""
+        with patch.object(Token, 'svg_content', new_callable=PropertyMock, return_value=SVG), \
+                patch('kudos.tasks.render_kudos_image.delay') as delay, \
+                patch('avatar.utils.svg_to_png', return_value=BytesIO(b'png')) as svg_to_png:
+            assert self.tokens[0].as_img is None
+            assert self.tokens[1].as_img is None
+            delay.assert_called_once_with(self.tokens[0].pk)
+            assert not svg_to_png.called
+
+            render_kudos_image(self.tokens[0].pk)
+            assert self.tokens[0].as_img.getvalue() == b'png'
+            assert self.tokens[1].as_img.getvalue() == b'png'
+
+        assert svg_to_png.call_count == 1
+        assert delay.call_count == 1
+        assert not redis.exists(self.queued_key)
+
+    def test_render_img_size(self):
+        """The render is scaled to the kudos card size, whatever the size of the SVG."""
+        png = self.tokens[0].render_img(SVG)
+        assert Image.open(png).size == (KUDOS_IMG_WIDTH * KUDOS_IMG_SCALE, KUDOS_IMG_HEIGHT * KUDOS_IMG_SCALE)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Test the Kudos airdrop redemption queue.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+import requests
+from dashboard.models import Activity, Profile
+from dashboard.utils import NonceManager
+from inbox.models import Notification
+from kudos.models import BulkTransferCoupon, BulkTransferRedemption, Contract, Token
+from kudos.tasks import get_queued_redemption_senders, get_queued_redemptions, send_queued_redemptions
+from kudos.views import redeem_bulk_coupon
+from web3 import Web3
+
+SENDER = '0x000000000000000000000000000000000000bEEF'
+RECEIVE_ADDRESS = '0x000000000000000000000000000000000000dEaD'
+
+
+class ChainStub:
+    """Stands in for a node that accepts one transaction per nonce and never mines."""
+
+    def __init__(self):
+        self.eth = self
+        self.sent = []
+        self.signed = []
+
+    def sign(self, redemption, nonce):
+        self.signed.append(nonce)
+        return f'0x{nonce:064x}{len(self.signed):064x}'
+
+    def getTransactionCount(self, account, block_identifier='latest'):
+        return len(self.sent) if block_identifier == 'pending' else 0
+
+    def getTransaction(self, txid):
+        return next((raw_tx for raw_tx in self.sent if Web3.sha3(hexstr=raw_tx).hex() == txid), None)
+
+    def sendRawTransaction(self, raw_tx):
+        if raw_tx in self.sent:
+            raise ValueError('known transaction')
+        if int(raw_tx[2:66], 16) < len(self.sent):
+            raise ValueError('nonce too low')
+        self.sent.append(raw_tx)
+        return Web3.sha3(hexstr=raw_tx)
+
+
+class KudosTasksTestCase(TestCase):
+    def setUp(self):
+        self.chain = ChainStub()
+        self.nonce_manager = NonceManager(self.chain, SENDER)
+        self.clear_nonces()
+
+        contract = Contract.objects.create(address='0xkudostaskstest', network='localhost')
+        token = Token.objects.create(
+            price_finney=2, cloned_from_id=1, name='test_kudos', description='test kudos',
+            owner_address=SENDER, token_id=1, contract=contract,
+        )
+        sender = get_user_model().objects.create(username='airdropper')
+        self.coupon = BulkTransferCoupon.objects.create(
+            token=token, num_uses_total=5, num_uses_remaining=5, secret='kudostaskstest',
+            sender_profile=Profile.objects.create(data={}, handle='airdropper', user=sender),
+            sender_address=SENDER, sender_pk='0x1',
+        )
+        for i in range(3):
+            user = get_user_model().objects.create(username=f'claimer{i}')
+            profile = Profile.objects.create(data={}, handle=f'claimer{i}', user=user, trust_profile=True)
+            success, error, __ = redeem_bulk_coupon(self.coupon, profile, RECEIVE_ADDRESS, '127.0.0.1')
+            assert success and not error
+
+    def tearDown(self):
+        self.clear_nonces()
+
+    def clear_nonces(self):
+        self.nonce_manager.redis.delete(
+            self.nonce_manager.key, self.nonce_manager.synced_key, self.nonce_manager.stuck_key
+        )
+
+    def send(self):
+        return send_queued_redemptions(SENDER, self.chain, self.nonce_manager, sign=self.chain.sign, notify=False)
+
+    def test_redeem_bulk_coupon_queues_redemption(self):
+        self.coupon.refresh_from_db()
+        self.assertEqual((self.coupon.num_uses_remaining, self.coupon.current_uses), (2, 3))
+        self.assertEqual(get_queued_redemptions(SENDER).count(), 3)
+        self.assertEqual(list(get_queued_redemption_senders()), [SENDER])
+
+    def test_send_queued_redemptions_in_order(self):
+        self.assertEqual(self.send(), 3)
+        redemptions = BulkTransferRedemption.objects.filter(coupon=self.coupon).order_by('pk')
+        self.assertEqual([r.kudostransfer.metadata['nonce'] for r in redemptions], [0, 1, 2])
+        self.assertTrue(all(r.kudostransfer.txid for r in redemptions))
+        self.assertFalse(get_queued_redemptions(SENDER).exists())
+
+    def test_send_queued_redemptions_records_activities(self):
+        self.assertEqual(self.send(), 3)
+        self.assertEqual(Activity.objects.filter(activity_type='new_kudos', profile__handle='airdropper').count(), 3)
+        self.assertEqual(Activity.objects.filter(activity_type='receive_kudos').count(), 3)
+        self.assertEqual(Notification.objects.filter(to_user__username__startswith='claimer').count(), 3)
+
+    def test_send_queued_redemptions_retries_taken_nonce(self):
+        # something else broadcast from the sender after the counter was synced
+        self.nonce_manager.sync()
+        self.nonce_manager.redis.set(self.nonce_manager.synced_key, 1, ex=60)
+        self.chain.sendRawTransaction(self.chain.sign(None, 0))
+
+        self.assertEqual(self.send(), 0)
+        self.assertEqual(get_queued_redemptions(SENDER).count(), 3)
+        self.assertEqual(self.send(), 3)
+        redemptions = BulkTransferRedemption.objects.filter(coupon=self.coupon).order_by('pk')
+        self.assertEqual([r.kudostransfer.metadata['nonce'] for r in redemptions], [1, 2, 3])
+
+    def test_send_queued_redemptions_retries_transient_errors(self):
+        send_raw_transaction = self.chain.sendRawTransaction
+
+        def timeout(raw_tx):
+            raise requests.exceptions.Timeout('node timed out')
+
+        self.chain.sendRawTransaction = timeout
+        self.assertEqual(self.send(), 0)
+        self.assertEqual(get_queued_redemptions(SENDER).count(), 3)
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.num_uses_remaining, 2)
+
+        # the same transaction is broadcast again rather than signed anew with the next nonce
+        self.chain.sendRawTransaction = send_raw_transaction
+        self.assertEqual(self.send(), 3)
+        self.assertEqual(self.chain.signed, [0, 1, 2])
+        self.assertEqual(len(self.chain.sent), 3)
+
+    def test_send_queued_redemptions_skips_landed_transaction(self):
+        send_raw_transaction = self.chain.sendRawTransaction
+
+        def timeout_after_send(raw_tx):
+            send_raw_transaction(raw_tx)
+            raise requests.exceptions.Timeout('node timed out')
+
+        self.chain.sendRawTransaction = timeout_after_send
+        self.assertEqual(self.send(), 0)
+        self.assertEqual(len(self.chain.sent), 1)
+
+        self.chain.sendRawTransaction = send_raw_transaction
+        self.assertEqual(self.send(), 3)
+        self.assertEqual(self.chain.signed, [0, 1, 2])
+        redemptions = BulkTransferRedemption.objects.filter(coupon=self.coupon).order_by('pk')
+        txids = [Web3.sha3(hexstr=raw_tx).hex() for raw_tx in self.chain.sent]
+        self.assertEqual([r.kudostransfer.txid for r in redemptions], txids)
+
+    def test_send_queued_redemptions_gives_use_back_on_failure(self):
+        def insufficient_funds(raw_tx):
+            raise ValueError('insufficient funds for gas * price + value')
+
+        self.chain.sendRawTransaction = insufficient_funds
+        queued = list(get_queued_redemptions(SENDER))
+        self.assertEqual(send_queued_redemptions(SENDER, self.chain, self.nonce_manager, sign=self.chain.sign), 3)
+        self.assertFalse(BulkTransferRedemption.objects.filter(coupon=self.coupon).exists())
+        self.coupon.refresh_from_db()
+        self.assertEqual((self.coupon.num_uses_remaining, self.coupon.current_uses), (5, 0))
+        queued[0].kudostransfer.refresh_from_db()
+        self.assertEqual(queued[0].kudostransfer.tx_status, 'error')
+        self.assertEqual(Notification.objects.filter(to_user__username__startswith='claimer').count(), 3)
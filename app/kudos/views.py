@@ -40,13 +40,12 @@ from django.utils.translation import gettext_lazy as _
 from django.views.decorators.csrf import csrf_exempt
 
 import boto3
-from dashboard.models import Activity, Profile, SearchHistory
+from dashboard.models import Activity, SearchHistory
 from dashboard.notifications import maybe_market_kudos_to_email, maybe_market_kudos_to_github
-from dashboard.utils import get_nonce, get_web3
+from dashboard.utils import batch_activities, get_nonce, get_profile_by_handle, get_web3, record_activity
 from dashboard.views import record_user_action
 from gas.utils import recommend_min_gas_price_to_confirm_in_time
 from git.utils import get_emails_by_category, get_emails_master, get_github_primary_email
-from kudos.utils import kudos_abi
 from marketing.mails import new_kudos_request
 from ratelimit.decorators import ratelimit
 from retail.helpers import get_ip
@@ -55,6 +54,7 @@ from web3 import Web3
 from .forms import KudosSearchForm
 from .helpers import get_token
 from .models import BulkTransferCoupon, BulkTransferRedemption, KudosTransfer, Token, TokenRequest, TransferEnabledFor
+from .tasks import process_bulk_coupon_redemptions
 
 logger = logging.getLogger(__name__)
 
@@ -71,13 +71,7 @@ def get_profile(handle):
     Returns:
         obj: The profile model object.
     """
-    try:
-        to_profile = Profile.objects.get(handle__iexact=handle)
-    except Profile.MultipleObjectsReturned:
-        to_profile = Profile.objects.filter(handle__iexact=handle).order_by('-created_on').first()
-    except Profile.DoesNotExist:
-        to_profile = None
-    return to_profile
+    return get_profile_by_handle(handle)
 
 
 def about(request):
@@ -171,10 +165,15 @@ def search(request):
 def image(request, kudos_id, name):
     kudos = Token.objects.get(pk=kudos_id)
     img = kudos.as_img
-    if not img:
-        raise Http404
+    if img:
+        return HttpResponse(img.getvalue(), content_type='image/png')
 
-    response = HttpResponse(img.getvalue(), content_type='image/png')
+    # the png is rendered in the background, until then the browser draws the svg
+    try:
+        response = HttpResponse(kudos.svg_content, content_type='image/svg+xml')
+    except Exception:
+        raise Http404
+    response['Cache-Control'] = 'no-cache'
     return response
 
 
@@ -480,12 +479,8 @@ def record_kudos_email_activity(kudos_transfer, github_handle, event_name):
             'received_on': str(kudos_transfer.received_on) if kudos_transfer.received_on else None
         }
     }
-    try:
-        github_handle = github_handle.lstrip('@')
-        kwargs['profile'] = Profile.objects.get(handle=github_handle)
-    except Profile.MultipleObjectsReturned:
-        kwargs['profile'] = Profile.objects.filter(handle__iexact=github_handle).first()
-    except Profile.DoesNotExist:
+    kwargs['profile'] = get_profile_by_handle(github_handle)
+    if not kwargs['profile']:
         logger.warning(f"error in record_kudos_email_activity: profile with github name {github_handle} not found")
         return
     try:
@@ -494,7 +489,7 @@ def record_kudos_email_activity(kudos_transfer, github_handle, event_name):
         logger.info('No bounty is associated with this kudos transfer.')
 
     try:
-        Activity.objects.create(**kwargs)
+        record_activity(**kwargs)
     except Exception as e:
         logger.debug(f"error in record_kudos_email_activity: {e} - {event_name} - {kudos_transfer} - {github_handle}")
 
@@ -516,11 +511,8 @@ def record_kudos_activity(kudos_transfer, github_handle, event_name):
         }
     }
 
-    try:
-        kwargs['profile'] = Profile.objects.get(handle__iexact=github_handle)
-    except Profile.MultipleObjectsReturned:
-        kwargs['profile'] = Profile.objects.filter(handle__iexact=github_handle).first()
-    except Profile.DoesNotExist:
+    kwargs['profile'] = get_profile_by_handle(github_handle)
+    if not kwargs['profile']:
         logging.error(f"error in record_kudos_activity: profile with github name {github_handle} not found")
         return
 
@@ -531,7 +523,7 @@ def record_kudos_activity(kudos_transfer, github_handle, event_name):
         pass
 
     try:
-        Activity.objects.create(**kwargs)
+        record_activity(**kwargs)
     except Exception as e:
         logging.error(f"error in record_kudos_activity: {e} - {event_name} - {kudos_transfer} - {github_handle}")
 
@@ -603,12 +595,13 @@ def receive(request, key, txid, network):
                 kudos_transfer.recipient_profile = request.user.profile
             kudos_transfer.save()
             record_user_action(kudos_transfer.from_username, 'receive_kudos', kudos_transfer)
-            record_kudos_email_activity(kudos_transfer, kudos_transfer.username, 'receive_kudos')
-            record_kudos_activity(
-                kudos_transfer,
-                kudos_transfer.from_username,
-                'new_kudos' if kudos_transfer.username else 'new_crowdfund'
-            )
+            with batch_activities():
+                record_kudos_email_activity(kudos_transfer, kudos_transfer.username, 'receive_kudos')
+                record_kudos_activity(
+                    kudos_transfer,
+                    kudos_transfer.from_username,
+                    'new_kudos' if kudos_transfer.username else 'new_crowdfund'
+                )
             messages.success(request, _('This kudos has been received'))
         except Exception as e:
             messages.error(request, str(e))
@@ -644,74 +637,56 @@ def redeem_bulk_coupon(coupon, profile, address, ip_address, save_addr=False):
         profile.preferred_payout_address = address
         profile.save()
 
-    private_key = settings.KUDOS_PRIVATE_KEY if not coupon.sender_pk else coupon.sender_pk
-    kudos_owner_address = settings.KUDOS_OWNER_ACCOUNT if not coupon.sender_address else coupon.sender_address
-    gas_price_confirmation_time = 1 if not coupon.sender_address else 60
-    kudos_contract_address = Web3.toChecksumAddress(settings.KUDOS_CONTRACT_MAINNET)
-    kudos_owner_address = Web3.toChecksumAddress(kudos_owner_address)
-    w3 = get_web3(coupon.token.contract.network)
-    contract = w3.eth.contract(Web3.toChecksumAddress(kudos_contract_address), abi=kudos_abi())
-    nonce = w3.eth.getTransactionCount(kudos_owner_address)
-    tx = contract.functions.clone(address, coupon.token.token_id, 1).buildTransaction({
-        'nonce': nonce,
-        'gas': 500000,
-        'gasPrice': int(recommend_min_gas_price_to_confirm_in_time(gas_price_confirmation_time) * 10**9),
-        'value': int(coupon.token.price_finney / 1000.0 * 10**18),
-    })
-
     if not profile.trust_profile and profile.github_created_on > (timezone.now() - timezone.timedelta(days=7)):
         error = f'Your github profile is too new.  Cannot receive kudos.'
         return None, error, None
-    else:
 
-        signed = w3.eth.account.signTransaction(tx, private_key)
-        try:
-            txid = w3.eth.sendRawTransaction(signed.rawTransaction).hex()
-
-            with transaction.atomic():
-                kudos_transfer = KudosTransfer.objects.create(
-                    emails=[profile.email],
-                    # For kudos, `token` is a kudos.models.Token instance.
-                    kudos_token_cloned_from=coupon.token,
-                    amount=coupon.token.price_in_eth,
-                    comments_public=coupon.comments_to_put_in_kudos_transfer,
-                    ip=ip_address,
-                    github_url='',
-                    from_name=coupon.sender_profile.handle,
-                    from_email='',
-                    from_username=coupon.sender_profile.handle,
-                    username=profile.handle,
-                    network=coupon.token.contract.network,
-                    from_address=kudos_owner_address,
-                    is_for_bounty_fulfiller=False,
-                    metadata={'coupon_redemption': True, 'nonce': nonce},
-                    recipient_profile=profile,
-                    sender_profile=coupon.sender_profile,
-                    txid=txid,
-                    receive_txid=txid,
-                    tx_status='pending',
-                    receive_tx_status='pending',
-                )
+    kudos_owner_address = settings.KUDOS_OWNER_ACCOUNT if not coupon.sender_address else coupon.sender_address
+    kudos_owner_address = Web3.toChecksumAddress(kudos_owner_address)
+
+    # the clone transaction is signed and broadcast by the sender's redemption worker, see kudos.tasks
+    with transaction.atomic():
+        coupon = BulkTransferCoupon.objects.select_for_update().get(pk=coupon.pk)
+        if coupon.num_uses_remaining <= 0:
+            error = 'Sorry but the coupon for a free kudos has been used already.'
+            return None, error, None
+
+        kudos_transfer = KudosTransfer.objects.create(
+            emails=[profile.email],
+            # For kudos, `token` is a kudos.models.Token instance.
+            kudos_token_cloned_from=coupon.token,
+            amount=coupon.token.price_in_eth,
+            comments_public=coupon.comments_to_put_in_kudos_transfer,
+            ip=ip_address,
+            github_url='',
+            from_name=coupon.sender_profile.handle,
+            from_email='',
+            from_username=coupon.sender_profile.handle,
+            username=profile.handle,
+            network=coupon.token.contract.network,
+            from_address=kudos_owner_address,
+            receive_address=address,
+            is_for_bounty_fulfiller=False,
+            metadata={'coupon_redemption': True},
+            recipient_profile=profile,
+            sender_profile=coupon.sender_profile,
+            tx_status='pending',
+            receive_tx_status='pending',
+        )
 
-                # save to DB
-                BulkTransferRedemption.objects.create(
-                    coupon=coupon,
-                    redeemed_by=profile,
-                    ip_address=ip_address,
-                    kudostransfer=kudos_transfer,
-                    )
+        # save to DB
+        BulkTransferRedemption.objects.create(
+            coupon=coupon,
+            redeemed_by=profile,
+            ip_address=ip_address,
+            kudostransfer=kudos_transfer,
+            )
 
-                coupon.num_uses_remaining -= 1
-                coupon.current_uses += 1
-                coupon.save()
+        coupon.num_uses_remaining -= 1
+        coupon.current_uses += 1
+        coupon.save()
 
-                # send email
-                maybe_market_kudos_to_email(kudos_transfer)
-        except Exception as e:
-            error = "Could not redeem your kudos.  Please try again soon."
-            if "replacement transaction underpriced" in str(e):
-                error = "There is already an airdrop transfer in progress. Please try again in a minute or two.. (note: in the future we will add 'queue'-ing so you dont have to resubmit, as soon as this ticket (https://github.com/gitcoinco/web/issues/4976) is deployed)"
-            return None, error, None
+        transaction.on_commit(lambda: process_bulk_coupon_redemptions.delay(kudos_owner_address))
 
     return True, None, kudos_transfer
 
@@ -0,0 +1,30 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+from django.core.management.base import BaseCommand
+
+from linkshortener.utils import flush_link_uses
+
+
+class Command(BaseCommand):
+
+    help = 'writes the link uses buffered in redis to the db'
+
+    def handle(self, *args, **options):
+        uses = flush_link_uses()
+        print(f'flushed {sum(uses.values())} uses of {len(uses)} links')
@@ -2,6 +2,8 @@
 from __future__ import unicode_literals
 
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 # Create your models here.
 from economy.models import SuperModel
@@ -16,3 +18,10 @@ class Link(SuperModel):
 
     def __str__(self):
         return self.shortcode
+
+
+@receiver(post_save, sender=Link, dispatch_uid="psave_link")
+@receiver(post_delete, sender=Link, dispatch_uid="pdelete_link")
+def psave_link(sender, instance, **kwargs):
+    from linkshortener.utils import invalidate_link_url
+    invalidate_link_url(instance.shortcode)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Handle link shortener utility related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from linkshortener import utils
+from linkshortener.models import Link
+from linkshortener.utils import LINK_URL_CACHE_KEY, LINK_USES_KEY, flush_link_uses, get_link_url, record_link_use, redis
+from test_plus.test import TestCase
+
+
+class LinkShortenerUtilsTest(TestCase):
+    """Define tests for the link shortener utils."""
+
+    def setUp(self):
+        """Perform setup for the testcase."""
+        self.link = Link.objects.create(comments='', url='https://gitcoin.co/explorer', shortcode='utilstest')
+        self.other_link = Link.objects.create(comments='', url='https://gitcoin.co/kudos', shortcode='utilstest2')
+        self.clear()
+
+    def tearDown(self):
+        self.clear()
+
+    def clear(self):
+        for link in [self.link, self.other_link]:
+            cache.delete(LINK_URL_CACHE_KEY.format(link.shortcode))
+            redis.delete(LINK_USES_KEY.format(link.shortcode))
+
+    def test_get_link_url_is_cached(self):
+        """Test only the first lookup of a shortcode hits the db."""
+        with self.assertNumQueries(1):
+            assert get_link_url('utilstest') == 'https://gitcoin.co/explorer'
+        with self.assertNumQueries(0):
+            assert get_link_url('utilstest') == 'https://gitcoin.co/explorer'
+
+    def test_get_link_url_invalidated_on_save(self):
+        """Test saving a Link drops its cached url."""
+        get_link_url('utilstest')
+        self.link.url = 'https://gitcoin.co/grants'
+        self.link.save()
+        assert get_link_url('utilstest') == 'https://gitcoin.co/grants'
+
+    def test_get_link_url_invalidated_on_delete(self):
+        """Test deleting a Link drops its cached url."""
+        get_link_url('utilstest')
+        self.link.delete()
+        with self.assertRaises(Link.DoesNotExist):
+            get_link_url('utilstest')
+
+    def test_record_link_use(self):
+        """Test uses are counted in redis rather than the db."""
+        record_link_use('utilstest')
+        record_link_use('utilstest')
+        assert int(redis.get(LINK_USES_KEY.format('utilstest'))) == 2
+        self.link.refresh_from_db()
+        assert self.link.uses == 0
+
+    def test_record_link_use_without_redis(self):
+        """Test a use is written to the db when redis is unavailable."""
+        with patch.object(utils.redis, 'incr', side_effect=ConnectionError('redis is down')):
+            record_link_use('utilstest')
+        self.link.refresh_from_db()
+        assert self.link.uses == 1
+
+    def test_flush_link_uses(self):
+        """Test the buffered uses of every link are added to the db and cleared from redis."""
+        Link.objects.filter(pk=self.link.pk).update(uses=5)
+        for __ in range(3):
+            record_link_use('utilstest')
+        record_link_use('utilstest2')
+
+        uses = flush_link_uses()
+        assert (uses['utilstest'], uses['utilstest2']) == (3, 1)
+        self.link.refresh_from_db()
+        self.other_link.refresh_from_db()
+        assert (self.link.uses, self.other_link.uses) == (8, 1)
+        assert not redis.exists(LINK_USES_KEY.format('utilstest'))
+        assert 'utilstest' not in flush_link_uses()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+
+from app.redis_service import RedisService
+from linkshortener.models import Link
+
+logger = logging.getLogger(__name__)
+redis = RedisService().redis
+
+LINK_URL_CACHE_KEY = 'link_url:{}'
+LINK_URL_CACHE_TIMEOUT = 60 * 60
+LINK_USES_KEY = 'link_uses:{}'
+
+
+def get_link_url(shortcode):
+    """Resolve a shortcode to its url, only hitting the db on a cache miss."""
+    cache_key = LINK_URL_CACHE_KEY.format(shortcode)
+    url = cache.get(cache_key)
+    if url is None:
+        url = Link.objects.values_list('url', flat=True).get(shortcode=shortcode)
+        cache.set(cache_key, url, LINK_URL_CACHE_TIMEOUT)
+    return url
+
+
+def invalidate_link_url(shortcode):
+    cache.delete(LINK_URL_CACHE_KEY.format(shortcode))
+
+
+def record_link_use(shortcode):
+    """Count a redirect in redis; the counts are written to the db by flush_link_uses."""
+    try:
+        redis.incr(LINK_USES_KEY.format(shortcode))
+    except Exception as e:
+        # don't lose the click if redis is unavailable
+        logger.warning(f'could not buffer use of link {shortcode}: {e}')
+        Link.objects.filter(shortcode=shortcode).update(uses=F('uses') + 1)
+
+
+def flush_link_uses():
+    """Move the buffered redis counts onto Link.uses with a single update.
+
+    Each counter is read and deleted in one MULTI/EXEC so that clicks recorded
+    while the flush runs are kept for the next one.
+    """
+    keys = list(redis.scan_iter(match=LINK_USES_KEY.format('*'), count=1000))
+    if not keys:
+        return {}
+
+    pipe = redis.pipeline(transaction=True)
+    for key in keys:
+        pipe.get(key)
+        pipe.delete(key)
+    results = pipe.execute()
+
+    prefix_len = len(LINK_USES_KEY.format(''))
+    uses = {}
+    for key, count in zip(keys, results[::2]):
+        if count:
+            uses[key.decode()[prefix_len:]] = int(count)
+    if uses:
+        whens = [When(shortcode=shortcode, then=Value(count)) for shortcode, count in uses.items()]
+        Link.objects.filter(shortcode__in=uses.keys()).update(
+            uses=F('uses') + Case(*whens, default=Value(0), output_field=IntegerField())
+        )
+    return uses
@@ -4,15 +4,14 @@ from __future__ import unicode_literals
 from django.http import Http404
 from django.shortcuts import redirect
 
-from linkshortener.models import Link
+from linkshortener.utils import get_link_url, record_link_use
 
 
 def linkredirect(request, shortcode):
     try:
-        link = Link.objects.get(shortcode=shortcode)
-        link.uses += 1
-        link.save()
-        return redirect(link.url)
+        url = get_link_url(shortcode)
+        record_link_use(shortcode)
+        return redirect(url)
     except Exception as e:
         print(e)
         raise Http404
@@ -23,8 +23,8 @@ from django.utils.safestring import mark_safe
 
 from .models import (
     AccountDeletionRequest, Alumni, EmailEvent, EmailSubscriber, EmailSupressionList, GithubEvent,
-    GithubOrgToTwitterHandleMapping, Job, Keyword, LeaderboardRank, ManualStat, MarketingCallback, Match, SlackPresence,
-    SlackUser, Stat,
+    GithubOrgToTwitterHandleMapping, Job, Keyword, LeaderboardRank, ManualStat, MarketingCallback, Match, MonthlyStat,
+    SlackPresence, SlackUser, Stat,
 )
 
 
@@ -123,6 +123,7 @@ admin.site.register(GithubEvent, GithubEventAdmin)
 admin.site.register(Match, MatchAdmin)
 admin.site.register(Job, GeneralAdmin)
 admin.site.register(ManualStat, GeneralAdmin)
+admin.site.register(MonthlyStat, GeneralAdmin)
 admin.site.register(Stat, GeneralAdmin)
 admin.site.register(Keyword, GeneralAdmin)
 admin.site.register(EmailEvent, EmailEventAdmin)
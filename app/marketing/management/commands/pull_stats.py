@@ -16,60 +16,144 @@
 
 '''
 import logging
+import queue
+import threading
+import time
 import warnings
 
 from django.core.management.base import BaseCommand
+from django.db import connections
 
 import marketing.stats as stats
+from marketing.models import Stat
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 logging.getLogger("requests").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+COLLECTORS = [
+    stats.get_bounty_keyword_counts,
+    stats.get_skills_keyword_counts,
+    stats.github_issues,
+    stats.gitter,
+    stats.medium_subscribers,
+    stats.google_analytics,
+    stats.github_stars,
+    stats.profiles_ingested,
+    stats.chrome_ext_users,
+    stats.firefox_ext_users,
+    stats.slack_users,
+    stats.slack_users_active,
+    stats.twitter_followers,
+    stats.bounties,
+    stats.grants,
+    stats.subs,
+    stats.whitepaper_access,
+    stats.whitepaper_access_request,
+    stats.sendcryptoassets,
+    stats.tips_received,
+    stats.bounties_fulfilled,
+    stats.bounties_open,
+    stats.bounties_by_status_and_keyword,
+    stats.subs_active,
+    stats.joe_dominance_index,
+    stats.avg_time_bounty_turnaround,
+    stats.user_actions,
+    stats.faucet,
+    stats.email_events,
+    stats.bounties_hourly_rate,
+    stats.ens,
+]
+
+
+def run_collectors(jobs, started, results):
+    while True:
+        try:
+            f = jobs.get_nowait()
+        except queue.Empty:
+            break
+        started[f] = time.time()
+        error = None
+        collected = []
+        try:
+            with stats.collect_stats() as collected:
+                f()
+        except Exception as e:
+            error = e
+        finally:
+            connections.close_all()
+        results.put((f, list(collected), time.time() - started[f], error))
+
+
+def duration_stat(f, duration):
+    return Stat(key=f'pull_stats_duration_{f.__name__}'[:50], val=int(duration * 1000))
+
+
+def start_worker(jobs, started, results):
+    # a collector which overruns its timeout can't be killed, so the workers are daemons and are abandoned
+    threading.Thread(target=run_collectors, args=(jobs, started, results), daemon=True).start()
+
+
+def pull(collectors, workers, timeout, poll_interval=1):
+    """Run the collectors on `workers` threads and return their stats, plus one duration stat per collector.
+
+    A collector which overruns `timeout` seconds is abandoned and its worker replaced, so the collectors
+    which haven't started yet still run even when every worker is stuck.
+    """
+    jobs = queue.Queue()
+    for f in collectors:
+        jobs.put(f)
+    started = {}
+    results = queue.Queue()
+    for __ in range(min(workers, len(collectors))):
+        start_worker(jobs, started, results)
+
+    collected = []
+    pending = set(collectors)
+    while pending:
+        try:
+            f, fstats, duration, error = results.get(timeout=poll_interval)
+        except queue.Empty:
+            now = time.time()
+            for f in [f for f in pending if f in started and now - started[f] > timeout]:
+                logger.warning(f'pull_stats: {f.__name__} timed out after {timeout}s')
+                pending.discard(f)
+                collected.append(duration_stat(f, timeout))
+                if not jobs.empty():
+                    start_worker(jobs, started, results)
+            continue
+        if f not in pending:
+            continue
+        pending.discard(f)
+        if error:
+            logger.warning(f'pull_stats: {f.__name__} failed after {duration:.1f}s: {error}')
+        else:
+            print(f'*{f.__name__}* {len(fstats)} stats in {duration:.1f}s')
+        collected += fstats
+        collected.append(duration_stat(f, duration))
+    return collected
 
 
 class Command(BaseCommand):
 
     help = 'pulls all stats'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default=8, type=int, help='number of collectors to run at once')
+        parser.add_argument('--timeout', default=600, type=int, help='seconds each collector may run for')
+
     def handle(self, *args, **options):
+        collected = pull(COLLECTORS, options['workers'], options['timeout'])
 
-        fs = [
-            stats.get_bounty_keyword_counts,
-            stats.get_skills_keyword_counts,
-            stats.github_issues,
-            stats.gitter,
-            stats.medium_subscribers,
-            stats.google_analytics,
-            stats.github_stars,
-            stats.profiles_ingested,
-            stats.chrome_ext_users,
-            stats.firefox_ext_users,
-            stats.slack_users,
-            stats.slack_users_active,
-            stats.twitter_followers,
-            stats.bounties,
-            stats.grants,
-            stats.subs,
-            stats.whitepaper_access,
-            stats.whitepaper_access_request,
-            stats.sendcryptoassets,
-            stats.tips_received,
-            stats.bounties_fulfilled,
-            stats.bounties_open,
-            stats.bounties_by_status_and_keyword,
-            stats.subs_active,
-            stats.joe_dominance_index,
-            stats.avg_time_bounty_turnaround,
-            stats.user_actions,
-            stats.faucet,
-            stats.email_events,
-            stats.bounties_hourly_rate,
-            stats.ens,
-        ]
-
-        for f in fs:
-            try:
-                print("*"+str(f.__name__)+"*")
-                f()
-            except Exception as e:
-                print(e)
+        try:
+            Stat.objects.bulk_create(collected)
+        except Exception as e:
+            # don't lose the whole run to one bad row
+            logger.warning(f'pull_stats: bulk insert failed, saving stats one by one: {e}')
+            for stat in collected:
+                try:
+                    stat.save()
+                except Exception as e:
+                    logger.warning(f'pull_stats: could not save {stat}: {e}')
+        print(f'wrote {len(collected)} stats')
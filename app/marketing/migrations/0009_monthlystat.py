@@ -0,0 +1,29 @@
+# Generated by Django 2.2.4 on 2019-12-10 12:00
+
+from django.db import migrations, models
+import economy.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0008_leaderboardrank_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(db_index=True, default=economy.models.get_time)),
+                ('modified_on', models.DateTimeField(default=economy.models.get_time)),
+                ('key', models.CharField(max_length=50)),
+                ('keyword', models.CharField(blank=True, max_length=50)),
+                ('date', models.DateTimeField()),
+                ('val', models.FloatField(null=True)),
+            ],
+            options={
+                'unique_together': {('key', 'keyword', 'date')},
+            },
+        ),
+    ]
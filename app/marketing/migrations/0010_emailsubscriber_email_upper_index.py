@@ -0,0 +1,18 @@
+# Generated by Django 2.2.4 on 2019-12-12 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketing', '0009_monthlystat'),
+    ]
+
+    # email__iexact lookups compare UPPER("email"::text), which a plain index on email can't serve
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX marketing_emailsubscriber_email_upper ON marketing_emailsubscriber (UPPER(email::text));',
+            'DROP INDEX marketing_emailsubscriber_email_upper;',
+        ),
+    ]
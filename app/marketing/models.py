@@ -23,8 +23,11 @@ from secrets import token_hex
 
 from django.contrib.postgres.fields import ArrayField, JSONField
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models import Case, F, Max, When, Window
+from django.db.models.functions import Lag, TruncHour
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from economy.models import SuperModel
 
@@ -148,11 +151,76 @@ class ManualStat(SuperModel):
     def __str__(self):
         return f"{self.key}: {self.date}: {self.val}"
 
+
+class StatQuerySet(models.QuerySet):
+    """Handle the manager queryset for Stats."""
+
+    def rollup(self, rollup):
+        """Filter results down to the Stats of a rollup window.
+
+        Args:
+            rollup (str): `daily` for the last 30 days at 1am, `weekly` for the last 90 days
+                at 1am on Sundays, or anything else for every Stat of the last 2 days.
+
+        """
+        if rollup == 'daily':
+            return self.filter(created_on__hour=1, created_on__gt=(timezone.now() - timezone.timedelta(days=30)))
+        elif rollup == 'weekly':
+            return self.filter(
+                created_on__hour=1,
+                created_on__week_day=1,
+                created_on__gt=(timezone.now() - timezone.timedelta(days=30 * 3)),
+            )
+        return self.filter(created_on__gt=(timezone.now() - timezone.timedelta(days=2)))
+
+    def series(self, keys, newest_first=False):
+        """Fetch the time series of each of the provided keys with one ordered query.
+
+        Each Stat is annotated with `delta`, the change in `val` since the previous Stat
+        of the same key (None for the first one), computed in the database with LAG.
+
+        Args:
+            keys (list): The Stat keys to fetch.
+            newest_first (bool): Whether to order each series newest first. Defaults to: False.
+
+        Returns:
+            dict: The list of Stats of each key, keyed by key.
+
+        """
+        stats = self.filter(key__in=keys).annotate(
+            delta=F('val') - Window(expression=Lag('val'), partition_by=[F('key')], order_by=F('created_on').asc())
+        ).order_by('key', '-created_on' if newest_first else 'created_on')
+        series = {key: [] for key in keys}
+        for stat in stats:
+            series[stat.key].append(stat)
+        return series
+
+    def pivot(self, keys):
+        """Fetch the values of the provided keys side by side with one grouped query.
+
+        Each row holds the `date` truncated to the hour, and the value of `keys[i]` at that
+        hour as `val_{i}` (None if it wasn't recorded), so one query can feed a chart per key.
+
+        Args:
+            keys (list): The Stat keys to fetch.
+
+        Returns:
+            QuerySet: The rows, oldest first.
+
+        """
+        columns = {f'val_{i}': Max(Case(When(key=key, then=F('val')))) for i, key in enumerate(keys)}
+        return self.filter(key__in=keys).annotate(date=TruncHour('created_on')).values('date').annotate(
+            **columns
+        ).order_by('date')
+
+
 class Stat(SuperModel):
 
     key = models.CharField(max_length=50, db_index=True)
     val = models.IntegerField()
 
+    objects = StatQuerySet.as_manager()
+
     class Meta:
 
         index_together = [
@@ -181,6 +249,26 @@ class Stat(SuperModel):
             return 0
 
 
+class MonthlyStat(SuperModel):
+    """Define the materialized month by month values of a stat series.
+
+    `val` is the value of the series as of `date`; it is null when the series
+    has no value yet at that date.
+    """
+
+    key = models.CharField(max_length=50)
+    keyword = models.CharField(max_length=50, blank=True)
+    date = models.DateTimeField()
+    val = models.FloatField(null=True)
+
+    class Meta:
+
+        unique_together = ('key', 'keyword', 'date')
+
+    def __str__(self):
+        return f"{self.key} {self.keyword}: {self.date}: {self.val}"
+
+
 class LeaderboardRankQuerySet(models.QuerySet):
     """Handle the manager queryset for Leaderboard Ranks."""
 
@@ -361,6 +449,14 @@ class EmailSupressionList(SuperModel):
     def __str__(self):
         return f"{self.email}"
 
+
+@receiver(post_save, sender=EmailSupressionList, dispatch_uid="psave_email_supression_list")
+@receiver(post_delete, sender=EmailSupressionList, dispatch_uid="pdelete_email_supression_list")
+def psave_email_supression_list(sender, instance, **kwargs):
+    from marketing.utils import invalidate_suppression_matcher
+    invalidate_suppression_matcher()
+
+
 class MarketingCallback(SuperModel):
     """Define the Marketing Callback model; which is used to peform
 
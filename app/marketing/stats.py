@@ -17,6 +17,8 @@
 
 '''
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 from django.conf import settings
@@ -26,6 +28,28 @@ from marketing.models import Stat
 from slackclient import SlackClient
 from slackclient.exceptions import SlackClientError
 
+_collected = threading.local()
+
+
+@contextmanager
+def collect_stats():
+    """Buffer the stats recorded by this thread, so the caller can write them in one bulk insert."""
+    _collected.stats = []
+    try:
+        yield _collected.stats
+    finally:
+        _collected.stats = None
+
+
+def record_stat(**kwargs):
+    stat = Stat(**kwargs)
+    buffer = getattr(_collected, 'stats', None)
+    if buffer is None:
+        stat.save()
+    else:
+        buffer.append(stat)
+    return stat
+
 
 def gitter():
     from gitterpy.client import GitterClient
@@ -36,7 +60,7 @@ def gitter():
     # Check_my id
     val = gitter.rooms.grab_room('gitcoinco/Lobby')['userCount']
 
-    Stat.objects.create(
+    record_stat(
         key='gitter_users',
         val=val,
         )
@@ -48,7 +72,7 @@ def google_analytics():
     view_id = '166793585'  # ethwallpaer
     val = run(view_id)
     #print(val)
-    Stat.objects.create(
+    record_stat(
         key='google_analytics_sessions_ethwallpaper',
         val=val,
         )
@@ -56,7 +80,7 @@ def google_analytics():
     view_id = '154797887'  # gitcoin
     val = run(view_id)
     #print(val)
-    Stat.objects.create(
+    record_stat(
         key='google_analytics_sessions_gitcoin',
         val=val,
         )
@@ -65,7 +89,7 @@ def google_analytics():
 def slack_users():
     sc = SlackClient(settings.SLACK_TOKEN)
     ul = sc.api_call("users.list")
-    Stat.objects.create(
+    record_stat(
         key='slack_users',
         val=len(ul['members']),
         )
@@ -80,12 +104,12 @@ def slack_users_active():
     num_away += SlackUser.objects.filter(last_seen=None).count()
 
     # create broader Stat object
-    Stat.objects.create(
+    record_stat(
         key='slack_users_active',
         val=num_active,
         )
 
-    Stat.objects.create(
+    record_stat(
         key='slack_users_away',
         val=num_away,
         )
@@ -94,7 +118,7 @@ def slack_users_active():
 def profiles_ingested():
     from dashboard.models import Profile
 
-    Stat.objects.create(
+    record_stat(
         key='profiles_ingested',
         val=Profile.objects.count(),
         )
@@ -103,22 +127,22 @@ def profiles_ingested():
 def faucet():
     from faucet.models import FaucetRequest
 
-    Stat.objects.create(
+    record_stat(
         key='FaucetRequest',
         val=FaucetRequest.objects.count(),
         )
 
-    Stat.objects.create(
+    record_stat(
         key='FaucetRequest_rejected',
         val=FaucetRequest.objects.filter(rejected=True).count(),
         )
 
-    Stat.objects.create(
+    record_stat(
         key='FaucetRequest_fulfilled',
         val=FaucetRequest.objects.filter(fulfilled=True).count(),
         )
 
-    Stat.objects.create(
+    record_stat(
         key='FaucetRequest_pending',
         val=FaucetRequest.objects.filter(fulfilled=False, rejected=False).count(),
         )
@@ -134,7 +158,7 @@ def user_actions():
             action=action_type,
             ).count()
 
-        Stat.objects.create(
+        record_stat(
             key=f'user_action_{action_type}',
             val=val,
         )
@@ -145,14 +169,14 @@ def github_stars():
     reops = get_user('gitcoinco', '/repos')
     forks_count = sum([repo['forks_count'] for repo in reops])
 
-    Stat.objects.create(
+    record_stat(
         key='github_forks_count',
         val=forks_count,
         )
 
     stargazers_count = sum([repo['stargazers_count'] for repo in reops])
 
-    Stat.objects.create(
+    record_stat(
         key='github_stargazers_count',
         val=stargazers_count,
         )
@@ -181,7 +205,7 @@ def github_issues():
         val = len(issues)
         key = f"github_issues_{org}_{repo}"
         try:
-            Stat.objects.create(
+            record_stat(
                 created_on=timezone.now(),
                 key=key,
                 val=(val),
@@ -203,7 +227,7 @@ def chrome_ext_users():
     classname = 'e-f-ih'
     eles = soup.findAll("span", {"class": classname})
     num_users = eles[0].text.replace(' users', '')
-    Stat.objects.create(
+    record_stat(
         key='browser_ext_chrome',
         val=num_users,
         )
@@ -218,7 +242,7 @@ def firefox_ext_users():
     soup = BeautifulSoup(html_response.text, 'html.parser')
     eles = soup.findAll("div", {"class": 'AddonMeta'})[0].findAll('dt', {"class": 'MetadataCard-title'})
     num_users = eles[0].text.replace(' Users', '').replace('No', '0')
-    Stat.objects.create(
+    record_stat(
         key='browser_ext_firefox',
         val=num_users,
         )
@@ -233,7 +257,7 @@ def medium_subscribers():
     data = json.loads(html_response.text.replace('])}while(1);</x>', ''))
     num_users = data['payload']['references']['Collection']['d414fce43ce1']['metadata']['followerCount']
     #print(num_users)
-    Stat.objects.create(
+    record_stat(
         key='medium_subscribers',
         val=num_users,
         )
@@ -252,7 +276,7 @@ def twitter_followers():
     )
     user = api.GetUser(screen_name=settings.TWITTER_USERNAME)
 
-    Stat.objects.create(
+    record_stat(
         key='twitter_followers',
         val=(user.followers_count),
         )
@@ -260,7 +284,7 @@ def twitter_followers():
     for username in ['owocki', 'gitcoinfeed']:
         user = api.GetUser(screen_name=username)
 
-        Stat.objects.create(
+        record_stat(
             key='twitter_followers_{}'.format(username),
             val=(user.followers_count),
             )
@@ -269,7 +293,7 @@ def twitter_followers():
 def bounties():
     from dashboard.models import Bounty
 
-    Stat.objects.create(
+    record_stat(
         key='bounties',
         val=(Bounty.objects.current().filter(network='mainnet').count()),
         )
@@ -284,7 +308,7 @@ def grants():
         if value_in_usdt:
             val += value_in_usdt
 
-    Stat.objects.create(
+    record_stat(
         key='grants',
         val=val,
         )
@@ -309,7 +333,7 @@ def bounties_hourly_rate():
         val = round(float(value)/float(hours), 2)
         try:
             key = 'bounties_hourly_rate_inusd_last_24_hours'
-            Stat.objects.create(
+            record_stat(
                 created_on=that_time,
                 key=key,
                 val=(val),
@@ -344,7 +368,7 @@ def bounties_by_status_and_keyword(created_before=timezone.now()):
 
             for stat in stats_to_create:
                 #print(stat, created_before)
-                Stat.objects.create(
+                record_stat(
                     created_on=created_before,
                     key=stat[0],
                     val=stat[1],
@@ -391,7 +415,7 @@ def joe_dominance_index(created_before=timezone.now()):
 
             for stat in stats_to_create:
                 print(stat, created_before)
-                Stat.objects.create(
+                record_stat(
                     created_on=created_before,
                     key=stat[0],
                     val=stat[1],
@@ -413,7 +437,7 @@ def avg_time_bounty_turnaround():
         turnaround_times = [b.turnaround_time_submitted for b in all_bounties if b.turnaround_time_submitted]
         val = int(statistics.median(turnaround_times) / 60 / 60)  # seconds to hours
 
-        Stat.objects.create(
+        record_stat(
             key=f'turnaround_time__submitted_hours_{days}_days_back',
             val=val,
         )
@@ -421,7 +445,7 @@ def avg_time_bounty_turnaround():
         turnaround_times = [b.turnaround_time_accepted for b in all_bounties if b.turnaround_time_accepted]
         val = int(statistics.median(turnaround_times) / 60 / 60)  # seconds to hours
 
-        Stat.objects.create(
+        record_stat(
             key=f'turnaround_time__accepted_hours_{days}_days_back',
             val=val,
         )
@@ -429,7 +453,7 @@ def avg_time_bounty_turnaround():
         turnaround_times = [b.turnaround_time_started for b in all_bounties if b.turnaround_time_started]
         val = int(statistics.median(turnaround_times) / 60 / 60)  # seconds to hours
 
-        Stat.objects.create(
+        record_stat(
             key=f'turnaround_time__started_hours_{days}_days_back',
             val=val,
         )
@@ -438,7 +462,7 @@ def avg_time_bounty_turnaround():
 def bounties_open():
     from dashboard.models import Bounty
 
-    Stat.objects.create(
+    record_stat(
         key='bounties_open',
         val=(Bounty.objects.current().filter(network='mainnet', idx_status='open').count()),
         )
@@ -447,7 +471,7 @@ def bounties_open():
 def bounties_fulfilled():
     from dashboard.models import Bounty
 
-    Stat.objects.create(
+    record_stat(
         key='bounties_fulfilled',
         val=(Bounty.objects.current().filter(network='mainnet', idx_status='done').count()),
         )
@@ -456,7 +480,7 @@ def bounties_fulfilled():
 def ens():
     from enssubdomain.models import ENSSubdomainRegistration
 
-    Stat.objects.create(
+    record_stat(
         key='ens_subdomains',
         val=(ENSSubdomainRegistration.objects.count()),
         )
@@ -484,7 +508,7 @@ def sendcryptoassets():
 
         for stat in stats_to_create:
             print(stat)
-            Stat.objects.create(
+            record_stat(
                 key=stat[0],
                 val=stat[1],
                 )
@@ -493,7 +517,7 @@ def sendcryptoassets():
 def tips_received():
     from dashboard.models import Tip
 
-    Stat.objects.create(
+    record_stat(
         key='tips_received',
         val=(Tip.objects.filter(network='mainnet').send_success().receive_success().count()),
         )
@@ -502,7 +526,7 @@ def tips_received():
 def subs():
     from marketing.models import EmailSubscriber
 
-    Stat.objects.create(
+    record_stat(
         key='email_subscriberse',
         val=(EmailSubscriber.objects.count()),
         )
@@ -511,7 +535,7 @@ def subs():
 def subs_active():
     from marketing.models import EmailSubscriber
     all_subs = EmailSubscriber.objects.filter(active=True).count()
-    Stat.objects.create(
+    record_stat(
         key='email_subscribers_active',
         val=all_subs,
         )
@@ -524,7 +548,7 @@ def subs_active():
         }
         unsubs = EmailSubscriber.objects.filter(**kwargs).count()
         val = all_subs - unsubs
-        Stat.objects.create(
+        record_stat(
             key=f'email_subscribers_active_{key}',
             val=val,
             )
@@ -535,7 +559,7 @@ def subs_active():
 def whitepaper_access():
     from tdi.models import WhitepaperAccess
 
-    Stat.objects.create(
+    record_stat(
         key='whitepaper_access',
         val=(WhitepaperAccess.objects.count()),
         )
@@ -544,7 +568,7 @@ def whitepaper_access():
 def whitepaper_access_request():
     from tdi.models import WhitepaperAccessRequest
 
-    Stat.objects.create(
+    record_stat(
         key='whitepaper_access_request',
         val=(WhitepaperAccessRequest.objects.count()),
         )
@@ -561,7 +585,7 @@ def get_skills_keyword_counts():
             keywords[keyword] += 1
     for keyword, val in keywords.items():
         #print(keyword, val)
-        Stat.objects.create(
+        record_stat(
             key=f"subscribers_with_skill_{keyword}",
             val=(val),
             )
@@ -579,7 +603,7 @@ def get_bounty_keyword_counts():
     for keyword, val in keywords.items():
         #print(keyword, val)
         try:
-            Stat.objects.create(
+            record_stat(
                 key=f"bounties_with_skill_{keyword}",
                 val=(val),
                 )
@@ -593,7 +617,7 @@ def email_events():
     for event in events:
         val = EmailEvent.objects.filter(event=event).count()
         #print(val)
-        Stat.objects.create(
+        record_stat(
             key='email_{}'.format(event),
             val=(val),
             )
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Handle pull_stats command related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+import threading
+
+from marketing.management.commands.pull_stats import pull
+from marketing.stats import record_stat
+from test_plus.test import TestCase
+
+
+class TestPullStats(TestCase):
+    """Define tests for pull_stats."""
+
+    def setUp(self):
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def hangs(self):
+        self.release.wait()
+
+    @staticmethod
+    def counts():
+        record_stat(key='counts', val=1)
+
+    @staticmethod
+    def fails():
+        raise ValueError('no api key')
+
+    def test_pull_collects_stats_and_durations(self):
+        """Test pull_stats returns the buffered stats and a duration for failing collectors too."""
+        collected = pull([self.counts, self.fails], workers=2, timeout=60, poll_interval=0.01)
+        keys = sorted(stat.key for stat in collected)
+        assert keys == ['counts', 'pull_stats_duration_counts', 'pull_stats_duration_fails']
+
+    def test_pull_replaces_stuck_workers(self):
+        """Test pull_stats still runs the waiting collectors when every worker is stuck on a timed out one."""
+        collected = pull([self.hangs, self.counts], workers=1, timeout=0.1, poll_interval=0.01)
+        durations = {stat.key: stat.val for stat in collected if stat.key.startswith('pull_stats_duration')}
+        assert durations['pull_stats_duration_hangs'] == 100
+        assert 'pull_stats_duration_counts' in durations
+        assert [stat.key for stat in collected].count('counts') == 1
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Handle marketing model related tests.
+
+Copyright (C) 2018 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from django.utils import timezone
+
+from marketing.models import Stat
+from test_plus.test import TestCase
+
+
+class StatQuerySetTest(TestCase):
+    """Define tests for the Stat queryset."""
+
+    def setUp(self):
+        """Perform setup for the testcase."""
+        now = timezone.now()
+        # a sunday at 1am that is outside of the 2 day window of the hourly rollup
+        days_since_sunday = now.isoweekday() % 7
+        if days_since_sunday < 3:
+            days_since_sunday += 7
+        sunday = (now - timezone.timedelta(days=days_since_sunday)).replace(hour=1, minute=0, second=0, microsecond=0)
+        self.weekly = Stat.objects.create(key='mykey', val=1, created_on=sunday)
+        self.hourly = Stat.objects.create(key='mykey', val=2, created_on=sunday - timezone.timedelta(hours=1))
+        self.daily = Stat.objects.create(key='mykey', val=3, created_on=sunday - timezone.timedelta(days=1))
+        self.old = Stat.objects.create(key='mykey', val=4, created_on=sunday - timezone.timedelta(days=35))
+        self.expired = Stat.objects.create(key='mykey', val=5, created_on=sunday - timezone.timedelta(days=91))
+        self.recent = Stat.objects.create(key='mykey', val=6, created_on=now - timezone.timedelta(hours=1))
+
+    def test_rollup_daily(self):
+        """Test the daily rollup keeps the 1am Stats of the last 30 days."""
+        stats = set(Stat.objects.rollup('daily'))
+        assert {self.weekly, self.daily} <= stats
+        assert not {self.hourly, self.old, self.expired} & stats
+
+    def test_rollup_weekly(self):
+        """Test the weekly rollup keeps the Sunday 1am Stats of the last 90 days."""
+        stats = set(Stat.objects.rollup('weekly'))
+        assert {self.weekly, self.old} <= stats
+        assert not {self.hourly, self.daily, self.expired} & stats
+
+    def test_rollup_hourly(self):
+        """Test any other rollup keeps every Stat of the last 2 days."""
+        assert list(Stat.objects.rollup('hourly')) == [self.recent]
+        assert list(Stat.objects.rollup(None)) == [self.recent]
+
+    def test_pivot(self):
+        """Test pivot lines up the values of several keys by hour in one query."""
+        Stat.objects.create(key='otherkey', val=7, created_on=self.weekly.created_on)
+
+        stats = Stat.objects.filter(created_on__gte=self.hourly.created_on, created_on__lte=self.weekly.created_on)
+
+        with self.assertNumQueries(1):
+            rows = list(stats.pivot(['mykey', 'otherkey', 'nokey']))
+
+        assert rows == [
+            {'date': self.hourly.created_on, 'val_0': 2, 'val_1': None, 'val_2': None},
+            {'date': self.weekly.created_on, 'val_0': 1, 'val_1': 7, 'val_2': None},
+        ]
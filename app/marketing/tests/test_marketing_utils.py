@@ -17,7 +17,7 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 """
-from marketing.models import EmailSubscriber, Stat
+from marketing.models import EmailSubscriber, EmailSupressionList, Stat
 from marketing.utils import func_name, get_or_save_email_subscriber, get_stat, should_suppress_notification_email
 from test_plus.test import TestCase
 
@@ -95,3 +95,12 @@ class MarketingEmailUtilsTest(TestCase):
         self.assertIsNotNone(get_or_save_email_subscriber('newemail@gitcoin.co', 'mysource', send_slack_invite=False))
 
         assert EmailSubscriber.objects.filter().count() == 4
+
+    def test_get_or_save_email_subscriber_suppressed(self):
+        """Test the marketing util get_or_save_email_subscriber method skips suppressed addresses."""
+        suppression = EmailSupressionList.objects.create(email='.*@suppressed.co')
+        EmailSupressionList.objects.create(email='[invalid')
+        assert get_or_save_email_subscriber('foo@suppressed.co', 'mysource', send_slack_invite=False) is None
+
+        suppression.delete()
+        assert get_or_save_email_subscriber('foo@suppressed.co', 'mysource', send_slack_invite=False)
@@ -20,9 +20,11 @@ import logging
 import re
 import sys
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
 from django.templatetags.static import static
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
@@ -35,6 +37,9 @@ from slackclient.exceptions import SlackClientError
 
 logger = logging.getLogger(__name__)
 
+SUPPRESSION_PATTERNS_CACHE_KEY = 'email_suppression_patterns'
+SUPPRESSION_PATTERNS_TIMEOUT = 60 * 60 * 24
+
 
 def delete_user_from_mailchimp(email_address):
     client = MailChimp(mc_user=settings.MAILCHIMP_USER, mc_api=settings.MAILCHIMP_API_KEY)
@@ -202,12 +207,40 @@ def should_suppress_notification_email(email, email_type):
     return False
 
 
+@lru_cache(maxsize=8)
+def compile_suppression_matcher(patterns):
+    """Build a single matcher out of the suppression list patterns, skipping the invalid ones."""
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as e:
+            logger.warning(f'skipping invalid email suppression pattern {pattern}: {e}')
+    if not compiled:
+        return lambda email: None
+    try:
+        return re.compile('|'.join(f'(?:{regex.pattern})' for regex in compiled)).match
+    except re.error:
+        # eg inline flags, which are only allowed at the start of a pattern
+        return lambda email: any(regex.match(email) for regex in compiled)
+
+
+def get_suppression_matcher():
+    patterns = cache.get(SUPPRESSION_PATTERNS_CACHE_KEY)
+    if patterns is None:
+        patterns = list(EmailSupressionList.objects.order_by('pk').values_list('email', flat=True))
+        cache.set(SUPPRESSION_PATTERNS_CACHE_KEY, patterns, SUPPRESSION_PATTERNS_TIMEOUT)
+    return compile_suppression_matcher(tuple(str(pattern) for pattern in patterns))
+
+
+def invalidate_suppression_matcher():
+    cache.delete(SUPPRESSION_PATTERNS_CACHE_KEY)
+
+
 def get_or_save_email_subscriber(email, source, send_slack_invite=True, profile=None):
     # Prevent syncing for those who match the suppression list
-    suppressions = EmailSupressionList.objects.all()
-    for suppression in suppressions:
-        if re.match(str(suppression.email), email):
-            return None
+    if get_suppression_matcher()(email):
+        return None
 
     # GDPR fallback just in case
     if re.match("c.*d.*v.*c@g.*com", email):
@@ -221,23 +254,11 @@ def get_or_save_email_subscriber(email, source, send_slack_invite=True, profile=
 
     created = False
     try:
-        already_exists = EmailSubscriber.objects.filter(email__iexact=email)
-        if already_exists.exists():
-            es = already_exists.first()
-        else:
+        es = EmailSubscriber.objects.filter(email__iexact=email).first()
+        if not es:
             es = EmailSubscriber.objects.create(**defaults)
             created = True
         print("EmailSubscriber:", es, "- created" if created else "- updated")
-    except EmailSubscriber.MultipleObjectsReturned:
-        email_subscriber_ids = EmailSubscriber.objects.filter(email__iexact=email) \
-            .values_list('id', flat=True) \
-            .order_by('-created_on')[1:]
-        EmailSubscriber.objects.filter(pk__in=list(email_subscriber_ids)).delete()
-        es = EmailSubscriber.objects.get(email__iexact=email)
-        created = False
-    except EmailSubscriber.DoesNotExist:
-        es = EmailSubscriber.objects.create(**defaults)
-        created = True
     except Exception as e:
         print(f'Failed to update or create email subscriber: ({email}) - {e}')
         return ''
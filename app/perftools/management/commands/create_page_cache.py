@@ -46,7 +46,7 @@ def create_grants_cache():
 
 
 def create_quests_cache():
-    from quests.helpers import generate_leaderboard
+    from quests.helpers import generate_leaderboard, refresh_quest_stats
     from quests.views import current_round_number
     for i in range(1, current_round_number+1):
         print(f'quests_{i}')
@@ -58,10 +58,11 @@ def create_quests_cache():
             key=keyword,
             data=json.loads(json.dumps(data, cls=EncodeAnything)),
             )
+    refresh_quest_stats()
 
     from quests.models import Quest
     for quest in Quest.objects.filter(visible=True):
-        quest.save()
+        quest.refresh_ui_data()
 
 
 def create_results_cache():
@@ -0,0 +1,72 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+
+from dashboard.models import Bounty, Profile
+from dashboard.utils import get_url_first_indexes
+from kudos.models import Token
+from perftools.models import SitemapURL
+
+BATCH_SIZE = 5000
+
+
+def issue_urls():
+    bounties = Bounty.objects.current().only('pk', 'github_url', 'standard_bounties_id', 'modified_on')
+    for bounty in bounties.iterator(chunk_size=BATCH_SIZE):
+        yield bounty.get_relative_url(), bounty.modified_on
+
+
+def profile_urls():
+    # mirrors Profile.get_relative_url without walking the urlconf once per profile
+    url_first_indexes = set(get_url_first_indexes())
+    profiles = Profile.objects.filter(hide_profile=False).values_list('handle', 'modified_on')
+    for handle, modified_on in profiles.iterator(chunk_size=BATCH_SIZE):
+        prefix = 'profile/' if handle in url_first_indexes else ''
+        yield f"/{prefix}{handle}", modified_on
+
+
+def kudos_urls():
+    tokens = Token.objects.filter(hidden=False).values_list('pk', 'name', 'modified_on')
+    for pk, name, modified_on in tokens.iterator(chunk_size=BATCH_SIZE):
+        yield f'/kudos/{pk}/{slugify(name)}', modified_on
+
+
+def create_sitemap_urls(section, urls):
+    print(section)
+    with transaction.atomic():
+        SitemapURL.objects.filter(section=section).delete()
+        items = []
+        for location, lastmod in urls:
+            items.append(SitemapURL(section=section, location=location, lastmod=lastmod))
+            if len(items) >= BATCH_SIZE:
+                SitemapURL.objects.bulk_create(items)
+                items = []
+        SitemapURL.objects.bulk_create(items)
+
+
+class Command(BaseCommand):
+
+    help = 'precomputes the urls served by the issue, profile and kudos sitemaps'
+
+    def handle(self, *args, **options):
+        create_sitemap_urls('issues', issue_urls())
+        create_sitemap_urls('orgs', profile_urls())
+        create_sitemap_urls('kudos', kudos_urls())
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.4 on 2019-12-06 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perftools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapURL',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(db_index=True, max_length=50)),
+                ('location', models.CharField(max_length=2000)),
+                ('lastmod', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
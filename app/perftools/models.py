@@ -18,3 +18,15 @@ class JSONStore(SuperModel):
         if not self:
             return "none"
         return f" {self.view} / {self.key} "
+
+
+class SitemapURL(models.Model):
+    """Define the precomputed (location, lastmod) rows served by the sitemaps."""
+
+    section = models.CharField(max_length=50, db_index=True)
+    location = models.CharField(max_length=2000)
+    lastmod = models.DateTimeField(null=True)
+
+    def __str__(self):
+        """Define the string representation of SitemapURL."""
+        return f"{self.section} / {self.location}"
@@ -5,6 +5,9 @@ from app.sitemaps import sitemaps
 
 
 @cache_page(60 * 60 * 24)
-def sitemap(request, section=None, template_name='sitemap.xml', mimetype='application/xml'): 
-    from django.contrib.sitemaps.views import sitemap
+def sitemap(request, section=None, template_name='sitemap.xml', mimetype='application/xml'):
+    from django.contrib.sitemaps.views import index, sitemap
+    if not section:
+        # the sections are paginated, so the root sitemap lists the page of each section
+        return index(request, sitemaps, content_type=mimetype, sitemap_url_name='sitemap_section')
     return sitemap(request, sitemaps, section, template_name, mimetype)
@@ -5,14 +5,16 @@ import random
 
 from django.conf import settings
 from django.contrib import messages
-from django.db.models import Count
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
 from django.shortcuts import redirect, render
 from django.utils import timezone
 
-from dashboard.models import Activity
+from dashboard.models import Activity, HackathonRegistration
 from inbox.utils import send_notification_to_user
 from kudos.models import BulkTransferCoupon, BulkTransferRedemption, Token
 from kudos.views import get_profile
+from marketing.models import EmailSubscriber
 from perftools.models import JSONStore
 from quests.models import Quest, QuestAttempt, QuestPointAward
 
@@ -20,6 +22,59 @@ logger = logging.getLogger(__name__)
 
 max_ref_depth = 4
 
+QUEST_STATS_CACHE_KEY = 'quest_index_stats'
+QUEST_STATS_TIMEOUT = 60 * 10
+
+
+class QuestProgress:
+    """What a user has beaten, unlocked and recently failed across all quests, loaded in two queries.
+
+    Mirrors Quest.is_beaten, Quest.is_unlocked_for and Quest.is_within_cooldown_period, for pages
+    which check many quests at once.
+    """
+
+    def __init__(self, user):
+        self.beaten = set()
+        self.last_failed = {}
+        self.hackathons = set()
+        self.is_authenticated = user.is_authenticated
+        if not self.is_authenticated:
+            return
+
+        attempts = user.profile.quest_attempts.values('quest').annotate(
+            num_wins=Count('pk', filter=Q(success=True)),
+            last_failed=Max('created_on', filter=Q(success=False)),
+        )
+        for attempt in attempts:
+            if attempt['num_wins']:
+                self.beaten.add(attempt['quest'])
+            if attempt['last_failed']:
+                self.last_failed[attempt['quest']] = attempt['last_failed']
+        self.hackathons = set(
+            HackathonRegistration.objects.filter(registrant=user.profile).values_list('hackathon', flat=True)
+        )
+
+    def is_beaten(self, quest):
+        return quest.pk in self.beaten
+
+    def is_unlocked(self, quest):
+        if not quest.unlocked_by_quest_id and not quest.unlocked_by_hackathon_id:
+            return True
+
+        if not self.is_authenticated:
+            return False
+
+        is_unlocked = False
+        if quest.unlocked_by_quest_id:
+            is_unlocked = quest.unlocked_by_quest_id in self.beaten
+        if quest.unlocked_by_hackathon_id:
+            is_unlocked = quest.unlocked_by_hackathon_id in self.hackathons
+        return is_unlocked
+
+    def is_within_cooldown_period(self, quest):
+        last_failed = self.last_failed.get(quest.pk)
+        return bool(last_failed) and last_failed > timezone.now() - timezone.timedelta(minutes=quest.cooldown_minutes)
+
 def record_quest_activity(quest, associated_profile, event_name, override_created=None):
     """
     Creates activity feeds from people doing quests.
@@ -218,6 +273,50 @@ def get_leaderboard(max_entries=25, round_number=1):
         return {}
 
 
+def get_quest_stats():
+    """Get the aggregate stats and round leaderboards of the /quests page, refreshed every QUEST_STATS_TIMEOUT."""
+    stats = cache.get(QUEST_STATS_CACHE_KEY)
+    if stats is None:
+        stats = refresh_quest_stats()
+    return stats
+
+
+def refresh_quest_stats():
+    stats = generate_quest_stats()
+    cache.set(QUEST_STATS_CACHE_KEY, stats, QUEST_STATS_TIMEOUT)
+    return stats
+
+
+def generate_quest_stats():
+    from quests.views import current_round_number
+    attempts = QuestAttempt.objects.aggregate(
+        attempt_count=Count('pk'),
+        success_count=Count('pk', filter=Q(success=True)),
+        user_count=Count('profile', distinct=True),
+        first_attempt_on=Min('created_on'),
+    )
+    quests = Quest.objects.aggregate(
+        quest_count=Count('pk'),
+        visible_count=Count('pk', filter=Q(visible=True)),
+        gitcoin_created=Count('pk', filter=Q(visible=True, creator__handle='gitcoinbot')),
+    )
+
+    attempt_count = attempts['attempt_count']
+    days = (attempts['first_attempt_on'] - timezone.now()).days if attempt_count else 0
+    return {
+        'attempt_count': attempt_count,
+        'success_count': attempts['success_count'],
+        'user_count': attempts['user_count'],
+        'quests_attempts_per_day': abs(round(attempt_count / days, 1)) if days else 0,
+        'avg_play_count': round(attempt_count / (quests['quest_count'] or 1), 1),
+        'total_visible_quest_count': quests['visible_count'],
+        'gitcoin_created': quests['gitcoin_created'],
+        'community_created': quests['visible_count'] - quests['gitcoin_created'],
+        'email_count': EmailSubscriber.objects.count(),
+        'leaderboard': {i: get_leaderboard(round_number=i) for i in range(1, current_round_number + 1)},
+    }
+
+
 def generate_leaderboard(max_entries=25, round_number=1):
     """
     Gets the leaderboard that will be shown on /quests landing page
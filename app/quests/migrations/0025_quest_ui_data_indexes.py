@@ -0,0 +1,22 @@
+# Generated by Django 2.2.4 on 2019-12-12 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quests', '0024_auto_20191204_1924'),
+    ]
+
+    # the quest index orders by these denormalized ui_data keys, eg order_by('-ui_data__success_pct')
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX quests_quest_ui_data_success_pct ON quests_quest ((ui_data -> 'success_pct'));",
+            'DROP INDEX quests_quest_ui_data_success_pct;',
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX quests_quest_ui_data_attempts_count ON quests_quest ((ui_data -> 'attempts_count'));",
+            'DROP INDEX quests_quest_ui_data_attempts_count;',
+        ),
+    ]
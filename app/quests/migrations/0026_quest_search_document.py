@@ -0,0 +1,54 @@
+# Generated by Django 2.2.4 on 2019-12-12 12:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def get_json_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from get_json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from get_json_strings(item)
+
+
+def get_search_document(title, description, questions, game_schema, game_metadata):
+    # copied from quests.models so this migration keeps working if the model helper changes
+    texts = [title, description]
+    for document in [questions, game_schema, game_metadata]:
+        texts += get_json_strings(document)
+    return '\n'.join(texts).lower()
+
+
+def fill_search_document(apps, schema_editor):
+    Quest = apps.get_model('quests', 'Quest')
+    for quest in Quest.objects.all().iterator():
+        quest.search_document = get_search_document(
+            quest.title, quest.description, quest.questions, quest.game_schema, quest.game_metadata,
+        )
+        quest.save(update_fields=['search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quests', '0025_quest_ui_data_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='quest',
+            name='search_document',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(fill_search_document, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='quests_quest_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,8 +1,10 @@
 import random
 
 from django.contrib.postgres.fields import ArrayField, JSONField
-from django.db import models
-from django.db.models.signals import pre_save
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.text import slugify
@@ -12,6 +14,35 @@ from economy.models import SuperModel
 
 num_backgrounds = 33
 
+# the ui_data keys which are kept up to date as attempts and feedback come in, see Quest.increment_ui_data
+UI_DATA_COUNTERS = ['attempts_count', 'success_count', 'success_pct', 'feedbacks']
+
+
+def get_json_strings(value):
+    """Get the string values nested in a JSON document, leaving out its keys."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from get_json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from get_json_strings(item)
+
+
+def get_search_document(title, description, questions, game_schema, game_metadata):
+    """Build the lowercased text which quest searches match against."""
+    texts = [title, description]
+    for document in [questions, game_schema, game_metadata]:
+        texts += get_json_strings(document)
+    return '\n'.join(texts).lower()
+
+
+def get_success_pct(success_count, attempts_count):
+    if not attempts_count:
+        return 0
+    return round(success_count * 100 / attempts_count)
+
 
 class Quest(SuperModel):
     DIFFICULTIES = [
@@ -55,7 +86,13 @@ class Quest(SuperModel):
     )
     ui_data = JSONField(default=dict, blank=True)
     edit_comments = models.TextField(default='', blank=True)
-    
+    search_document = models.TextField(default='', blank=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_document'], name='quests_quest_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
     def __str__(self):
         """Return the string representation of this obj."""
         return f'{self.pk}, {self.title} (visible: {self.visible})'
@@ -182,7 +219,7 @@ class Quest(SuperModel):
         ]
         if (timezone.now() - self.created_on).days < 5:
             tags.append('new')
-        if self.attempts.count() > 400:
+        if self.ui_data.get('attempts_count', 0) > 400:
             tags.append('popular')
 
         return tags
@@ -190,10 +227,49 @@ class Quest(SuperModel):
 
     @property
     def success_pct(self):
-        attempts = self.attempts.count()
-        if not attempts:
-            return 0
-        return round(self.success_count * 100 / attempts)
+        return get_success_pct(self.success_count, self.attempts.count())
+
+    def get_ui_data_counters(self):
+        """Aggregate the ui_data counters from the whole attempt and feedback history."""
+        attempts = self.attempts.aggregate(
+            attempts_count=Count('pk'),
+            success_count=Count('pk', filter=Q(success=True)),
+        )
+        return {
+            'attempts_count': attempts['attempts_count'],
+            'success_count': attempts['success_count'],
+            'success_pct': get_success_pct(attempts['success_count'], attempts['attempts_count']),
+            'feedbacks': self.feedbacks,
+        }
+
+    def refresh_ui_data(self):
+        """Re-aggregate the ui_data counters, eg to correct them after attempts were deleted."""
+        self.save()
+        with transaction.atomic():
+            Quest.objects.select_for_update().only('pk').get(pk=self.pk)
+            self.ui_data.update(self.get_ui_data_counters())
+            Quest.objects.filter(pk=self.pk).update(ui_data=self.ui_data)
+
+    def increment_ui_data(self, attempts=0, successes=0, vote=None, comment=None):
+        """Count a new attempt, win or feedback in ui_data without re-aggregating the quest's history."""
+        with transaction.atomic():
+            quest = Quest.objects.select_for_update().only('pk', 'ui_data').get(pk=self.pk)
+            ui_data = quest.ui_data
+            if 'success_count' not in ui_data:
+                # counters from before they were kept incrementally, which already include this change
+                ui_data.update(self.get_ui_data_counters())
+            else:
+                ui_data['attempts_count'] = ui_data.get('attempts_count', 0) + attempts
+                ui_data['success_count'] += successes
+                ui_data['success_pct'] = get_success_pct(ui_data['success_count'], ui_data['attempts_count'])
+                if vote is not None:
+                    feedbacks = ui_data.setdefault('feedbacks', {'ratio': 0, 'stats': {}, 'feedback': []})
+                    stats = feedbacks['stats']
+                    stats[str(vote)] = stats.get(str(vote), 0) + 1
+                    feedbacks['ratio'] = stats.get('1', 0) / sum(stats.values())
+                    feedbacks['feedback'].append(comment)
+            Quest.objects.filter(pk=self.pk).update(ui_data=ui_data)
+        self.ui_data.update({key: ui_data[key] for key in UI_DATA_COUNTERS if key in ui_data})
 
     def is_unlocked_for(self, user):
         if not self.unlocked_by_quest and not self.unlocked_by_hackathon:
@@ -250,10 +326,21 @@ class Quest(SuperModel):
 def psave_quest(sender, instance, **kwargs):
     if not instance.background:
         instance.background = instance.assign_background
-    instance.ui_data['attempts_count'] = instance.attempts.count()
+    instance.search_document = get_search_document(
+        instance.title, instance.description, instance.questions, instance.game_schema, instance.game_metadata,
+    )
+    if not instance.pk:
+        instance.ui_data.update({
+            'attempts_count': 0,
+            'success_count': 0,
+            'success_pct': 0,
+            'feedbacks': {'ratio': 0, 'stats': {'1': 0, '-1': 0, '0': 0}, 'feedback': []},
+        })
+    elif not kwargs.get('update_fields'):
+        # don't overwrite counters incremented since this instance was loaded
+        stored_ui_data = Quest.objects.filter(pk=instance.pk).values_list('ui_data', flat=True).first() or {}
+        instance.ui_data.update({key: stored_ui_data[key] for key in UI_DATA_COUNTERS if key in stored_ui_data})
     instance.ui_data['tags'] = instance.tags
-    instance.ui_data['success_pct'] = instance.success_pct
-    instance.ui_data['feedbacks'] = instance.feedbacks
     instance.ui_data['creator'] = {
         'url': instance.creator.url,
         'handle': instance.creator.handle,
@@ -275,6 +362,21 @@ class QuestAttempt(SuperModel):
         """Return the string representation of this obj."""
         return f'{self.pk}, {self.profile.handle} => {self.quest.title} state: {self.state} success: {self.success}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember whether the attempt was already won, so a win is only counted once
+        instance._loaded_success = instance.__dict__.get('success')
+        return instance
+
+
+@receiver(post_save, sender=QuestAttempt, dispatch_uid="psave_questattempt")
+def psave_questattempt(sender, instance, created, **kwargs):
+    is_new_win = instance.success and (created or instance.__dict__.get('_loaded_success') is False)
+    if instance.quest_id and (created or is_new_win):
+        instance.quest.increment_ui_data(attempts=int(created), successes=int(is_new_win))
+    instance._loaded_success = instance.success
+
 
 class QuestFeedback(SuperModel):
 
@@ -292,6 +394,12 @@ class QuestFeedback(SuperModel):
         return f'{self.pk}, {self.profile.handle} => {self.quest.title} ({self.comment})'
 
 
+@receiver(post_save, sender=QuestFeedback, dispatch_uid="psave_questfeedback")
+def psave_questfeedback(sender, instance, created, **kwargs):
+    if created and instance.quest_id:
+        instance.quest.increment_ui_data(vote=instance.vote, comment=instance.comment)
+
+
 class QuestPointAward(SuperModel):
 
     questattempt = models.ForeignKey('quests.QuestAttempt', related_name='pointawards', on_delete=models.CASCADE)
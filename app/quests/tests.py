@@ -5,6 +5,8 @@ from django.test import TestCase
 from django.urls import reverse
 
 from dashboard.models import Profile
+from quests.helpers import QuestProgress, generate_quest_stats
+from quests.models import Quest, QuestAttempt, QuestFeedback
 from rest_framework import status
 
 CURRENT_USERNAME = "bot_dude"
@@ -15,7 +17,9 @@ class QuestTest(TestCase):
     def setUp(self):
         self.current_user = User.objects.create(
             password=CURRENT_PASSWORD, username=CURRENT_USERNAME)
-        Profile.objects.create(user=self.current_user, data={}, hide_profile=False, handle=CURRENT_USERNAME)
+        self.profile = Profile.objects.create(
+            user=self.current_user, data={}, hide_profile=False, handle=CURRENT_USERNAME
+        )
 
     def test_new_quest_not_raise_exception_with_negative_seconds_to_responds(self):
         """Test abs function on seconds to prevent set negative second to respond on quests questions"""
@@ -43,3 +47,78 @@ class QuestTest(TestCase):
         response = self.client.post(path, data, content_type="application/x-www-form-urlencoded")
 
         self.assertRedirects(response, '/login/github?next=' + path, target_status_code=302)
+
+    def test_quest_progress_matches_quest_checks(self):
+        """Test QuestProgress resolves the same beaten, unlocked and cooldown status as the Quest methods"""
+        first = Quest.objects.create(title='first', creator=self.profile)
+        second = Quest.objects.create(title='second', creator=self.profile, unlocked_by_quest=first)
+        third = Quest.objects.create(title='third', creator=self.profile, cooldown_minutes=60)
+        QuestAttempt.objects.create(quest=first, profile=self.profile, success=False)
+        QuestAttempt.objects.create(quest=first, profile=self.profile, success=True)
+        QuestAttempt.objects.create(quest=third, profile=self.profile, success=False)
+
+        progress = QuestProgress(self.current_user)
+        for quest in [first, second, third]:
+            self.assertEqual(progress.is_beaten(quest), quest.is_beaten(self.current_user))
+            self.assertEqual(progress.is_unlocked(quest), quest.is_unlocked_for(self.current_user))
+            self.assertEqual(
+                progress.is_within_cooldown_period(quest), quest.is_within_cooldown_period(self.current_user)
+            )
+        self.assertEqual(progress.beaten, {first.pk})
+        self.assertTrue(progress.is_unlocked(second))
+        self.assertTrue(progress.is_within_cooldown_period(third))
+
+    def test_generate_quest_stats(self):
+        """Test generate_quest_stats aggregates the quest attempts and quests for the quest index"""
+        gitcoinbot = Profile.objects.create(data={}, handle='gitcoinbot')
+        quest = Quest.objects.create(title='first', creator=gitcoinbot)
+        Quest.objects.create(title='second', creator=self.profile)
+        Quest.objects.create(title='hidden', creator=self.profile, visible=False)
+        QuestAttempt.objects.create(quest=quest, profile=self.profile, success=False)
+        QuestAttempt.objects.create(quest=quest, profile=self.profile, success=True)
+
+        stats = generate_quest_stats()
+        self.assertEqual(stats['attempt_count'], 2)
+        self.assertEqual(stats['success_count'], 1)
+        self.assertEqual(stats['user_count'], 1)
+        self.assertEqual(stats['total_visible_quest_count'], 2)
+        self.assertEqual(stats['gitcoin_created'], 1)
+        self.assertEqual(stats['community_created'], 1)
+        self.assertEqual(stats['avg_play_count'], 0.7)
+
+    def test_quest_ui_data_counters_are_incremental(self):
+        """Test the quest ui_data counters follow new attempts, wins and feedback"""
+        quest = Quest.objects.create(title='first', creator=self.profile)
+        QuestAttempt.objects.create(quest=quest, profile=self.profile, success=False)
+        QuestAttempt.objects.create(quest=quest, profile=self.profile, success=False)
+        attempt = QuestAttempt.objects.get(pk=QuestAttempt.objects.last().pk)
+        attempt.success = True
+        attempt.save()
+        attempt.save()
+        QuestFeedback.objects.create(quest=quest, profile=self.profile, vote=1, comment='fun')
+        QuestFeedback.objects.create(quest=quest, profile=self.profile, vote=-1, comment='hard')
+
+        quest.refresh_from_db()
+        self.assertEqual(quest.ui_data['attempts_count'], 2)
+        self.assertEqual(quest.ui_data['success_count'], 1)
+        self.assertEqual(quest.ui_data['success_pct'], 50)
+        self.assertEqual(quest.ui_data['feedbacks']['ratio'], 0.5)
+        self.assertEqual(quest.ui_data['feedbacks']['feedback'], ['fun', 'hard'])
+
+        quest.title = 'renamed'
+        quest.save()
+        quest.refresh_from_db()
+        self.assertEqual(quest.ui_data['attempts_count'], 2)
+
+    def test_quest_search_document(self):
+        """Test the quest search document holds the quest text and the string values of its JSON fields"""
+        quest = Quest.objects.create(
+            title='Mighty Mana',
+            creator=self.profile,
+            questions=[{'question': 'What is ENS?', 'responses': [{'answer': 'A Name Service', 'correct': True}]}],
+            game_metadata={'enemy': {'title': 'Gas Goblin'}},
+        )
+        self.assertIn('what is ens?', quest.search_document)
+        self.assertIn('a name service', quest.search_document)
+        self.assertNotIn('correct', quest.search_document)
+        self.assertEqual(list(Quest.objects.filter(search_document__contains='gas goblin')), [quest])
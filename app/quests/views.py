@@ -7,7 +7,7 @@ import time
 
 from django.conf import settings
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, render
 from django.template.response import TemplateResponse
@@ -15,14 +15,13 @@ from django.templatetags.static import static
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 
-from dashboard.models import Profile
 from kudos.models import BulkTransferCoupon, BulkTransferRedemption, Token
 from marketing.mails import new_quest_request, send_user_feedback
-from marketing.models import EmailSubscriber
 from quests.helpers import (
-    get_leaderboard, max_ref_depth, process_start, process_win, record_award_helper, record_quest_activity,
+    QuestProgress, get_quest_stats, max_ref_depth, process_start, process_win, record_award_helper,
+    record_quest_activity,
 )
-from quests.models import Quest, QuestAttempt, QuestPointAward
+from quests.models import Quest, QuestPointAward
 from quests.quest_types.example import details as example
 from quests.quest_types.quiz_style import details as quiz_style
 from ratelimit.decorators import ratelimit
@@ -39,9 +38,12 @@ def next_quest(request):
         login_redirect = redirect('/login/github?next=' + request.get_full_path())
         return login_redirect
 
-    for quest in Quest.objects.filter(visible=True).order_by('?'):
-        if not quest.is_beaten(request.user) and quest.is_unlocked_for(request.user):
-            return redirect(quest.url)
+    progress = QuestProgress(request.user)
+    quests = Quest.objects.filter(visible=True).exclude(pk__in=progress.beaten) \
+        .only('pk', 'title', 'unlocked_by_quest', 'unlocked_by_hackathon')
+    quests = [quest for quest in quests if progress.is_unlocked(quest)]
+    if quests:
+        return redirect(random.choice(quests).url)
 
     messages.info(request, f'You have beaten every available quest!')
     return redirect('/quests')
@@ -172,6 +174,8 @@ def editquest(request, pk=None):
                     )
                 if type(quest) == int:
                     quest = Quest.objects.get(pk=pk)
+                    # update() skips psave_quest, which keeps the search document in sync
+                    quest.save()
                 new_quest_request(quest, is_edit=bool(pk))
                 msg = f'Quest submission received.  We will respond via email in a few business days.  In the meantime, feel free to test your new quest @ {quest.url}'
                 if pk:
@@ -212,8 +216,8 @@ def editquest(request, pk=None):
     return TemplateResponse(request, 'quests/new.html', params)
 
 
-def get_package_helper(quest_qs, request):
-    return [(ele.is_unlocked_for(request.user), ele.is_beaten(request.user), ele.is_within_cooldown_period(request.user), ele) for ele in quest_qs]
+def get_package_helper(quest_qs, progress):
+    return [(progress.is_unlocked(ele), progress.is_beaten(ele), progress.is_within_cooldown_period(ele), ele) for ele in quest_qs]
 
 
 def index(request):
@@ -229,11 +233,12 @@ def index(request):
     focus_hackathon = request.GET.get('focus_hackathon', False)
 
     if show_quests:
+        progress = QuestProgress(request.user)
 
         # hackathon tab
         if focus_hackathon:
             quest_qs = Quest.objects.filter(visible=True).filter(unlocked_by_hackathon__slug=focus_hackathon)
-            quest_package = get_package_helper(quest_qs, request)
+            quest_package = get_package_helper(quest_qs, progress)
             package = ('Hackathon Quests', quest_package)
             quests.append(package)
 
@@ -241,8 +246,9 @@ def index(request):
 
         # search tab
         if query:
-            quest_qs = Quest.objects.filter(visible=True).filter(Q(title__icontains=query) | Q(description__icontains=query) | Q(questions__icontains=query) | Q(game_schema__icontains=query) | Q(game_metadata__icontains=query)).order_by('-ui_data__success_pct')
-            quest_package = get_package_helper(quest_qs, request)
+            quest_qs = Quest.objects.filter(visible=True, search_document__contains=query.lower()) \
+                .order_by('-ui_data__success_pct')
+            quest_package = get_package_helper(quest_qs, progress)
             package = ('Search', quest_package)
             quests.append(package)
         print(f" phase1.1 at {round(time.time(),2)} ")
@@ -254,20 +260,20 @@ def index(request):
                 beaten = Quest.objects.filter(pk__in=attempts.filter(success=True).values_list('quest', flat=True))
                 unbeaten = Quest.objects.filter(pk__in=attempts.filter(success=False).exclude(quest__in=beaten).values_list('quest', flat=True))
                 if unbeaten.exists():
-                    quests.append(('Attempted', get_package_helper(unbeaten, request)))
+                    quests.append(('Attempted', get_package_helper(unbeaten, progress)))
                     if selected_tab != 'Search':
                         selected_tab = 'Attempted'
                 if beaten.exists():
-                    quests.append(('Beaten', get_package_helper(beaten, request)))
+                    quests.append(('Beaten', get_package_helper(beaten, progress)))
                 created_quests = request.user.profile.quests_created.filter(visible=True)
                 if created_quests:
-                    quests.append(('Created', get_package_helper(created_quests, request)))
+                    quests.append(('Created', get_package_helper(created_quests, progress)))
 
         print(f" phase1.2 at {round(time.time(),2)} ")
         # difficulty tab
         for diff in Quest.DIFFICULTIES:
             quest_qs = Quest.objects.filter(difficulty=diff[0], visible=True).order_by('-ui_data__success_pct')
-            quest_package = get_package_helper(quest_qs, request)
+            quest_package = get_package_helper(quest_qs, progress)
             package = (diff[0], quest_package)
             if quest_qs.exists():
                 quests.append(package)
@@ -276,13 +282,13 @@ def index(request):
         # new quests!
         new_quests = Quest.objects.filter(visible=True, created_on__gt=(timezone.now() - timezone.timedelta(hours=hours_new))).order_by('-ui_data__success_pct')
         if new_quests.exists():
-            quests.append(('New', get_package_helper(new_quests, request)))
+            quests.append(('New', get_package_helper(new_quests, progress)))
 
         print(f" phase1.4 at {round(time.time(),2)} ")
         # popular quests
         popular = Quest.objects.filter(visible=True).order_by('-ui_data__attempts_count')[0:5]
         if popular.exists():
-            quests.append(('Popular', get_package_helper(popular, request)))
+            quests.append(('Popular', get_package_helper(popular, progress)))
 
         # select focus
         if focus_hackathon:
@@ -302,39 +308,33 @@ def index(request):
 
 
     print(f" phase3 at {round(time.time(),2)} ")
-    attempt_count = QuestAttempt.objects.count()
-    success_count = QuestAttempt.objects.filter(success=True).count()
-    print(f" phase3.1 at {round(time.time(),2)} ")
-    leaderboard = {}
-    for i in range(1, current_round_number+1):
-        leaderboard[i] = get_leaderboard(round_number=i)
+    stats = get_quest_stats()
+    attempt_count = stats['attempt_count']
+    success_count = stats['success_count']
     print(f" phase3.2 at {round(time.time(),2)} ")
     point_history = request.user.profile.questpointawards.all() if request.user.is_authenticated else QuestPointAward.objects.none()
     point_value = sum(point_history.values_list('value', flat=True))
     print(f" phase4 at {round(time.time(),2)} ")
 
-    quests_attempts_per_day = (abs(round(QuestAttempt.objects.count() /
-                                         (QuestAttempt.objects.first().created_on - timezone.now()).days, 1))
-                               if QuestAttempt.objects.count() else 0)
     success_ratio = int(success_count / attempt_count * 100) if attempt_count else 0
     # community_created
     params = {
         'profile': request.user.profile if request.user.is_authenticated else None,
         'quests': quests,
-        'avg_play_count': round(QuestAttempt.objects.count()/(Quest.objects.count() or 1), 1),
-        'quests_attempts_total': QuestAttempt.objects.count(),
-        'quests_total': Quest.objects.filter(visible=True).count(),
-        'quests_attempts_per_day': quests_attempts_per_day,
-        'total_visible_quest_count': Quest.objects.filter(visible=True).count(),
-        'gitcoin_created': Quest.objects.filter(visible=True).filter(creator=Profile.objects.filter(handle='gitcoinbot').first()).count(),
-        'community_created': Quest.objects.filter(visible=True).exclude(creator=Profile.objects.filter(handle='gitcoinbot').first()).count(),
+        'avg_play_count': stats['avg_play_count'],
+        'quests_attempts_total': attempt_count,
+        'quests_total': stats['total_visible_quest_count'],
+        'quests_attempts_per_day': stats['quests_attempts_per_day'],
+        'total_visible_quest_count': stats['total_visible_quest_count'],
+        'gitcoin_created': stats['gitcoin_created'],
+        'community_created': stats['community_created'],
         'country_count': 87,
-        'email_count': EmailSubscriber.objects.count(),
+        'email_count': stats['email_count'],
         'attempt_count': attempt_count,
         'success_count': success_count,
         'success_ratio': success_ratio,
-        'user_count': QuestAttempt.objects.distinct('profile').count(),
-        'leaderboard': leaderboard,
+        'user_count': stats['user_count'],
+        'leaderboard': stats['leaderboard'],
         'REFER_LINK': f'https://gitcoin.co/quests/?cb=ref:{request.user.profile.ref_code}' if request.user.is_authenticated else None,
         'rewards_schedule': rewards_schedule,
         'query': query,
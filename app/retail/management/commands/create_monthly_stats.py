@@ -0,0 +1,38 @@
+'''
+    Copyright (C) 2019 Gitcoin Core
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Affero General Public License as published
+    by the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU Affero General Public License for more details.
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+'''
+from django.core.management.base import BaseCommand
+
+from marketing.models import MonthlyStat
+from retail.utils import programming_languages, update_monthly_stats
+
+
+class Command(BaseCommand):
+
+    help = 'materializes the missing months of the /results history series'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', dest='rebuild', default=False,
+                            help='recompute every month, eg after past stats were backfilled')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            MonthlyStat.objects.all().delete()
+        for keyword in [''] + programming_languages:
+            print(f"- {keyword or 'all'}")
+            update_monthly_stats(keyword)
+        print(f'{MonthlyStat.objects.count()} monthly stats')
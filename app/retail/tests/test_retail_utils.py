@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Handle retail utility related tests.
+
+Copyright (C) 2019 Gitcoin Core
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published
+by the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+from django.utils import timezone
+
+from marketing.models import MonthlyStat
+from retail.utils import MONTHLY_STAT_GRACE_PERIOD, get_monthly_series
+from test_plus.test import TestCase
+
+
+class MonthlySeriesTest(TestCase):
+    """Define tests for get_monthly_series."""
+
+    def setUp(self):
+        """Perform setup for the testcase."""
+        now = timezone.now()
+        self.settled = now - MONTHLY_STAT_GRACE_PERIOD - timezone.timedelta(days=1)
+        self.recent = now - timezone.timedelta(days=1)
+        self.computed = []
+
+    def get_val(self, date):
+        self.computed.append(date)
+        return len(self.computed)
+
+    def test_get_monthly_series_stores_settled_months(self):
+        """Test a month is only stored once it is past the grace period."""
+        assert get_monthly_series('mykey', None, [self.settled, self.recent], self.get_val) == [1, 2]
+        assert list(MonthlyStat.objects.filter(key='mykey').values_list('date', flat=True)) == [self.settled]
+
+        # the settled month is served from its MonthlyStat, the recent one is computed again
+        assert get_monthly_series('mykey', None, [self.settled, self.recent], self.get_val) == [1, 3]
+        assert self.computed == [self.settled, self.recent, self.recent]
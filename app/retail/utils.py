@@ -20,21 +20,39 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 import cgi
 import json
 import re
-import statistics
 import time
 
 from django.conf import settings
+from django.db.models import (
+    Aggregate, Count, DurationField, Exists, ExpressionWrapper, F, FloatField, Max, Min, OuterRef, StdDev, Subquery,
+    Sum,
+)
+from django.db.models.functions import Extract
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 import pytz
 from cacheops import CacheMiss, cache
-from marketing.models import Alumni, EmailSubscriber, LeaderboardRank, Stat
+from marketing.models import Alumni, EmailSubscriber, LeaderboardRank, MonthlyStat, Stat
 from requests_oauthlib import OAuth2Session
 
+# how long after a month ends its MonthlyStats are still recomputed, eg codefund's ManualStats are entered manually
+MONTHLY_STAT_GRACE_PERIOD = timezone.timedelta(days=10)
 programming_languages = ['css', 'solidity', 'python', 'javascript', 'ruby', 'rust', 'html', 'design', 'java']
 programming_languages_full = ['A# .NET','A# (Axiom)','A-0 System','A+','A++','ABAP','ABC','ABC ALGOL','ABLE','ABSET','ABSYS','ACC','Accent','Ace DASL','ACL2','ACT-III','Action!','ActionScript','Ada','Adenine','Agda','Agilent VEE','Agora','AIMMS','Alef','ALF','ALGOL 58','ALGOL 60','ALGOL 68','ALGOL W','Alice','Alma-0','AmbientTalk','Amiga E','AMOS','AMPL','APL','App Inventor for Androids visual block language','AppleScript','Arc','ARexx','Argus','AspectJ','Assembly language','ATS','Ateji PX','AutoHotkey','Autocoder','AutoIt','AutoLISP / Visual LISP','Averest','AWK','Axum','B','Babbage','Bash','BASIC','bc','BCPL','BeanShell','Batch (Windows/Dos)','Bertrand','BETA','Bigwig','Bistro','BitC','BLISS','Blue','Bon','Boo','Boomerang','Bourne shell','bash','ksh','BREW','BPEL','C','C--','C++','C#','C/AL','CachÃ© ObjectScript','C Shell','Caml','Candle','Cayenne','CDuce','Cecil','Cel','Cesil','Ceylon','CFEngine','CFML','Cg','Ch','Chapel','CHAIN','Charity','Charm','Chef','CHILL','CHIP-8','chomski','ChucK','CICS','Cilk','CL','Claire','Clarion','Clean','Clipper','CLIST','Clojure','CLU','CMS-2','COBOL','Cobra','CODE','CoffeeScript','Cola','ColdC','ColdFusion','COMAL','Combined Programming Language','COMIT','Common Intermediate Language','Common Lisp','COMPASS','Component Pascal','Constraint Handling Rules','Converge','Cool','Coq','Coral 66','Corn','CorVision','COWSEL','CPL','csh','CSP','Csound','CUDA','Curl','Curry','Cyclone','Cython','D','DASL','DASL','Dart','DataFlex','Datalog','DATATRIEVE','dBase','dc','DCL','Deesel','Delphi','DCL','DinkC','DIBOL','Dog','Draco','DRAKON','Dylan','DYNAMO','E','E#','Ease','Easy PL/I','Easy Programming Language','EASYTRIEVE PLUS','ECMAScript','Edinburgh IMP','EGL','Eiffel','ELAN','Elixir','Elm','Emacs Lisp','Emerald','Epigram','EPL','Erlang','es','Escapade','Escher','ESPOL','Esterel','Etoys','Euclid','Euler','Euphoria','EusLisp Robot Programming Language','CMS EXEC','EXEC 2','Executable UML','F','F#','Factor','Falcon','Fancy','Fantom','FAUST','Felix','Ferite','FFP','FjÃ¶lnir','FL','Flavors','Flex','FLOW-MATIC','FOCAL','FOCUS','FOIL','FORMAC','@Formula','Forth','Fortran','Fortress','FoxBase','FoxPro','FP','FPr','Franz Lisp','F-Script','FSProg','G','Google Apps Script','Game Maker Language','GameMonkey Script','GAMS','GAP','G-code','Genie','GDL','Gibiane','GJ','GEORGE','GLSL','GNU E','GM','Go','Go!','GOAL','GÃ¶del','Godiva','GOM (Good Old Mad)','Goo','Gosu','GOTRAN','GPSS','GraphTalk','GRASS','Groovy','Hack (programming language)','HAL/S','Hamilton C shell','Harbour','Hartmann pipelines','Haskell','Haxe','High Level Assembly','HLSL','Hop','Hope','Hugo','Hume','HyperTalk','IBM Basic assembly language','IBM HAScript','IBM Informix-4GL','IBM RPG','ICI','Icon','Id','IDL','Idris','IMP','Inform','Io','Ioke','IPL','IPTSCRAE','ISLISP','ISPF','ISWIM','J','J#','J++','JADE','Jako','JAL','Janus','JASS','Java','JavaScript','JCL','JEAN','Join Java','JOSS','Joule','JOVIAL','Joy','JScript','JScript .NET','JavaFX Script','Julia','Jython','K','Kaleidoscope','Karel','Karel++','KEE','Kixtart','KIF','Kojo','Kotlin','KRC','KRL','KUKA','KRYPTON','ksh','L','L# .NET','LabVIEW','Ladder','Lagoona','LANSA','Lasso','LaTeX','Lava','LC-3','Leda','Legoscript','LIL','LilyPond','Limbo','Limnor','LINC','Lingo','Linoleum','LIS','LISA','Lisaac','Lisp','Lite-C','Lithe','Little b','Logo','Logtalk','LPC','LSE','LSL','LiveCode','LiveScript','Lua','Lucid','Lustre','LYaPAS','Lynx','M2001','M4','Machine code','MAD','MAD/I','Magik','Magma','make','Maple','MAPPER','MARK-IV','Mary','MASM Microsoft Assembly x86','Mathematica','MATLAB','Maxima','Macsyma','Max','MaxScript','Maya (MEL)','MDL','Mercury','Mesa','Metacard','Metafont','MetaL','Microcode','MicroScript','MIIS','MillScript','MIMIC','Mirah','Miranda','MIVA Script','ML','Moby','Model 204','Modelica','Modula','Modula-2','Modula-3','Mohol','MOO','Mortran','Mouse','MPD','CIL','MSL','MUMPS','NASM','NATURAL','Napier88','Neko','Nemerle','nesC','NESL','Net.Data','NetLogo','NetRexx','NewLISP','NEWP','Newspeak','NewtonScript','NGL','Nial','Nice','Nickle','NPL','Not eXactly C','Not Quite C','NSIS','Nu','NWScript','NXT-G','o:XML','Oak','Oberon','Obix','OBJ2','Object Lisp','ObjectLOGO','Object REXX','Object Pascal','Objective-C','Objective-J','Obliq','Obol','OCaml','occam','occam-Ï€','Octave','OmniMark','Onyx','Opa','Opal','OpenCL','OpenEdge ABL','OPL','OPS5','OptimJ','Orc','ORCA/Modula-2','Oriel','Orwell','Oxygene','Oz','P#','ParaSail (programming language)','PARI/GP','Pascal','Pawn','PCASTL','PCF','PEARL','PeopleCode','Perl','PDL','PHP','Phrogram','Pico','Picolisp','Pict','Pike','PIKT','PILOT','Pipelines','Pizza','PL-11','PL/0','PL/B','PL/C','PL/I','PL/M','PL/P','PL/SQL','PL360','PLANC','PlankalkÃ¼l','Planner','PLEX','PLEXIL','Plus','POP-11','PostScript','PortablE','Powerhouse','PowerBuilder','PowerShell','PPL','Processing','Processing.js','Prograph','PROIV','Prolog','PROMAL','Promela','PROSE modeling language','PROTEL','ProvideX','Pro*C','Pure','Python','Q (equational programming language)','Q (programming language from Kx Systems)','Qalb','Qi','QtScript','QuakeC','QPL','R','R++','Racket','RAPID','Rapira','Ratfiv','Ratfor','rc','REBOL','Red','Redcode','REFAL','Reia','Revolution','rex','REXX','Rlab','RobotC','ROOP','RPG','RPL','RSL','RTL/2','Ruby','RuneScript','Rust','S','S2','S3','S-Lang','S-PLUS','SA-C','SabreTalk','SAIL','SALSA','SAM76','SAS','SASL','Sather','Sawzall','SBL','Scala','Scheme','Scilab','Scratch','Script.NET','Sed','Seed7','Self','SenseTalk','SequenceL','SETL','Shift Script','SIMPOL','Shakespeare','SIGNAL','SiMPLE','SIMSCRIPT','Simula','Simulink','SISAL','SLIP','SMALL','Smalltalk','Small Basic','SML','Snap!','SNOBOL','SPITBOL','Snowball','SOL','Span','SPARK','SPIN','SP/k','SPS','Squeak','Squirrel','SR','S/SL','Stackless Python','Starlogo','Strand','Stata','Stateflow','Subtext','SuperCollider','SuperTalk','Swift (Apple programming language)','Swift (parallel scripting language)','SYMPL','SyncCharts','SystemVerilog','T','TACL','TACPOL','TADS','TAL','Tcl','Tea','TECO','TELCOMP','TeX','TEX','TIE','Timber','TMG','Tom','TOM','Topspeed','TPU','Trac','TTM','T-SQL','TTCN','Turing','TUTOR','TXL','TypeScript','Turbo C++','Ubercode','UCSD Pascal','Umple','Unicon','Uniface','UNITY','Unix shell','UnrealScript','Vala','VBA','VBScript','Verilog','VHDL','Visual Basic','Visual Basic .NET','Visual DataFlex','Visual DialogScript','Visual Fortran','Visual FoxPro','Visual J++','Visual J#','Visual Objects','Visual Prolog','VSXu','Vvvv','WATFIV, WATFOR','WebDNA','WebQL','Windows PowerShell','Winbatch','Wolfram','Wyvern','X++','X#','X10','XBL','XC','XMOS architecture','xHarbour','XL','Xojo','XOTcl','XPL','XPL0','XQuery','XSB','XSLT','XPath','Xtend','Yorick','YQL','Z notation','Zeno','ZOPL','ZPL']
 
+class PercentileCont(Aggregate):
+    """Define the postgres percentile_cont ordered set aggregate."""
+
+    function = 'PERCENTILE_CONT'
+    name = 'percentile_cont'
+    output_field = FloatField()
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=percentile, **extra)
+
+
 class PerformanceProfiler:
 
     last_time = None
@@ -80,10 +98,21 @@ def strip_double_chars(txt, char=' '):
 
 
 def get_bounty_history_row(label, date, keyword):
-    bounties = get_bounty_history_at_date(['done'], date, keyword)
-    ecosystem = get_ecosystem_history_at_date(date, keyword)
-    codefund = get_codefund_history_at_date(date, keyword)
-    tips = get_tip_history_at_date(date, keyword) - ecosystem
+    return format_bounty_history_row(
+        label,
+        date,
+        keyword,
+        bounties=get_bounty_history_at_date(['done'], date, keyword),
+        tips=get_tip_history_at_date(date, keyword),
+        grants=get_grants_history_at_date(date, keyword),
+        kudos=get_kudos_history_at_date(date, keyword),
+        codefund=get_codefund_history_at_date(date, keyword),
+        ecosystem=get_ecosystem_history_at_date(date, keyword),
+    )
+
+
+def format_bounty_history_row(label, date, keyword, bounties, tips, grants, kudos, codefund, ecosystem):
+    tips = tips - ecosystem
     core_platform = bounties + tips
 
     print(label, date, core_platform, keyword, bounties, tips, ecosystem)
@@ -91,13 +120,54 @@ def get_bounty_history_row(label, date, keyword):
         label,
         bounties,
         tips,
-        get_grants_history_at_date(date, keyword),
-        get_kudos_history_at_date(date, keyword),
+        grants,
+        kudos,
         codefund,
         ecosystem,
     ]
 
 
+def get_history_dates(since=timezone.datetime(2017, 10, 1).replace(tzinfo=pytz.UTC)):
+    """Get the (label, date) month boundaries of the results page history since the provided date."""
+    dates = []
+    for year in range(since.year, timezone.now().year + 1):
+        for month in range(1, 13):
+            day_of_month = 3 if year == 2018 and month < 7 else 1
+            then = timezone.datetime(year, month, day_of_month).replace(tzinfo=pytz.UTC)
+            if since <= then < timezone.now():
+                label = (then - timezone.timedelta(days=2)).strftime("%B %Y")
+                dates.append((label, then))
+    return dates
+
+
+def get_monthly_series(key, keyword, dates, get_val):
+    """Get the values of a series at the provided month boundaries.
+
+    Values are read from the materialized MonthlyStat rows; the ones which are
+    missing (eg because a new month has started) are computed with
+    `get_val(date)` and stored, so past months are only ever computed once.
+    Months ending within MONTHLY_STAT_GRACE_PERIOD are computed on every call
+    but not stored yet, as their stats may still be entered late.
+    """
+    keyword = keyword or ''
+    series = dict(MonthlyStat.objects.filter(key=key, keyword=keyword, date__in=dates).values_list('date', 'val'))
+    missing = [
+        MonthlyStat(key=key, keyword=keyword, date=date, val=get_val(date)) for date in dates if date not in series
+    ]
+    settled_before = timezone.now() - MONTHLY_STAT_GRACE_PERIOD
+    settled = [stat for stat in missing if stat.date <= settled_before]
+    if settled:
+        MonthlyStat.objects.bulk_create(settled, ignore_conflicts=True)
+    series.update({stat.date: stat.val for stat in missing})
+    return [series[date] for date in dates]
+
+
+def get_stat_at_date(key, date):
+    return Stat.objects.filter(key=key, created_on__lte=date).order_by('-created_on').values_list(
+        'val', flat=True
+    ).first()
+
+
 def get_bounty_history_at_date(statuses, date, keyword):
     keyword_with_prefix = f"_{keyword}" if keyword else ""
     try:
@@ -202,8 +272,8 @@ def get_cryptoasset_history_at_date(date, keyword, key):
         return 0
 
 
-def get_history(base_stats, copy, num_months=6):
-    today = base_stats.first().val if base_stats.exists() else 0
+def get_history(key, copy, num_months=6):
+    today = Stat.objects.filter(key=key).order_by('-pk').values_list('val', flat=True).first() or 0
 
     # slack ticks
     increment = 1000
@@ -212,16 +282,18 @@ def get_history(base_stats, copy, num_months=6):
         ['When', copy],
         ['Launch', 0],
     ]
-    _range = list(range(1, num_months))
-    _range.reverse()
-    for i in _range:
-        try:
-            plural = 's' if i != 1 else ''
-            before_then = (timezone.now() - timezone.timedelta(days=i*30))
-            val = base_stats.filter(created_on__lt=before_then).order_by('-created_on').first().val
-            history = history + [[f'{i} month{plural} ago', val], ]
-        except Exception:
-            pass
+    now = timezone.now()
+    dates = [
+        then for __, then in get_history_dates()
+        if (now.year - then.year) * 12 + now.month - then.month > 0
+    ][-(num_months - 1):] if num_months > 1 else []
+    series = get_monthly_series(key, '', dates, lambda date: get_stat_at_date(key, date))
+    for then, val in zip(dates, series):
+        if val is None:
+            continue
+        months_ago = (now.year - then.year) * 12 + now.month - then.month
+        plural = 's' if months_ago != 1 else ''
+        history = history + [[f'{months_ago} month{plural} ago', int(val)], ]
 
     history = history + [['Today', today], ]
     history = json.dumps(history)
@@ -249,20 +321,22 @@ def get_funder_receiver_stats(keyword):
     from dashboard.models import Earning
     earnings = Earning.objects.filter(network='mainnet')
 
-    num_funders = len(set(earnings.values_list("from_profile__handle", flat=True)))
-    num_recipients = len(set(earnings.values_list("to_profile__handle", flat=True)))
-    num_transactions = earnings.count()
-    all_value = earnings.exclude(value_usd__isnull=True).values_list('value_usd', flat=True)
-    total_value = sum(all_value)
-    avg_value = round(total_value / num_transactions)
-    median_value = statistics.median(all_value)
+    stats = earnings.aggregate(
+        funders=Count('from_profile__handle', distinct=True),
+        recipients=Count('to_profile__handle', distinct=True),
+        transactions=Count('pk'),
+        total_value=Sum('value_usd'),
+        median_value=PercentileCont('value_usd', 0.5),
+    )
+    num_transactions = stats['transactions']
+    avg_value = round((stats['total_value'] or 0) / num_transactions) if num_transactions else 0
 
     return {
-        'funders': num_funders,
-        'recipients': num_recipients,
+        'funders': stats['funders'],
+        'recipients': stats['recipients'],
         'transactions': num_transactions,
         'avg_value': avg_value,
-        'median_value': median_value,
+        'median_value': stats['median_value'] or 0,
     }
 
 
@@ -291,57 +365,92 @@ def is_valid_bounty_for_headline_hourly_rate(bounty):
     return True
 
 
+def with_hourly_rate(bounties):
+    """Annotate the bounties with their Bounty.hourly_rate, dropping the ones that don't have one."""
+    from dashboard.models import BountyFulfillment
+    hours_worked = BountyFulfillment.objects.filter(bounty=OuterRef('pk'), accepted=True).order_by('pk')
+    return bounties.annotate(
+        hours_worked=Subquery(hours_worked.values('fulfiller_hours_worked')[:1]),
+    ).exclude(hours_worked__isnull=True).exclude(hours_worked=0).exclude(value_in_usdt__isnull=True).annotate(
+        hourly_rate_db=ExpressionWrapper(F('value_in_usdt') / F('hours_worked'), output_field=FloatField()),
+    )
+
+
+def filter_valid_bounties_for_headline_hourly_rate(bounties):
+    """Set based version of is_valid_bounty_for_headline_hourly_rate."""
+    from dashboard.models import BountyFulfillment
+    # smaller bounties were skewing the results
+    min_hours = 3
+    min_value_usdt = 300
+    short_fulfillments = BountyFulfillment.objects.filter(
+        bounty=OuterRef('pk'), accepted=True, fulfiller_hours_worked__lt=min_hours,
+    ).exclude(fulfiller_hours_worked=0)
+    return bounties.filter(value_in_usdt__gte=min_value_usdt).annotate(
+        has_short_fulfillment=Exists(short_fulfillments),
+    ).filter(has_short_fulfillment=False)
+
+
 def get_hourly_rate_distribution(keyword, bounty_value_range=None, methodology=None):
     if not methodology:
         methodology = 'quartile' if not keyword else 'minmax'
     base_bounties = get_base_done_bounties(keyword)
     if bounty_value_range:
         base_bounties = base_bounties.filter(_val_usd_db__lt=bounty_value_range[1], _val_usd_db__gt=bounty_value_range[0])
-        hourly_rates = [ele.hourly_rate for ele in base_bounties if ele.hourly_rate is not None]
-        # print(bounty_value_range, len(hourly_rates))
+        hourly_rates = with_hourly_rate(base_bounties)
     else:
-        hourly_rates = [ele.hourly_rate for ele in base_bounties if is_valid_bounty_for_headline_hourly_rate(ele)]
-    if len(hourly_rates) == 1:
-        return f"${round(hourly_rates[0], 2)}"
-    if len(hourly_rates) < 2:
+        hourly_rates = filter_valid_bounties_for_headline_hourly_rate(with_hourly_rate(base_bounties))
+
+    stats = hourly_rates.aggregate(
+        count=Count('pk'),
+        min=Min('hourly_rate_db'),
+        max=Max('hourly_rate_db'),
+        first_quarter=PercentileCont('hourly_rate_db', 0.25),
+        median=PercentileCont('hourly_rate_db', 0.5),
+        third_quarter=PercentileCont('hourly_rate_db', 0.75),
+        stddev=StdDev('hourly_rate_db', sample=True),
+    )
+    if stats['count'] == 1:
+        return f"${round(stats['min'], 2)}"
+    if stats['count'] < 2:
         return ""
     if methodology == 'median_stdddev':
         stddev_divisor = 1
-        median = int(statistics.median(hourly_rates))
-        stddev = int(statistics.stdev(hourly_rates))
+        median = int(stats['median'])
+        stddev = int(stats['stddev'])
         min_hourly_rate = median - int(stddev/stddev_divisor)
         max_hourly_rate = median + int(stddev/stddev_divisor)
     elif methodology == 'quartile':
-        hourly_rates.sort()
-        num_quarters = 4
-        first_quarter = int(len(hourly_rates)/num_quarters)
-        third_quarter = first_quarter * (num_quarters-1)
-        min_hourly_rate = int(hourly_rates[first_quarter])
-        max_hourly_rate = int(hourly_rates[third_quarter])
+        min_hourly_rate = int(stats['first_quarter'])
+        max_hourly_rate = int(stats['third_quarter'])
     elif methodology == 'hardcode':
         min_hourly_rate = '15'
         max_hourly_rate = '120'
     else:
-        min_hourly_rate = int(min(hourly_rates)) if len(hourly_rates) else 'n/a'
-        max_hourly_rate = int(max(hourly_rates)) if len(hourly_rates) else 'n/a'
+        min_hourly_rate = int(stats['min'])
+        max_hourly_rate = int(stats['max'])
     return f'${min_hourly_rate} - ${max_hourly_rate}'
 
 
 def get_bounty_median_turnaround_time(func='turnaround_time_started', keyword=None):
+    from dashboard.models import BountyFulfillment, Interest
     base_bounties = get_base_done_bounties(keyword)
     eligible_bounties = base_bounties.exclude(idx_status='open') \
         .filter(created_on__gt=(timezone.now() - timezone.timedelta(days=60)))
-    pickup_time_hours = []
-    for bounty in eligible_bounties:
-        tat = getattr(bounty, func)
-        if tat:
-            pickup_time_hours.append(tat / 60 / 60)
 
-    pickup_time_hours.sort()
-    try:
-        return statistics.median(pickup_time_hours)
-    except statistics.StatisticsError:
-        return 0
+    # mirrors the Bounty.turnaround_time_* properties
+    fulfillments = BountyFulfillment.objects.filter(bounty=OuterRef('pk')).order_by('pk')
+    turnaround_from = {
+        'turnaround_time_accepted': fulfillments.filter(accepted=True).values('accepted_on')[:1],
+        'turnaround_time_started': Interest.objects.filter(bounty=OuterRef('pk')).order_by('pk').values('created')[:1],
+        'turnaround_time_submitted': fulfillments.values('created_on')[:1],
+    }[func]
+    turnaround = Extract(
+        ExpressionWrapper(Subquery(turnaround_from) - F('web3_created'), output_field=DurationField()), 'epoch'
+    )
+    median = eligible_bounties.annotate(turnaround=turnaround).exclude(turnaround__isnull=True).exclude(
+        turnaround=0
+    ).aggregate(median=PercentileCont('turnaround', 0.5))['median']
+    return median / 60 / 60 if median is not None else 0
 
 
 def get_bounty_history(keyword=None, cumulative=True):
@@ -357,17 +466,23 @@ def get_bounty_history(keyword=None, cumulative=True):
     ]
     if not keyword:
         bh = bh + initial_stats
-    for year in range(2018, 2025):
-        months = range(1, 13)
-        if year == 2018:
-            months = range(6, 13)
-        for month in months:
-            day_of_month = 3 if year == 2018 and month < 7 else 1
-            then = timezone.datetime(year, month, day_of_month).replace(tzinfo=pytz.UTC)
-            if then < timezone.now():
-                label = (then - timezone.timedelta(days=2)).strftime("%B %Y")
-                row = get_bounty_history_row(label, then, keyword)
-                bh.append(row)
+    history_dates = get_history_dates(since=timezone.datetime(2018, 6, 1).replace(tzinfo=pytz.UTC))
+    dates = [then for __, then in history_dates]
+    series = {
+        'bounties': lambda date: get_bounty_history_at_date(['done'], date, keyword),
+        'tips': lambda date: get_tip_history_at_date(date, keyword),
+        'grants': lambda date: get_grants_history_at_date(date, keyword),
+        'kudos': lambda date: get_kudos_history_at_date(date, keyword),
+        'codefund': lambda date: get_codefund_history_at_date(date, keyword),
+        'ecosystem': lambda date: get_ecosystem_history_at_date(date, keyword),
+    }
+    columns = {
+        name: get_monthly_series(f'bounty_history_{name}', keyword, dates, get_val)
+        for name, get_val in series.items()
+    }
+    for i, (label, then) in enumerate(history_dates):
+        row = format_bounty_history_row(label, then, keyword, **{name: column[i] for name, column in columns.items()})
+        bh.append(row)
 
     if timezone.now().day > 9:
         # get current month date to month
@@ -392,6 +507,25 @@ def get_bounty_history(keyword=None, cumulative=True):
     return bh
 
 
+def get_members_stat_key(keyword):
+    return 'email_subscriberse' if not keyword else f"subscribers_with_skill_{keyword}"
+
+
+def get_jdi_stat_key(keyword):
+    return f'joe_dominance_index_30_{keyword}_value' if keyword else 'joe_dominance_index_30_value'
+
+
+def get_jdi_num_months():
+    return int((timezone.now() - timezone.datetime(2017, 10, 1).replace(tzinfo=pytz.UTC)).days/30)
+
+
+def update_monthly_stats(keyword=None):
+    """Materialize any missing months of the results page history series for the provided keyword."""
+    get_bounty_history(keyword)
+    get_history(get_members_stat_key(keyword), "Members")
+    get_history(get_jdi_stat_key(keyword), 'Percentage', get_jdi_num_months())
+
+
 def build_stat_results(keyword=None):
     """Buidl the results page context.
 
@@ -463,19 +597,12 @@ def build_stat_results(keyword=None):
     pp.profile_time('orgs')
 
     # community size
-    _key = 'email_subscriberse' if not keyword else f"subscribers_with_skill_{keyword}"
-    base_stats = Stat.objects.filter(key=_key).order_by('-pk').cache()
-    context['members_history'], context['slack_ticks'] = get_history(base_stats, "Members")
+    context['members_history'], context['slack_ticks'] = get_history(get_members_stat_key(keyword), "Members")
 
     pp.profile_time('Stats1')
 
     # jdi history
-    key = f'joe_dominance_index_30_{keyword}_value' if keyword else 'joe_dominance_index_30_value'
-    base_stats = Stat.objects.filter(
-        key=key,
-        ).order_by('-pk').cache()
-    num_months = int((timezone.now() - timezone.datetime(2017, 10, 1).replace(tzinfo=pytz.UTC)).days/30)
-    context['jdi_history'], __ = get_history(base_stats, 'Percentage', num_months)
+    context['jdi_history'], __ = get_history(get_jdi_stat_key(keyword), 'Percentage', get_jdi_num_months())
 
     pp.profile_time('Stats2')
 